@@ -0,0 +1,546 @@
+"""
+Benchmark suite of formation-evaluation on synthetic field-scale wells
+
+Usage:
+
+  python benchmark.py --scale quick --output results.json
+  python benchmark.py --scale full --output new.json --baseline results.json
+
+The cold import of the compute core (formation_evaluation.core, in a fresh
+interpreter) is timed too; the command fails if it takes more than
+STARTUP_BUDGET or loads a plotting (or other third-party) module.
+
+Every public function is timed (best of --repeat runs) and memory-profiled
+(peak of the traced allocations) at several sizes (number of wells x
+samples per well), the plotting functions are rendered on the Agg canvas.
+The results are saved as JSON, so runs of different commits can be compared
+with --baseline (or compare_benchmarks); the command fails if a case is
+slower than the baseline by more than --threshold.
+"""
+
+# (number of wells, samples per well)
+SCALES = {
+    'quick': [(1, 1000), (1, 100000), (10, 10000)],
+    'full': [(1, 1000), (1, 100000), (1, 1000000), (1, 10000000),
+             (100, 10000), (1000, 10000)]}
+
+# seconds allowed for the cold import of the compute core
+STARTUP_BUDGET = 0.1
+
+
+def synthetic_wells(n_wells=1, n_samples=10000, step=0.1524, n_formations=8,
+                    seed=0):
+  """
+  Synthetic wells with GR, RT, NPHI, RHOB and formation tops
+
+  Input:
+
+  n_wells is the number of wells. Default is 1
+  n_samples is the number of samples per well. Default is 10000
+  step is the depth sampling. Default is 0.1524 (half a foot, in m)
+  n_formations is the number of formations of every well. Default is 8
+  seed is the seed of the random generator. Default is 0
+
+  Every formation has its own shale volume and porosity, the curves follow
+  from them (with correlated noise, spikes and a few NaN gaps), so the logs
+  look like real logs to the functions (not uniform noise).
+
+  Output:
+
+  df is the dataframe of all wells: WELL, DEPTH, GR, RT, NPHI, RHOB. The
+    samples of every well are next to each other, ascending in depth
+  df_tops is the tops dataframe (long format of label_generator with
+    column_well): WELL, FORMATION, DEPTH
+  """
+  import numpy as np
+  import pandas as pd
+  from scipy.signal import lfilter
+
+  rng = np.random.default_rng(seed)
+  names = np.array(['WELL-{:04d}'.format(i) for i in range(n_wells)])
+  fm_names = np.array(['FM-{}'.format(i) for i in range(n_formations)])
+
+  # depths: every well starts at its own depth
+  start = rng.uniform(1000, 2000, n_wells)
+  depth = (start[:,None] + step * np.arange(n_samples)).ravel()
+  well = np.repeat(np.arange(n_wells), n_samples)
+
+  # tops: the first at the top of the well, the others anywhere below
+  length = step * n_samples
+  offsets = np.sort(rng.uniform(0, length, (n_wells, n_formations)), axis=1)
+  offsets[:,0] = 0
+  tops = start[:,None] + offsets
+  df_tops = pd.DataFrame({'WELL': np.repeat(names, n_formations),
+                          'FORMATION': np.tile(fm_names, n_wells),
+                          'DEPTH': tops.ravel()})
+
+  # formation of every sample (tops of well w shifted by w * span)
+  span = 2 * (start.max() + length)
+  fm = np.searchsorted((tops + span * np.arange(n_wells)[:,None]).ravel(),
+                       depth + span * well, side='right') - 1
+  fm = fm - well * n_formations
+
+  # formation properties and correlated (AR(1)) noise along depth
+  fm_vsh = rng.uniform(0.05, 0.8, n_formations)
+  fm_phi = rng.uniform(0.05, 0.3, n_formations)
+  fm_sw = rng.uniform(0.2, 1, n_formations)
+  noise = lfilter([0.1], [1, -0.9], rng.normal(0, 1, (4, len(depth))), axis=1)
+
+  vsh = np.clip(fm_vsh[fm] + 0.3 * noise[0], 0, 1)
+  phi = np.clip(fm_phi[fm] * (1 - vsh) + 0.05 * noise[1], 0.01, 0.4)
+  sw = np.clip(fm_sw[fm] + 0.1 * noise[2], 0.05, 1)
+
+  gr = 15 + 120 * vsh + 3 * rng.normal(0, 1, len(depth))
+  rhob = 2.65 * (1 - phi) + 1.0 * phi + 0.05 * vsh + 0.01 * noise[3]
+  nphi = phi + 0.25 * vsh + 0.01 * rng.normal(0, 1, len(depth))
+  rt = 0.05 / (phi**2 * sw**2) * (1 - 0.5 * vsh)
+
+  # spikes and NaN gaps (tool off, bad hole)
+  spikes = rng.random(len(depth)) < 0.001
+  gr[spikes] *= 2
+  gaps = rng.random(len(depth)) < 0.0005
+  gaps = np.convolve(gaps, np.ones(20), mode='same') > 0
+  rhob[gaps] = np.nan
+  nphi[gaps] = np.nan
+
+  df = pd.DataFrame({'WELL': names[well], 'DEPTH': depth, 'GR': gr, 'RT': rt,
+                     'NPHI': nphi, 'RHOB': rhob})
+
+  return df, df_tops
+
+
+def synthetic_survey(df, column_well='WELL', column_depth='DEPTH', spacing=30.,
+                     seed=0):
+  """
+  Synthetic deviation survey (MD and TVD stations) of every well of df
+
+  Output:
+
+  df_survey is the dataframe WELL, MD, TVD with one station every spacing
+    along the measured depth of every well
+  """
+  import numpy as np
+  import pandas as pd
+
+  rng = np.random.default_rng(seed)
+  frames = []
+  for well, depth in df.groupby(column_well, sort=False)[column_depth]:
+    md = np.arange(0, depth.max() + 2 * spacing, spacing)
+    inclination = np.deg2rad(np.clip(np.cumsum(rng.normal(0.5, 0.5, len(md))), 0, 80))
+    tvd = np.r_[0, np.cumsum(spacing * np.cos(inclination[1:]))]
+    frames.append(pd.DataFrame({'WELL': well, 'MD': md, 'TVD': tvd}))
+
+  return pd.concat(frames, ignore_index=True)
+
+
+def synthetic_fractures(n_picks=1000, n_wells=1, n_sets=3, seed=0):
+  """
+  Synthetic fracture picks (image log) in sets of similar strike and dip
+
+  Output:
+
+  df_fractures is the dataframe WELL, STRIKE, DIP
+  """
+  import numpy as np
+  import pandas as pd
+
+  rng = np.random.default_rng(seed)
+  set_strike = rng.uniform(0, 360, n_sets)
+  set_dip = rng.uniform(30, 85, n_sets)
+  fracture_set = rng.integers(0, n_sets, n_picks)
+
+  strike = np.mod(set_strike[fracture_set] + rng.normal(0, 10, n_picks), 360)
+  dip = np.clip(set_dip[fracture_set] + rng.normal(0, 5, n_picks), 0, 90)
+  well = np.array(['WELL-{:04d}'.format(i) for i in range(n_wells)])
+  df_fractures = pd.DataFrame({'WELL': well[rng.integers(0, n_wells, n_picks)],
+                               'STRIKE': strike, 'DIP': dip})
+
+  return df_fractures
+
+
+def run_benchmarks(sizes=None, repeat=3, render=True, max_render_samples=1000000,
+                   seed=0, verbose=True, startup=True):
+  """
+  Time and memory-profile every public function on synthetic wells
+
+  Input:
+
+  sizes is the LIST of (number of wells, samples per well). Default is
+    SCALES['quick']
+  repeat is the number of timed runs of every case (the best is kept).
+    Default is 3
+  render is True by default, the plotting functions are rendered on Agg
+  max_render_samples is the largest well rendered. Default is 1000000
+  seed is the seed of the synthetic data
+  verbose is True by default (one line per case is printed)
+  startup is True by default, the cold import of the compute core is timed
+    (case 'import_core', 0 wells, see startup_time)
+
+  Output:
+
+  df_results is a dataframe with one row per case: NAME, WELLS, SAMPLES,
+    SECONDS (best run) and PEAK_MB (peak traced memory of one run). The
+    third-party modules loaded by the import of the core are in
+    df_results.attrs['import_core_modules']
+  """
+  import pandas as pd
+
+  if sizes is None:
+    sizes = SCALES['quick']
+
+  rows = []
+  if startup:
+    seconds, modules = startup_time(repeat=max(repeat, 5))
+    rows.append(('import_core', 0, 0, seconds, float('nan')))
+    if verbose:
+      print('{:<32s} {:>17s} {:10.4f} s {}'.format(
+          'import_core', '', seconds, ' '.join(modules)))
+  for n_wells, n_samples in sizes:
+    df, df_tops = synthetic_wells(n_wells, n_samples, seed=seed)
+    cases = _compute_cases(df, df_tops, n_wells, n_samples, seed)
+    if render and n_samples <= max_render_samples:
+      cases += _render_cases(df, df_tops, n_samples, seed)
+
+    for name, function in cases:
+      seconds = _best_time(function, repeat)
+      peak = _peak_memory(function)
+      rows.append((name, n_wells, n_samples, seconds, peak))
+      if verbose:
+        print('{:<32s} {:>5d} x {:<9d} {:10.4f} s {:10.1f} MB'.format(
+            name, n_wells, n_samples, seconds, peak))
+
+  df_results = pd.DataFrame(rows, columns=['NAME', 'WELLS', 'SAMPLES', 'SECONDS',
+                                           'PEAK_MB'])
+  if startup:
+    df_results.attrs['import_core_modules'] = modules
+
+  return df_results
+
+
+def startup_time(module='formation_evaluation.core', repeat=5):
+  """
+  Cold import time of module, in fresh interpreters
+
+  Input:
+
+  module is the module imported. Default is the compute core
+  repeat is the number of interpreters started (the best time is kept).
+    Default is 5
+
+  Output:
+
+  seconds is the best import time
+  modules is the list of the third-party modules (numpy, pandas, scipy,
+    matplotlib, seaborn, mplstereonet) loaded by the import
+  """
+  import json
+  import os
+  import subprocess
+  import sys
+
+  code = ('import sys, time, json\n'
+          'start = time.perf_counter()\n'
+          'import {}\n'
+          'seconds = time.perf_counter() - start\n'
+          'heavy = ["numpy", "pandas", "scipy", "matplotlib", "seaborn", "mplstereonet"]\n'
+          'print(json.dumps([seconds, [m for m in heavy if m in sys.modules]]))'
+          ).format(module)
+  # the modules of this directory first (also without installing the package)
+  env = dict(os.environ)
+  here = os.path.dirname(os.path.abspath(__file__))
+  env['PYTHONPATH'] = os.pathsep.join([here] + [p for p in [env.get('PYTHONPATH')] if p])
+
+  best, modules = float('inf'), []
+  for _ in range(repeat):
+    # -B: no bytecode written by the benchmark itself
+    out = subprocess.run([sys.executable, '-B', '-c', code], capture_output=True,
+                         text=True, check=True, env=env, cwd=here).stdout
+    seconds, loaded = json.loads(out.strip().splitlines()[-1])
+    if seconds < best:
+      best, modules = seconds, loaded
+
+  return best, modules
+
+
+def _compute_cases(df, df_tops, n_wells, n_samples, seed):
+  """
+  (name, function) of the computing cases of one size
+  """
+  import numpy as np
+  import pandas as pd
+  from formation_evaluation.decimation import decimate
+  from formation_evaluation.fracture import density_grid, rose_histogram
+  from formation_evaluation.label_generator import label_generator
+  from formation_evaluation.log_statistics import log_statistics
+  from formation_evaluation.log_store import LogStore
+  from formation_evaluation.merge_data_interpolation import merge_data_interpolation
+  from formation_evaluation.petrophysics import petrophysics
+  from formation_evaluation.regrid import regrid
+
+  # the labels are needed by the cases after label_generator
+  label_generator(df, df_tops, 'DEPTH', 'FORMATION', column_well='WELL')
+
+  first = df['WELL'].iloc[0]
+  df_well = df[df['WELL'] == first].reset_index(drop=True)
+  top, base = df_well['DEPTH'].iloc[0], df_well['DEPTH'].iloc[-1]
+  depth_regrid = np.arange(top, base + 1, 1.)
+  df_survey = synthetic_survey(df, seed=seed)
+  df_params = pd.DataFrame({'FORMATION': df_tops['FORMATION'].unique(),
+                            'rho_ma': 2.65, 'rho_fl': 1.0, 'GR_min': 15,
+                            'GR_max': 135, 'A': 0.3, 'B': 0, 'a': 1, 'm': 2,
+                            'n': 2, 'Rw': 0.05, 'k0': -2, 'k_phif': 20,
+                            'k_vsh': -3})
+  store = LogStore(df, 'DEPTH', column_well='WELL', column_label='FORMATION')
+  picks = synthetic_fractures(min(n_wells * n_samples // 10, 1000000) or 10,
+                              n_wells, seed=seed)
+
+  cases = [
+      ('label_generator', lambda: label_generator(
+          df, df_tops, 'DEPTH', 'FORMATION', column_well='WELL')),
+      ('regrid', lambda: regrid(df_well, 'DEPTH', ['GR', 'RHOB'], depth_regrid)),
+      ('regrid (stats)', lambda: regrid(
+          df_well, 'DEPTH', ['GR', 'RHOB', 'FORMATION'], depth_regrid,
+          stats=['mean', 'median', 'min', 'max'])),
+      ('merge_data_interpolation', lambda: merge_data_interpolation(
+          df_survey, df, 'MD', ['TVD'], 'DEPTH', column_well='WELL')),
+      ('petrophysics', lambda: petrophysics(
+          df.copy(), df_params, 'FORMATION', column_RT='RT')),
+      ('log_statistics', lambda: log_statistics(
+          df, 'WELL', 'FORMATION', ['GR', 'RT', 'NPHI', 'RHOB'])),
+      ('LogStore', lambda: LogStore(
+          df, 'DEPTH', column_well='WELL', column_label='FORMATION')),
+      ('LogStore.formation', lambda: [store.formation(w, fm)
+          for w in store.wells for fm in store.intervals(w)]),
+      ('decimate', lambda: decimate(
+          df_well, 'DEPTH', ['GR', 'RT', 'NPHI', 'RHOB'], n_pixels=1000)),
+      ('density_grid', lambda: density_grid(picks['STRIKE'], picks['DIP'])),
+      ('rose_histogram', lambda: rose_histogram(
+          picks['STRIKE'], picks['WELL'])),
+  ]
+  if n_wells > 1:
+    cases.append(('regrid (wells)', lambda: regrid(
+        df, 'DEPTH', ['GR', 'RHOB'], depth_regrid, group='WELL')))
+
+  return cases
+
+
+def _render_cases(df, df_tops, n_samples, seed):
+  """
+  (name, function) of the plotting cases of one size (rendered on Agg)
+  """
+  import matplotlib
+  matplotlib.use('Agg')
+  from formation_evaluation.ND_plot import ND_plot
+  from formation_evaluation.fracture import rose, stereonet
+  from formation_evaluation.label_generator import label_generator
+  from formation_evaluation.triple_combo import triple_combo
+  from formation_evaluation.well_log_display import well_log_display
+
+  first = df['WELL'].iloc[0]
+  df_well = df[df['WELL'] == first].reset_index(drop=True)
+  label_generator(df_well, df_tops[df_tops['WELL'] == first].iloc[:,1:],
+                  'DEPTH', 'FORMATION')
+  top, base = df_well['DEPTH'].iloc[0], df_well['DEPTH'].iloc[-1]
+  tops = df_tops[df_tops['WELL'] == first]
+  picks = synthetic_fractures(min(n_samples // 10, 100000) or 10, seed=seed)
+
+  def triple(decimate):
+    return lambda: triple_combo(df_well, 'DEPTH', 'GR', 'RT', 'NPHI', 'RHOB',
+                                top, base, decimate=decimate)
+
+  def display(decimate):
+    return lambda: well_log_display(
+        df_well, 'DEPTH', ['GR', 'RT', 'NPHI', 'RHOB'], column_semilog=1,
+        min_depth=top, max_depth=base, fm_tops=list(tops['FORMATION']),
+        fm_depths=list(tops['DEPTH']), decimate=decimate)
+
+  cases = [
+      ('triple_combo', triple(False)),
+      ('triple_combo (decimate)', triple(True)),
+      ('well_log_display', display(False)),
+      ('well_log_display (decimate)', display(True)),
+      ('ND_plot (density)', lambda: ND_plot(
+          1.0, df_well, 'NPHI', 'RHOB', 'GR', 'continuous', mode='density')),
+      ('stereonet', lambda: stereonet(picks['STRIKE'], picks['DIP'])),
+      ('rose', lambda: rose(picks['STRIKE'])),
+  ]
+  if n_samples <= 100000:
+    cases.append(('ND_plot (scatter)', lambda: ND_plot(
+        1.0, df_well, 'NPHI', 'RHOB', 'GR', 'continuous')))
+
+  return [(name, _rendered(function)) for name, function in cases]
+
+
+def _rendered(function):
+  """
+  Plotting function that also draws its figures on the canvas and closes them
+  """
+  def render():
+    import warnings
+    import matplotlib.pyplot as plt
+
+    with warnings.catch_warnings():
+      # plt.show of the plotting functions warns on the Agg canvas
+      warnings.simplefilter('ignore', UserWarning)
+      function()
+      for number in plt.get_fignums():
+        plt.figure(number).canvas.draw()
+    plt.close('all')
+
+  return render
+
+
+def _best_time(function, repeat):
+  """
+  Best wall time of repeat runs of function
+  """
+  import time
+
+  best = float('inf')
+  for _ in range(repeat):
+    start = time.perf_counter()
+    function()
+    best = min(best, time.perf_counter() - start)
+
+  return best
+
+
+def _peak_memory(function):
+  """
+  Peak traced memory (MB) allocated while running function once
+  """
+  import tracemalloc
+
+  tracemalloc.start()
+  try:
+    base = tracemalloc.get_traced_memory()[0]
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+  finally:
+    tracemalloc.stop()
+
+  return (peak - base) / 2**20
+
+
+def save_benchmarks(df_results, filename):
+  """
+  Save the results of run_benchmarks as JSON (with commit and versions)
+  """
+  import datetime
+  import json
+  import os
+  import platform
+  import subprocess
+  import matplotlib
+  import numpy as np
+  import pandas as pd
+  import scipy
+
+  try:
+    commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                            text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    commit = None
+
+  content = {
+      'commit': commit,
+      'date': datetime.datetime.now().isoformat(timespec='seconds'),
+      'machine': platform.platform(),
+      'versions': {'python': platform.python_version(), 'numpy': np.__version__,
+                   'pandas': pd.__version__, 'scipy': scipy.__version__,
+                   'matplotlib': matplotlib.__version__},
+      'results': df_results.to_dict(orient='records')}
+  with open(filename, 'w') as f:
+    json.dump(content, f, indent=1)
+
+
+def load_benchmarks(filename):
+  """
+  Load the results saved with save_benchmarks as a dataframe
+  """
+  import json
+  import pandas as pd
+
+  with open(filename, 'r') as f:
+    content = json.load(f)
+
+  return pd.DataFrame(content['results'])
+
+
+def compare_benchmarks(baseline, current, threshold=1.25):
+  """
+  Regression report of two benchmark runs
+
+  Input:
+
+  baseline and current are the results of run_benchmarks (or the JSON file
+    names of save_benchmarks)
+  threshold is the time ratio current / baseline above which a case is a
+    regression. Default is 1.25 (25% slower)
+
+  Output:
+
+  report is a dataframe with one row per case of both runs: NAME, WELLS,
+    SAMPLES, the SECONDS and PEAK_MB of both, RATIO (of the times) and
+    REGRESSION (True if RATIO > threshold), slowest ratio first
+  """
+  if isinstance(baseline, str):
+    baseline = load_benchmarks(baseline)
+  if isinstance(current, str):
+    current = load_benchmarks(current)
+
+  report = baseline.merge(current, on=['NAME', 'WELLS', 'SAMPLES'],
+                          suffixes=('_BASELINE', '_CURRENT'))
+  report['RATIO'] = report['SECONDS_CURRENT'] / report['SECONDS_BASELINE']
+  report['REGRESSION'] = report['RATIO'] > threshold
+
+  return report.sort_values('RATIO', ascending=False).reset_index(drop=True)
+
+
+def main(argv=None):
+  import argparse
+  import pandas as pd
+
+  parser = argparse.ArgumentParser(description='Benchmark formation-evaluation '
+                                   'on synthetic wells')
+  parser.add_argument('--scale', choices=sorted(SCALES), default='quick')
+  parser.add_argument('--repeat', type=int, default=3)
+  parser.add_argument('--no-render', action='store_true',
+                      help='skip the plotting functions')
+  parser.add_argument('--output', default='benchmark.json')
+  parser.add_argument('--baseline', help='JSON results to compare with')
+  parser.add_argument('--threshold', type=float, default=1.25)
+  parser.add_argument('--startup-budget', type=float, default=STARTUP_BUDGET,
+                      help='seconds allowed for the import of the compute core')
+  args = parser.parse_args(argv)
+
+  df_results = run_benchmarks(SCALES[args.scale], repeat=args.repeat,
+                              render=not args.no_render)
+  save_benchmarks(df_results, args.output)
+
+  startup = df_results.loc[df_results['NAME'] == 'import_core', 'SECONDS']
+  if len(startup) and startup.iloc[0] > args.startup_budget:
+    print('import of the compute core took {:.3f} s (budget {:g} s)'.format(
+        startup.iloc[0], args.startup_budget))
+    return 1
+  modules = df_results.attrs.get('import_core_modules', [])
+  if modules:
+    print('import of the compute core loaded {}'.format(' '.join(modules)))
+    return 1
+
+  if args.baseline:
+    report = compare_benchmarks(args.baseline, df_results, args.threshold)
+    with pd.option_context('display.width', 200, 'display.max_rows', None):
+      print(report)
+    if report['REGRESSION'].any():
+      print('{} regression(s) above {:g}x'.format(report['REGRESSION'].sum(),
+                                                  args.threshold))
+      return 1
+
+  return 0
+
+
+if __name__ == '__main__':
+  import sys
+  sys.exit(main())
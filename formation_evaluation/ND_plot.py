@@ -0,0 +1,210 @@
+from .profiling import instrument
+from .theme import themed
+
+
+@instrument(plotting=True)
+@themed
+def ND_plot(denfl, df, column_nphi, column_rhob, column_hue, color_by,
+            figsize=(7,7), scatter_size=50, scatter_alpha=0.5, mode='scatter',
+            bins=400):
+  """
+  Producing Neutron-Density (Cross)plot
+
+  Input:
+
+  denfl is your fluid density
+  df is your dataframe
+  column_nphi and column_rhob are the column name of your NPHI and RHOB
+  column_hue is the column name that you want for the color of the points
+    e.g. depth, vshale, formation labels, etc.
+
+  color_by depends on the column_hue that you're giving
+    * if you're giving a continuous hue (numerical) like depth or vshale
+      define color_by='continuous'
+    * if you're giving a categorical hue (labels) like formation names
+      define color_by='categorical'
+
+  figsize, scatter_size, scatter_alpha are by default. You can also specify
+    by yourselves.
+
+  mode is 'scatter' by default (every sample is drawn as a point). For
+    millions of samples, define mode='density': the samples are binned on a
+    bins x bins raster of the plot area in one pass, and
+    * with color_by='continuous' each pixel shows the mean hue
+    * with color_by='categorical' each pixel shows the color of its most
+      frequent category
+    * with column_hue=None each pixel shows the number of samples
+    the opacity of the pixels increases with (log) number of samples
+
+  The plot is drawn with the theme of the package (see theme), the global
+  matplotlib style is left untouched.
+
+  Output:
+
+  3 lines. Blue is sandstone, black is limestone, red is dolomite
+  Each line has dots representing porosity value from 0 to 0.5
+    by increment of 0.05
+  """
+
+  import matplotlib.pyplot as plt
+  import pandas as pd
+  import seaborn as sns
+
+  lsX, ssCnlX, dolCnlX, denLs, denSs, denDol = _nd_chart_lines(float(denfl))
+
+  if mode == 'density':
+    plt.figure(figsize=figsize)
+    ax = plt.gca()
+    _nd_density(ax, df, column_nphi, column_rhob, column_hue, color_by, bins)
+
+    plt.plot(ssCnlX, denSs, '.-', color='blue', markersize=10, label = 'Sandstone')
+    plt.plot(lsX, denLs, '.-', color='black', markersize=10, label = 'Limestone')
+    plt.plot(dolCnlX, denDol, '.-', color='red', markersize=10, label = 'Dolomite')
+
+    plt.title('Neutron-Density Plot', size=20, pad=15)
+    plt.xlim(-0.05, 0.45)
+    plt.ylim(3, 1.9)
+    plt.xlabel('NPHI (v/v)'); plt.ylabel('RHOB (g/cc)')
+    return
+
+  if color_by == 'continuous':
+    # plot data with color of the continuous variable defined (depth, vsh, etc.)
+    plt.figure(figsize=figsize)
+
+    plt.scatter(df[column_nphi], df[column_rhob], c=df[column_hue],
+                alpha=scatter_alpha, cmap='viridis')
+    plt.colorbar()
+
+    # plot the sand, limestone, and dolomite line (using Seaborn)
+    plt.plot(ssCnlX, denSs, '.-', color='blue', markersize=10, label = 'Sandstone')
+    plt.plot(lsX, denLs, '.-', color='black', markersize=10, label = 'Limestone')
+    plt.plot(dolCnlX, denDol, '.-', color='red', markersize=10, label = 'Dolomite')
+
+    plt.title('Neutron-Density Plot', size=20, pad=15)
+    plt.xlim(-0.05, 0.45)
+    plt.ylim(3, 1.9)
+    plt.xlabel('NPHI (v/v)'); plt.ylabel('RHOB (g/cc)')
+
+  if color_by == 'categorical':
+    # plot data with color of each formation names (using Seaborn)
+    lm = sns.lmplot(data=df, x=column_nphi, y=column_rhob, hue=column_hue,
+                    fit_reg=False, height=figsize[0],
+                    scatter_kws={'s': scatter_size, 'alpha': scatter_alpha})
+
+    ax = lm.axes
+
+    # plot the sand, limestone, and dolomite line (using Seaborn)
+    lines = pd.DataFrame({'ssCnlX': ssCnlX, 'lsX': lsX, 'dolCnlX': dolCnlX,
+                          'denLs': denLs, 'denSs': denSs, 'denDol': denDol})
+
+    sns.lineplot(data=lines, x='ssCnlX', y='denSs', color='blue',
+                     legend=False, marker='o', ax=ax[0,0])
+    sns.lineplot(data=lines, x='lsX', y='denLs', color='black',
+                 legend=False, marker='o', ax=ax[0,0])
+    sns.lineplot(data=lines, x='dolCnlX', y='denDol', color='red',
+                 legend=False, marker='o', ax=ax[0,0])
+
+    plt.title('Neutron-Density Plot', size=20, pad=15)
+    plt.xlim(-0.05, 0.45)
+    plt.ylim(3, 1.9)
+    plt.xlabel('NPHI (v/v)'); plt.ylabel('RHOB (g/cc)')
+
+    plt.show()
+
+
+_CHART_LINES = {}
+
+
+def _nd_chart_lines(denfl):
+  """
+  Sandstone, limestone and dolomite lines of the chart (memoized per fluid
+  density)
+
+  The CNL sandstone and dolomite NPHI are the positive roots of the
+  quadratic charts a*x**2 + b*x + c = phi, solved in closed form for all
+  the porosities at once
+  """
+  if denfl in _CHART_LINES:
+    return _CHART_LINES[denfl]
+
+  import numpy as np
+
+  lsX = np.arange(0, 0.55, 0.05)
+
+  def positive_root(a, b, c):
+    return (-b + np.sqrt(b**2 - 4*a*(c - lsX))) / (2*a)
+
+  ssCnlX = positive_root(0.222, 1.021, 0.039)
+  dolCnlX = positive_root(1.40, 0.389, -0.01259)
+
+  densma_Ls = 2.71; densma_Ss = 2.65; densma_Dol = 2.87 #densma: density matrix
+
+  denLs = (denfl - densma_Ls) * lsX + densma_Ls
+  denSs = (denfl - densma_Ss) * lsX + densma_Ss
+  denDol = (denfl - densma_Dol) * lsX + densma_Dol
+
+  lines = (lsX, ssCnlX, dolCnlX, denLs, denSs, denDol)
+  for line in lines:
+    line.flags.writeable = False
+  _CHART_LINES[denfl] = lines
+
+  return lines
+
+
+def _nd_density(ax, df, column_nphi, column_rhob, column_hue, color_by, bins):
+  """
+  Rasterize the samples of the crossplot (one bincount pass) and draw it
+  """
+  import numpy as np
+  import pandas as pd
+  import seaborn as sns
+  from matplotlib.colors import to_rgb
+
+  x = np.asarray(df[column_nphi], dtype=float)
+  y = np.asarray(df[column_rhob], dtype=float)
+  xlim, ylim = (-0.05, 0.45), (1.9, 3)
+
+  ix = np.floor((x - xlim[0]) / (xlim[1] - xlim[0]) * bins)
+  iy = np.floor((y - ylim[0]) / (ylim[1] - ylim[0]) * bins)
+  inside = (ix >= 0) & (ix < bins) & (iy >= 0) & (iy < bins)
+  pixel = (iy[inside] * bins + ix[inside]).astype(np.int64)
+
+  count = np.bincount(pixel, minlength=bins*bins).astype(float)
+  alpha = np.log1p(count) / max(np.log1p(count.max()), 1e-12)
+  extent = (xlim[0], xlim[1], ylim[1], ylim[0])
+
+  if column_hue is None:
+    image = np.where(count > 0, count, np.nan).reshape(bins, bins)
+    im = ax.imshow(image, extent=extent, origin='upper', aspect='auto',
+                   cmap='viridis', norm='log', interpolation='nearest')
+    ax.figure.colorbar(im, ax=ax, label='Number of samples')
+
+  elif color_by == 'continuous':
+    hue = np.asarray(df[column_hue], dtype=float)[inside]
+    ok = ~np.isnan(hue)
+    total = np.bincount(pixel[ok], weights=hue[ok], minlength=bins*bins)
+    n = np.bincount(pixel[ok], minlength=bins*bins)
+    with np.errstate(invalid='ignore', divide='ignore'):
+      image = (total / n).reshape(bins, bins)
+    im = ax.imshow(image, extent=extent, origin='upper', aspect='auto',
+                   cmap='viridis', interpolation='nearest')
+    im.set_alpha(np.where(n > 0, alpha, 0).reshape(bins, bins))
+    ax.figure.colorbar(im, ax=ax, label=column_hue)
+
+  else:
+    codes, categories = pd.factorize(np.asarray(df[column_hue])[inside], sort=True)
+    ok = codes >= 0
+    ncat = max(len(categories), 1)
+    # samples per (pixel, category) in one pass, then most frequent category
+    per_cat = np.bincount(pixel[ok] * ncat + codes[ok],
+                          minlength=bins*bins*ncat).reshape(bins*bins, ncat)
+    dominant = per_cat.argmax(axis=1)
+    palette = np.array([to_rgb(c) for c in sns.color_palette(n_colors=ncat)])
+    image = np.zeros((bins*bins, 4))
+    image[:,:3] = palette[dominant]
+    image[:,3] = np.where(per_cat.sum(axis=1) > 0, alpha, 0)
+    ax.imshow(image.reshape(bins, bins, 4), extent=extent, origin='upper',
+              aspect='auto', interpolation='nearest')
+    for name, color in zip(categories, palette):
+      ax.scatter([], [], color=color, label=name)
+    ax.legend(title=column_hue, loc='lower right')
@@ -0,0 +1,34 @@
+"""
+Formation evaluation and petrophysical analysis (see README)
+
+  from formation_evaluation import core
+  core.label_generator(df, df_tops, 'DEPTH', 'FM')
+
+  from formation_evaluation import plotting
+  with plotting.theme():
+    plotting.triple_combo(df, ...)
+
+core (labelling, regrid, interpolation, petrophysics, log store) is cheap
+to import: it loads no third-party module (numpy and pandas are imported
+on the first call). The other submodules are only imported when they are
+first accessed, so batch workers never pay for matplotlib.
+"""
+
+__version__ = '0.1.0'
+
+# submodules loaded on first access (formation_evaluation.plotting, ...)
+_SUBMODULES = ['core', 'plotting', 'workflow']
+
+
+def __getattr__(name):
+  if name in _SUBMODULES:
+    import importlib
+
+    module = importlib.import_module(__name__ + '.' + name)
+    globals()[name] = module
+    return module
+  raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
+
+
+def __dir__():
+  return sorted(list(globals()) + _SUBMODULES)
@@ -0,0 +1,236 @@
+from .profiling import instrument
+
+
+@instrument
+def batch_render(wells, layout, output_dir, formats=('png',), n_jobs=None,
+                 dpi=100):
+  """
+  Render log sheets of many wells to files, in parallel and without display
+
+  Input:
+
+  wells is a dict of {well name: dataframe or LAS file path}, or a LogStore
+    (every well of the store is rendered). LAS files are read by the workers
+    with read_las, so only the path is sent to them
+  layout is a dict of the sheet to be rendered. 'kind' is 'triple_combo' or
+    'well_log_display', the other keys are the arguments of that function
+    (except df), for example
+
+    {'kind': 'triple_combo', 'column_depth': 'DEPTH', 'column_GR': 'GR',
+     'column_resistivity': 'RT', 'column_NPHI': 'NPHI', 'column_RHOB': 'RHOB',
+     'min_depth': 2000, 'max_depth': 3000}
+
+    fm_tops and fm_depths of well_log_display can also be dicts of lists
+    per well name
+  output_dir is the directory of the output files, named <well>.<format>
+  formats is the list of file formats, e.g. ['png', 'svg', 'pdf']
+  n_jobs is the number of worker processes. Default is None (all cores).
+    If 1, the wells are rendered in this process
+  dpi is the resolution of the raster files. Default is 100
+
+  Every worker renders on the Agg canvas and creates the figure (axes,
+  twinned axes, grids) once; for every well only the curves are drawn and
+  removed again. A failing well does not stop the others, even if it kills
+  its worker process (see run_isolated).
+
+  Output:
+
+  report is a dataframe with one row per well (in the input order): WELL,
+    SECONDS (render time), FILES (written files) and ERROR (None if ok)
+  """
+  import os
+  import pandas as pd
+
+  os.makedirs(output_dir, exist_ok=True)
+  tasks = list(_well_items(wells))
+
+  if n_jobs == 1:
+    results = [_render_well(name, data, layout, output_dir, formats, dpi)
+               for name, data in tasks]
+  else:
+    results = [None] * len(tasks)
+
+    def done(i, result, error):
+      results[i] = result if error is None else (tasks[i][0], None, [], error)
+
+    run_isolated(_render_well, [(name, data, layout, output_dir, formats, dpi)
+                                for name, data in tasks], done, n_jobs)
+
+  report = pd.DataFrame(results, columns=['WELL', 'SECONDS', 'FILES', 'ERROR'])
+
+  return report
+
+
+def run_isolated(function, tasks, done, n_jobs=None, **pool_kwargs):
+  """
+  Run function(*args) for every args of tasks in a process pool, isolating
+  the failures of every task
+
+  Input:
+
+  function is the (picklable) function run in the workers
+  tasks is the list of argument tuples
+  done is called as done(i, result, error) in the parent for every task i
+    when it finishes, with error None or the text of the failure
+  n_jobs is the number of worker processes. Default is None (all cores)
+  pool_kwargs are passed to ProcessPoolExecutor (mp_context, initializer,
+    initargs)
+
+  The calls profiled in the workers are added to the profiling records.
+  When a worker process dies (crash, out of memory), the pool is broken and
+  all its unfinished tasks fail with it: these are run again one by one,
+  each in a new single-worker pool, so only the task that kills its worker
+  is reported as failed.
+  """
+  import traceback
+  from . import profiling
+  from concurrent.futures import ProcessPoolExecutor, as_completed
+  from concurrent.futures.process import BrokenProcessPool
+
+  settings = profiling.worker_settings()
+
+  def collect(futures, broken):
+    for f in as_completed(futures):
+      i = futures[f]
+      try:
+        result, recorded = f.result()
+      except BrokenProcessPool:
+        broken.append(i)
+        continue
+      except Exception:
+        done(i, None, traceback.format_exc())
+        continue
+      profiling.merge(recorded)
+      done(i, result, None)
+
+  broken = []
+  with ProcessPoolExecutor(max_workers=n_jobs, **pool_kwargs) as pool:
+    collect({pool.submit(profiling.run_recorded, settings, function, *args): i
+             for i, args in enumerate(tasks)}, broken)
+
+  for i in sorted(broken):
+    crashed = []
+    with ProcessPoolExecutor(max_workers=1, **pool_kwargs) as pool:
+      collect({pool.submit(profiling.run_recorded, settings, function,
+                           *tasks[i]): i}, crashed)
+    if crashed:
+      done(i, None, 'The worker process running this task died')
+
+
+def _well_items(wells):
+  """
+  (well name, dataframe or path) pairs of the batch input
+  """
+  from .log_store import LogStore
+
+  if isinstance(wells, LogStore):
+    for name in wells.wells:
+      # send one well, not the view (that would pickle the whole store)
+      yield name, wells.well(name).to_frame()
+  else:
+    items = wells.items() if isinstance(wells, dict) else wells
+    for name, data in items:
+      yield name, data
+
+
+# figure templates of this worker process, one per layout
+_TEMPLATES = {}
+
+
+def _template(layout):
+  """
+  Figure and tracks of layout, created once per worker process
+  """
+  from matplotlib.figure import Figure
+  from .triple_combo import triple_combo_axes
+  from .well_log_display import well_log_axes
+
+  key = repr(sorted((k, repr(v)) for k, v in layout.items()))
+  if key not in _TEMPLATES:
+    kind = layout['kind']
+    if kind == 'triple_combo':
+      fig = Figure(figsize=(8,10))
+      tracks = triple_combo_axes(fig, **_arguments(triple_combo_axes, layout))
+    elif kind == 'well_log_display':
+      fig = Figure(figsize=(20,10))
+      tracks = well_log_axes(fig, **_arguments(well_log_axes, layout))
+    else:
+      raise ValueError("Unknown layout kind '{}'".format(kind))
+    _TEMPLATES[key] = (fig, tracks)
+
+  return _TEMPLATES[key]
+
+
+def _arguments(function, layout, **override):
+  """
+  Keyword arguments of function found in layout
+  """
+  import inspect
+
+  names = inspect.signature(function).parameters
+  kwargs = {k: v for k, v in layout.items() if k in names}
+  kwargs.update(override)
+
+  return kwargs
+
+
+@instrument(plotting=True)
+def _render_well(name, data, layout, output_dir, formats, dpi):
+  """
+  Render one well on the template of layout and save it (in a worker)
+  """
+  import os
+  import time
+  import traceback
+  from .las_reader import read_las
+  from .triple_combo import triple_combo_curves
+  from .well_log_display import well_log_curves
+
+  start = time.perf_counter()
+  files = []
+  drawn = {}
+  try:
+    df = read_las(data) if isinstance(data, str) else data
+    fig, tracks = _template(layout)
+    # children of the empty template: everything else is removed afterwards,
+    # also when the well fails halfway through its curves
+    drawn = {ax: set(ax.get_children()) for ax in fig.axes}
+
+    if layout['kind'] == 'triple_combo':
+      triple_combo_curves(tracks, df, **_arguments(triple_combo_curves, layout))
+    else:
+      per_well = {k: layout[k].get(name) for k in ('fm_tops', 'fm_depths')
+                  if isinstance(layout.get(k), dict)}
+      well_log_curves(tracks, df,
+                      **_arguments(well_log_curves, layout, **per_well))
+
+    fig.suptitle(str(name), size=layout.get('title_size', 15))
+    fig.tight_layout()
+
+    for fmt in formats:
+      filename = os.path.join(output_dir, '{}.{}'.format(_safe_name(name), fmt))
+      fig.savefig(filename, dpi=dpi)
+      files.append(filename)
+    error = None
+  except Exception:
+    error = traceback.format_exc()
+  finally:
+    # leave the template empty for the next well
+    for ax, template in drawn.items():
+      added = [a for a in ax.get_children() if a not in template]
+      for artist in added:
+        artist.remove()
+      if added:
+        ax.relim()
+        ax.autoscale_view()
+
+  return name, time.perf_counter() - start, files, error
+
+
+def _safe_name(name):
+  """
+  Well name usable as file name (e.g. 15/9-F-11 A to 15_9-F-11_A)
+  """
+  import re
+
+  return re.sub(r'[^\w.-]+', '_', str(name)).strip('_') or 'well'
@@ -0,0 +1,17 @@
+"""
+Compute core: labelling, regridding, interpolation, petrophysics and the
+multi-well log store. No plotting, no third-party import at import time
+"""
+
+from .grouping import group_codes
+from .label_generator import label_generator
+from .log_qc import log_qc, nan_coverage
+from .log_store import LogStore, LogView, compact_frame
+from .merge_data_interpolation import (CurveInterpolator, fit_interpolator,
+                                       merge_data_interpolation)
+from .petrophysics import petrophysics
+from .regrid import regrid
+
+__all__ = ['CurveInterpolator', 'LogStore', 'LogView', 'compact_frame',
+           'fit_interpolator', 'group_codes', 'label_generator', 'log_qc',
+           'merge_data_interpolation', 'nan_coverage', 'petrophysics', 'regrid']
@@ -0,0 +1,383 @@
+from .profiling import instrument
+
+
+class CorrelationIndex:
+  """
+  Index of one log (e.g. GR) of many wells for fast well-to-well pattern
+  search (correlation of formation tops)
+
+  Input:
+
+  df is your (multi-well) dataframe (or LogStore)
+  column_depth is the column name of your depth
+  column_log is the column name of the log to be correlated, e.g. 'GR'
+  column_well is the column name of your well names. Default is None (one
+    well)
+  step is the depth step all the wells are resampled to. Default is None
+    (the median depth step of the data)
+
+  Every well is resampled once to the common step (gaps without samples are
+  masked) and the spectrum (FFT) of its log is precomputed. The wells are
+  stored in batches of equal FFT length, so a search correlates a template
+  with all the wells of a batch in one inverse FFT.
+  """
+
+  @instrument
+  def __init__(self, df, column_depth, column_log, column_well=None, step=None):
+    import numpy as np
+    from scipy import fft
+    from .grouping import group_codes
+
+    depth = np.asarray(df[column_depth], dtype=float)
+    values = np.asarray(df[column_log], dtype=float)
+    if column_well is None:
+      codes, names = np.zeros(len(depth), dtype=np.int64), [None]
+    else:
+      codes, names = group_codes(df[column_well])
+    ok = (codes >= 0) & np.isfinite(depth)
+    depth, values, codes = depth[ok], values[ok], codes[ok]
+    # sort by (well, depth), unless already sorted
+    dc, dd = np.diff(codes), np.diff(depth)
+    if not np.all((dc > 0) | ((dc == 0) & (dd >= 0))):
+      order = np.lexsort((depth, codes))
+      depth, values, codes = depth[order], values[order], codes[order]
+    bounds = np.searchsorted(codes, np.arange(len(names) + 1))
+
+    if step is None:
+      gaps = np.diff(depth)[np.diff(codes) == 0]
+      step = float(np.median(gaps[gaps > 0]))
+    self.step = step
+    self.column_log = column_log
+
+    self.wells = []
+    self.start = {}
+    self._data = {}
+    batches = {}
+    for w, name in enumerate(names):
+      d, v = depth[bounds[w]:bounds[w+1]], values[bounds[w]:bounds[w+1]]
+      keep = np.isfinite(v)
+      if keep.sum() < 2:
+        continue
+      x, valid = _resample(d[keep], v[keep], d[0], step)
+      self.wells.append(name)
+      self.start[name] = d[0]
+      # centred (NaN-free) log: the spectrum is computed in float32 without
+      # losing the variations
+      x = np.where(valid, x - x[valid].mean(), 0.).astype(np.float32)
+      self._data[name] = (x, valid)
+      nfft = 1 << int(np.ceil(np.log2(len(x))))
+      batches.setdefault(nfft, []).append(name)
+
+    # spectra of the wells of every batch (one 2D array per FFT length)
+    self._batches = []
+    for nfft, batch in sorted(batches.items()):
+      spectra = np.stack([fft.rfft(self._data[name][0], nfft) for name in batch])
+      self._batches.append((nfft, batch, spectra.astype(np.complex64)))
+
+  def __len__(self):
+    return len(self.wells)
+
+  def template(self, well, top, above, below):
+    """
+    Reference window of well around a pick
+
+    Input:
+
+    well is the reference well
+    top is the depth of the pick (e.g. a formation top)
+    above and below are the lengths of the window above and below the pick
+
+    Output:
+
+    template is the array of the resampled log in the window
+    offset is the position of the pick in template
+    """
+    import numpy as np
+
+    x, valid = self._data[well]
+    a = int(round((top - above - self.start[well]) / self.step))
+    b = int(round((top + below - self.start[well]) / self.step)) + 1
+    if a < 0 or b > len(x):
+      raise ValueError("The window {} to {} is outside well '{}'".format(
+          top - above, top + below, well))
+    template = np.where(valid[a:b], x[a:b], np.nan).astype(float)
+
+    return template, int(round((top - self.start[well]) / self.step)) - a
+
+  @instrument
+  def search(self, template, offset=0, n_candidates=3, min_distance=None,
+             wells=None, dtw=False, stretch=0.2):
+    """
+    Best-matching depths of template in every well
+
+    Input:
+
+    template is the array of log values at the step of the index (see
+      CorrelationIndex.template)
+    offset is the position of the pick in template. Default is 0 (the
+      candidate depths are the tops of the matching windows)
+    n_candidates is the number of candidates per well. Default is 3
+    min_distance is the smallest distance between two candidates of a well.
+      Default is None (the length of template)
+    wells is the LIST of wells searched. Default is None (all wells)
+    dtw is False by default. If True, the candidates are refined by dynamic
+      time warping, allowing the matching interval to be thinner or thicker
+      than the template by the fraction stretch (Default is 0.2), and
+      ranked by the DTW cost
+    stretch is the largest thickness change allowed by dtw
+
+    Normalized cross-correlation (Pearson coefficient of the template and
+    every window of the same length) computed for all positions at once
+    with the precomputed spectra. Windows with gaps are skipped.
+
+    Output:
+
+    df_candidates is a dataframe with WELL, RANK, DEPTH (candidate pick) and
+      SCORE (correlation, 1 is a perfect match), ranked per well. With dtw,
+      also DTW_COST (mean squared difference of the standardized logs along
+      the warping path, lower is better) and STRETCH (thickness ratio)
+    """
+    import numpy as np
+    import pandas as pd
+    from scipy import fft
+
+    t = np.asarray(template, dtype=float)
+    if np.isnan(t).any():
+      t = np.where(np.isnan(t), np.nanmean(t), t)
+    m = len(t)
+    t = t - t.mean()
+    t_norm = np.sqrt(np.sum(t**2))
+    if m < 2 or t_norm == 0:
+      raise ValueError("The template should have at least 2 varying samples")
+    t = t / t_norm
+    min_distance = m if min_distance is None else int(round(min_distance / self.step))
+    selected = None if wells is None else set(wells)
+
+    rows = []
+    for nfft, batch, spectra in self._batches:
+      names = [i for i, name in enumerate(batch) if selected is None or name in selected]
+      if not names:
+        continue
+      # correlation of the template (reversed) with all wells of the batch
+      spectrum = np.conj(fft.rfft(t, nfft)).astype(np.complex64)
+      for chunk in range(0, len(names), 64):
+        index = names[chunk:chunk + 64]
+        corr = fft.irfft(spectra[index] * spectrum, nfft, axis=1)
+        for i, c in zip(index, corr):
+          name = batch[i]
+          scores = _scores(c, *self._data[name], m)
+          for rank, k in enumerate(_peaks(scores, n_candidates, min_distance)):
+            rows.append((name, rank + 1, self.start[name] + (k + offset) * self.step,
+                         scores[k], k))
+
+    df_candidates = pd.DataFrame(rows, columns=['WELL', 'RANK', 'DEPTH', 'SCORE',
+                                                'POSITION'])
+    if dtw and len(df_candidates):
+      df_candidates = self._refine(df_candidates, np.asarray(template, dtype=float),
+                                   offset, stretch)
+
+    return df_candidates.drop(columns='POSITION').reset_index(drop=True)
+
+  def _refine(self, df_candidates, template, offset, stretch):
+    """
+    DTW cost, stretch and pick of every candidate, re-ranked per well
+    """
+    import numpy as np
+
+    m = len(template)
+    pad = int(np.ceil(m * stretch))
+    windows = np.full((len(df_candidates), m + 2 * pad), np.nan)
+    for j, (name, k) in enumerate(zip(df_candidates['WELL'], df_candidates['POSITION'])):
+      x, valid = self._data[name]
+      a, b = max(k - pad, 0), min(k + m + pad, len(x))
+      windows[j, a - (k - pad):b - (k - pad)] = np.where(valid[a:b], x[a:b], np.nan)
+
+    # standardized with the statistics of the correlated window
+    core = windows[:, pad:pad + m]
+    with np.errstate(invalid='ignore', divide='ignore'):
+      std = np.nanstd(core, axis=1, keepdims=True)
+      windows = (windows - np.nanmean(core, axis=1, keepdims=True)) / np.where(std > 0, std, 1)
+    cost, first, last, pick = _dtw(_standardize(template).astype(np.float32), windows,
+                                   offset, stretch)
+
+    origin = df_candidates['POSITION'].to_numpy() - pad
+    names = df_candidates['WELL']
+    # candidates without a path within the stretch keep their correlation pick
+    found = np.isfinite(cost)
+    depth = [self.start[w] + (o + p) * self.step for w, o, p in zip(names, origin, pick)]
+    df_candidates['DEPTH'] = np.where(found, depth, df_candidates['DEPTH'])
+    df_candidates['DTW_COST'] = cost
+    df_candidates['STRETCH'] = np.where(found, (last - first + 1) / m, np.nan)
+    df_candidates = df_candidates.sort_values(['WELL', 'DTW_COST'], kind='stable')
+    df_candidates['RANK'] = df_candidates.groupby('WELL', sort=False,
+                                                  dropna=False).cumcount() + 1
+
+    return df_candidates
+
+
+@instrument
+def correlate_top(index, df_tops, reference_well, top_name, above, below,
+                  **kwargs):
+  """
+  Propagate a formation top of a reference well to all the wells of index
+
+  Input:
+
+  index is the CorrelationIndex of the wells
+  df_tops is the long-format tops table of label_generator (1st column well
+    name, 2nd column label name, 3rd column depth)
+  reference_well is the well whose pick is propagated
+  top_name is the name of the top
+  above and below are the lengths of the log window above and below the
+    pick used as template (e.g. 30 and 30 m)
+  other keyword arguments are passed to CorrelationIndex.search (e.g.
+    n_candidates, dtw)
+
+  Output:
+
+  df_candidates is the dataframe of CorrelationIndex.search for all the other
+    wells, with TOP (top_name) and, where df_tops has the top for the well,
+    PICK (the existing depth) and ERROR (DEPTH - PICK)
+  """
+  import numpy as np
+
+  wells, names, depths = (df_tops.iloc[:,i].values for i in range(3))
+  pick = depths[(wells == reference_well) & (names == top_name)]
+  if len(pick) == 0:
+    raise ValueError("Well '{}' has no top '{}'".format(reference_well, top_name))
+  template, offset = index.template(reference_well, float(pick[0]), above, below)
+  others = kwargs.pop('wells', None) or [w for w in index.wells if w != reference_well]
+
+  df_candidates = index.search(template, offset, wells=others, **kwargs)
+  df_candidates.insert(1, 'TOP', top_name)
+  known = {w: d for w, n, d in zip(wells, names, depths) if n == top_name}
+  df_candidates['PICK'] = np.array([known.get(w, np.nan) for w in df_candidates['WELL']],
+                                   dtype=float)
+  df_candidates['ERROR'] = df_candidates['DEPTH'] - df_candidates['PICK']
+
+  return df_candidates
+
+
+def _resample(depth, values, start, step):
+  """
+  Log resampled to a regular depth step, and the mask of the resampled
+  samples with a data sample closer than one step
+  """
+  import numpy as np
+
+  n = int(np.floor((depth[-1] - start) / step + 1e-9)) + 1
+  grid = start + step * np.arange(n)
+  x = np.interp(grid, depth, values)
+  nearest = np.minimum(np.searchsorted(depth, grid), len(depth) - 1)
+  distance = np.minimum(np.abs(depth[nearest] - grid),
+                        np.abs(depth[np.maximum(nearest - 1, 0)] - grid))
+
+  return x, distance <= step
+
+
+def _scores(corr, x, valid, m):
+  """
+  Pearson coefficient of the (unit, centred) template with every window of
+  length m of x, from the correlation corr (-inf for windows with gaps)
+  """
+  import numpy as np
+
+  n = len(x) - m + 1
+  if n < 1:
+    return np.full(0, -np.inf)
+  xd = x.astype(float)
+  s1 = np.r_[0., np.cumsum(xd)]
+  s2 = np.r_[0., np.cumsum(xd**2)]
+  gaps = np.r_[0, np.cumsum(~valid)]
+  sum1 = s1[m:] - s1[:n]
+  var = (s2[m:] - s2[:n]) - sum1**2 / m
+  with np.errstate(invalid='ignore', divide='ignore'):
+    scores = corr[:n] / np.sqrt(var)
+  scores[(var <= 1e-9 * np.max(var, initial=0)) | (gaps[m:] - gaps[:n] > 0)] = -np.inf
+
+  return np.clip(scores, -1, 1)
+
+
+def _peaks(scores, n_candidates, min_distance):
+  """
+  Positions of the n_candidates best scores, at least min_distance apart
+  """
+  import numpy as np
+
+  inner = scores[1:-1]
+  local = np.flatnonzero((inner >= scores[:-2]) & (inner >= scores[2:])) + 1
+  local = np.r_[[0] if len(scores) else [], local,
+                [len(scores) - 1] if len(scores) > 1 else []].astype(np.int64)
+  local = local[np.isfinite(scores[local])]
+  chosen = []
+  for k in local[np.argsort(-scores[local], kind='stable')]:
+    if all(abs(k - c) >= min_distance for c in chosen):
+      chosen.append(k)
+      if len(chosen) == n_candidates:
+        break
+
+  return chosen
+
+
+def _standardize(x):
+  """
+  Zero mean, unit standard deviation (along the last axis, NaNs ignored)
+  """
+  import numpy as np
+
+  with np.errstate(invalid='ignore', divide='ignore'):
+    mean = np.nanmean(x, axis=-1, keepdims=True)
+    std = np.nanstd(x, axis=-1, keepdims=True)
+    return (x - mean) / np.where(std > 0, std, 1)
+
+
+def _dtw(template, windows, offset, stretch):
+  """
+  Subsequence dynamic time warping of template against many windows at once
+
+  The path may start and end anywhere in the windows. Steps (i-1, j),
+  (i-1, j-1) and (i-1, j-2), so every row only depends on the previous one
+  (vectorized over the windows and the columns). The columns where the path
+  starts and where it crosses the row offset are carried along the path, so
+  no backtracking is needed. Paths whose thickness differs from the
+  template by more than the fraction stretch are rejected.
+
+  Output:
+
+  cost is the mean squared difference along the best path of every window
+  first, last are the first and last columns of the best path
+  pick is the column of the best path at the row offset
+  """
+  import numpy as np
+
+  m = len(template)
+  n, length = windows.shape
+  windows = windows.astype(np.float32)
+  columns = np.broadcast_to(np.arange(length, dtype=np.int32), (n, length))
+  d = np.nan_to_num((windows - template[0])**2, nan=np.inf)
+  # first and pick columns of the paths, packed as first * length + pick
+  path = columns * length + columns
+
+  for i in range(1, m):
+    best, best_path = d, path
+    # predecessors (i-1, j-1) and (i-1, j-2): the arrays shifted right
+    for k in (1, 2):
+      dk = np.full_like(d, np.inf)
+      dk[:, k:] = d[:, :-k]
+      pk = np.zeros_like(path)
+      pk[:, k:] = path[:, :-k]
+      use = dk < best
+      best = np.where(use, dk, best)
+      best_path = np.where(use, pk, best_path)
+    d = best + np.nan_to_num((windows - template[i])**2, nan=np.inf)
+    path = best_path
+    if i == offset:
+      path = path // length * length + columns
+
+  first, pick = np.divmod(path, length)
+  thickness = (columns - first + 1) / m
+  d = np.where(np.abs(thickness - 1) <= stretch + 1e-6, d, np.inf)
+  last = np.argmin(d, axis=1)
+  rows = np.arange(n)
+
+  return d[rows, last] / m, first[rows, last], last, pick[rows, last]
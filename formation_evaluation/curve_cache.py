@@ -0,0 +1,259 @@
+class CurveCache:
+  """
+  Content-addressed cache of derived curves (LRU with a byte budget)
+
+  Input:
+
+  max_bytes is the memory budget of the cache. Default is 256 MB. The least
+    recently used entries are evicted when the budget is exceeded
+  cache_dir is the directory of the disk cache. Default is None (no disk
+    cache). If specified, the evicted entries are spilled to it and loaded
+    back on their next use
+  max_disk_bytes is the budget of the disk cache. Default is 4 GB (least
+    recently used files are removed)
+
+  Pass it as cache= to label_generator, merge_data_interpolation and regrid:
+  the entries are keyed by a hash of the columns these functions read and
+  of their parameters (tops, depth grid, kind, bin edges, ...), so repeated
+  evaluations of the same well and parameters are lookups. Changes of other
+  columns of the dataframe do not invalidate the entries.
+
+  cache.hits, cache.misses, cache.disk_hits and cache.evictions count the
+  lookups, cache.stats() gives them with the memory in use.
+  """
+
+  def __init__(self, max_bytes=256 * 2**20, cache_dir=None,
+               max_disk_bytes=4 * 2**30):
+    from collections import OrderedDict
+
+    self.max_bytes = max_bytes
+    self.cache_dir = cache_dir
+    self.max_disk_bytes = max_disk_bytes
+    self._entries = OrderedDict()
+    self.nbytes = 0
+    self.hits = self.misses = self.disk_hits = self.evictions = 0
+
+  def __len__(self):
+    return len(self._entries)
+
+  def __contains__(self, key):
+    return key in self._entries or (self.cache_dir is not None and
+                                    _exists(self._path(key)))
+
+  def get(self, key):
+    """
+    Cached value of key (None if it is not cached)
+    """
+    if key in self._entries:
+      self._entries.move_to_end(key)
+      self.hits += 1
+      return self._entries[key][0]
+
+    if self.cache_dir is not None:
+      value = _load(self._path(key))
+      if value is not None:
+        self.disk_hits += 1
+        self.put(key, value, spill=False)
+        return value
+
+    self.misses += 1
+    return None
+
+  def put(self, key, value, spill=True):
+    """
+    Cache value under key (evicting least recently used entries)
+    """
+    nbytes = _nbytes(value)
+    if key in self._entries:
+      self.nbytes -= self._entries.pop(key)[1]
+    if nbytes > self.max_bytes:
+      # larger than the whole budget: only on disk
+      if spill and self.cache_dir is not None:
+        self._spill(key, value)
+      return value
+
+    self._entries[key] = (value, nbytes)
+    self.nbytes += nbytes
+    while self.nbytes > self.max_bytes:
+      old_key, (old_value, old_nbytes) = self._entries.popitem(last=False)
+      self.nbytes -= old_nbytes
+      self.evictions += 1
+      if spill and self.cache_dir is not None:
+        self._spill(old_key, old_value)
+
+    return value
+
+  def clear(self, disk=False):
+    """
+    Remove all entries from memory (and from disk if disk is True)
+    """
+    import glob
+    import os
+
+    self._entries.clear()
+    self.nbytes = 0
+    if disk and self.cache_dir is not None:
+      for filename in glob.glob(os.path.join(self.cache_dir, '*.pkl')):
+        os.remove(filename)
+
+  def stats(self):
+    """
+    Dict of the counters and of the memory in use
+    """
+    lookups = self.hits + self.disk_hits + self.misses
+    return {'entries': len(self._entries), 'nbytes': self.nbytes,
+            'max_bytes': self.max_bytes, 'hits': self.hits,
+            'disk_hits': self.disk_hits, 'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.}
+
+  def _path(self, key):
+    import os
+    return os.path.join(self.cache_dir, key + '.pkl')
+
+  def _spill(self, key, value):
+    """
+    Write entry to the disk cache (atomic) and keep it within its budget
+    """
+    import glob
+    import os
+    import pickle
+    import tempfile
+
+    os.makedirs(self.cache_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+      pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, self._path(key))
+
+    files = [(os.stat(f), f) for f in glob.glob(os.path.join(self.cache_dir, '*.pkl'))]
+    total = sum(st.st_size for st, f in files)
+    # least recently used first (_load touches the files it reads)
+    for st, f in sorted(files, key=lambda item: item[0].st_mtime):
+      if total <= self.max_disk_bytes:
+        break
+      os.remove(f)
+      total -= st.st_size
+
+
+def cache_key(name, *parts):
+  """
+  Hash of the name of a function and of its inputs
+
+  Input:
+
+  name is the name of the function
+  parts are its inputs: arrays (hashed by dtype, shape and content), pandas
+    Series, dataframes and index (hashed by their columns), or any value
+    with a stable repr (numbers, strings, tuples, lists, dicts, None)
+
+  Output:
+
+  key is the hex digest (blake2b, 128 bit)
+  """
+  import hashlib
+
+  h = hashlib.blake2b(digest_size=16)
+  h.update(name.encode())
+  for part in parts:
+    _update(h, part)
+
+  return h.hexdigest()
+
+
+_SHARED = {}
+
+
+def shared_cache():
+  """
+  Process-wide CurveCache (created on first use with the default budget)
+  """
+  if 'cache' not in _SHARED:
+    _SHARED['cache'] = CurveCache()
+  return _SHARED['cache']
+
+
+def _update(h, value):
+  """
+  Feed value to the hash h
+  """
+  import numpy as np
+  import pandas as pd
+
+  if isinstance(value, pd.DataFrame):
+    h.update(b'frame')
+    for column in value.columns:
+      _update(h, str(column))
+      _update(h, value[column])
+  elif isinstance(value, (pd.Series, pd.Index)):
+    _update(h, value.array)
+  elif isinstance(value, pd.Categorical):
+    h.update(b'categorical')
+    _update(h, np.asarray(value.categories))
+    _update(h, value.codes)
+  elif isinstance(value, (np.ndarray, pd.api.extensions.ExtensionArray)):
+    array = np.asarray(value)
+    h.update('{}{}'.format(array.dtype, array.shape).encode())
+    if array.dtype == object:
+      # strings (e.g. well names): vectorized hash of every element
+      array = pd.util.hash_array(array.ravel())
+    h.update(np.ascontiguousarray(array).view(np.uint8).data)
+  elif hasattr(value, '__array__') and hasattr(value, '__len__'):
+    # array-like columns, e.g. the DepthAxis of a compact LogStore
+    _update(h, np.asarray(value))
+  elif isinstance(value, (list, tuple)):
+    h.update('{}{}'.format(type(value).__name__, len(value)).encode())
+    for item in value:
+      _update(h, item)
+  elif isinstance(value, dict):
+    h.update('dict{}'.format(len(value)).encode())
+    for k in sorted(value, key=repr):
+      _update(h, k)
+      _update(h, value[k])
+  else:
+    h.update(repr(value).encode())
+  h.update(b'|')
+
+
+def _nbytes(value):
+  """
+  Memory size of a cached value
+  """
+  import sys
+  import numpy as np
+  import pandas as pd
+
+  if isinstance(value, pd.DataFrame):
+    return int(value.memory_usage(deep=True, index=True).sum())
+  if isinstance(value, (pd.Series, pd.Index)):
+    return int(value.memory_usage(deep=True))
+  if isinstance(value, (np.ndarray, pd.Categorical)):
+    return int(value.nbytes)
+  if isinstance(value, (list, tuple)):
+    return sum(_nbytes(v) for v in value)
+  if isinstance(value, dict):
+    return sum(_nbytes(v) for v in value.values())
+  return sys.getsizeof(value)
+
+
+def _exists(path):
+  import os
+  return os.path.exists(path)
+
+
+def _load(path):
+  """
+  Value of a disk cache file (None if missing or unreadable)
+  """
+  import os
+  import pickle
+
+  try:
+    with open(path, 'rb') as f:
+      value = pickle.load(f)
+  except (OSError, EOFError, pickle.UnpicklingError):
+    return None
+  # mark as recently used for the disk budget
+  os.utime(path)
+
+  return value
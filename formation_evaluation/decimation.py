@@ -0,0 +1,201 @@
+from .profiling import instrument
+
+
+@instrument
+def decimate_index(depth, curves, min_depth=None, max_depth=None, n_pixels=1000):
+  """
+  Level-of-detail decimation of depth-track curves (M4 min/max envelope)
+
+  Input:
+
+  depth is the array of depth, ascending
+  curves is the LIST of curve arrays (same length as depth) to be plotted
+  min_depth and max_depth are the depth limits of the plot. Default is None,
+    so the whole depth range is used
+  n_pixels is the vertical resolution of the track in pixels (see
+    pixel_height). Default is 1000
+
+  The samples are first sliced to the depth window (plus one sample on each
+  side, so the curves reach the edge of the track). Then every pixel row
+  keeps only its first, last, minimum and maximum sample of every curve, so
+  spikes are preserved while the number of samples is at most about
+  4 x n_pixels x number of curves.
+
+  Output:
+
+  index is the sorted array of the sample positions to be plotted. The same
+    positions are used for all the curves, so they still share one depth
+    (needed by fill_betweenx)
+  """
+  import numpy as np
+
+  depth = np.asarray(depth, dtype=float)
+  return _window_m4(depth, [np.asarray(c, dtype=float) for c in curves], None,
+                    min_depth, max_depth, n_pixels)
+
+
+@instrument
+def decimate(df, column_depth, column_list, min_depth=None, max_depth=None,
+             n_pixels=1000, pyramid=None):
+  """
+  Decimate columns of dataframe for plotting (see decimate_index)
+
+  Input:
+
+  df is your dataframe (or LogStore view)
+  column_depth is the column name of your depth
+  column_list is the LIST of column names to be plotted
+  min_depth, max_depth and n_pixels are the same as in decimate_index
+  pyramid is the DecimationPyramid of df (same depth and sample order).
+    Default is None, so the samples are decimated from scratch
+
+  Output:
+
+  df_plot is a dict of the decimated arrays of column_depth and column_list,
+    to be indexed like the dataframe by the plotting functions
+  """
+  import numpy as np
+
+  depth = np.asarray(df[column_depth], dtype=float)
+  curves = [np.asarray(df[c]) for c in column_list]
+
+  if pyramid is not None:
+    index = pyramid.query(min_depth, max_depth, n_pixels)
+  else:
+    if len(depth) > 1 and np.any(depth[1:] < depth[:-1]):
+      order = np.argsort(depth, kind='stable')
+      depth, curves = depth[order], [c[order] for c in curves]
+    numerical = [c for c in curves if np.issubdtype(c.dtype, np.number)]
+    index = decimate_index(depth, numerical, min_depth, max_depth, n_pixels)
+
+  df_plot = {column_depth: depth[index]}
+  for c, values in zip(column_list, curves):
+    df_plot[c] = values[index]
+
+  return df_plot
+
+
+@instrument
+def pixel_height(ax):
+  """
+  Vertical resolution (in pixels) of a matplotlib axes
+  """
+  fig = ax.get_figure()
+  height = ax.get_position().height * fig.get_figheight() * fig.dpi
+
+  return max(int(height), 1)
+
+
+class DecimationPyramid:
+  """
+  Precomputed multi-resolution pyramid of depth-track curves, for repeated
+  zoom and pan redraws
+
+  Input:
+
+  depth is the array of depth, ascending
+  curves is the LIST of curve arrays (same length as depth)
+  factor is the smallest block size (in samples of the finer level) of a
+    level. Default is 4
+
+  Every level is the M4 decimation (first, last, minimum and maximum sample
+  of every block) of the level below it, so it keeps the envelope of all
+  the samples with at most half of their number; the levels and their
+  depths are built once. query() searches the depth window in the levels
+  from coarse to fine, picks the finest one with no more than a few samples
+  per pixel in the window and decimates only the window samples, so a
+  redraw costs O(pixels + log(samples)) instead of O(samples).
+
+  Output:
+
+  pyramid.query(min_depth, max_depth, n_pixels) returns the sorted sample
+    positions to be plotted, as decimate_index
+  """
+
+  @instrument
+  def __init__(self, depth, curves, factor=4):
+    import numpy as np
+
+    self.depth = np.asarray(depth, dtype=float)
+    self.curves = [np.asarray(c, dtype=float) for c in curves]
+    # level 0 is all the samples (index None), then (index, depth) per level
+    self.levels = [(None, self.depth)]
+
+    # a block of 2 * (2 + 2 x curves) samples keeps at most half of them
+    block = max(factor, 4 * (1 + len(self.curves)))
+    index, values = np.arange(len(self.depth)), self.curves
+    while len(index) > 2 * block:
+      keep = _m4(values, np.arange(0, len(index), block), len(index))
+      index, values = index[keep], [c[keep] for c in values]
+      self.levels.append((index, self.depth[index]))
+
+  @instrument
+  def query(self, min_depth=None, max_depth=None, n_pixels=1000):
+    import numpy as np
+
+    budget = 4 * n_pixels * max(len(self.curves), 1)
+    chosen = self.levels[-1]
+    # coarse to fine: stop at the first level too dense for the window
+    for index, d in self.levels[::-1]:
+      lo = 0 if min_depth is None else np.searchsorted(d, min_depth, side='left')
+      hi = len(d) if max_depth is None else np.searchsorted(d, max_depth, side='right')
+      if hi - lo > 2 * budget:
+        break
+      chosen = (index, d)
+
+    index, d = chosen
+    return _window_m4(d, self.curves, index, min_depth, max_depth, n_pixels)
+
+
+def _window_m4(d, curves, index, min_depth, max_depth, n_pixels):
+  """
+  Slice candidate sample positions (index, None for all the samples) to
+  depth window, then M4 per pixel row. d is the depth of the candidates
+  """
+  import numpy as np
+
+  lo = 0 if min_depth is None else np.searchsorted(d, min_depth, side='left')
+  hi = len(d) if max_depth is None else np.searchsorted(d, max_depth, side='right')
+  # one more sample on each side, so the curves reach the track edges
+  lo, hi = max(lo - 1, 0), min(hi + 1, len(d))
+  index = np.arange(lo, hi) if index is None else index[lo:hi]
+  d = d[lo:hi]
+
+  if len(index) <= 4 * n_pixels:
+    return index
+
+  top = d[0] if min_depth is None else min_depth
+  base = d[-1] if max_depth is None else max_depth
+  pixel = np.floor((d - top) / max(base - top, 1e-12) * n_pixels)
+  pixel = np.clip(pixel, -1, n_pixels)
+  starts = np.flatnonzero(np.r_[True, pixel[1:] != pixel[:-1]])
+
+  keep = _m4([c[index] for c in curves], starts, len(index))
+
+  return index[keep]
+
+
+def _m4(curves, starts, n):
+  """
+  Positions of first, last, min and max sample of every segment, all curves
+  """
+  import numpy as np
+
+  stops = np.r_[starts[1:], n]
+  seg = np.repeat(np.arange(len(starts)), stops - starts)
+  position = np.arange(n)
+  keep = [starts, stops - 1]
+
+  for c in curves:
+    with np.errstate(invalid='ignore'):
+      for reduce in (np.fmin, np.fmax):
+        extreme = reduce.reduceat(c, starts)
+        hit = c == extreme[seg]
+        first_hit = np.minimum.reduceat(np.where(hit, position, n), starts)
+        keep.append(first_hit[first_hit < n])
+
+  # sorted unique positions, without sorting
+  mask = np.zeros(n, dtype=bool)
+  for k in keep:
+    mask[k] = True
+  return np.flatnonzero(mask)
@@ -0,0 +1,298 @@
+from .profiling import instrument
+
+
+@instrument(plotting=True)
+def stereonet(strikes, dips, max_planes=1000, sigma=3, gridsize=100,
+              resolution=400):
+  """
+  Function to Plot Stereonet of Fracture Data (with polar heatmap)
+
+  Input:
+
+  strikes and dips are the strikes and dips of the fracture planes
+  max_planes is the maximum number of great circles (planes) drawn. Default
+    is 1000. With more picks, an evenly spaced subset of the planes is drawn
+    (all poles are drawn and counted). If None, all planes are drawn
+  sigma and gridsize are the same as in mplstereonet density_contourf
+    (exponential Kamb density). Default is 3 and 100
+  resolution is the number of cells across the equal-area grid the poles
+    are counted on (see density_grid). Default is 400
+  """
+  import numpy as np
+  import matplotlib.pyplot as plt
+  import mplstereonet
+
+  # Visualize stereonets (Schmidt projection)
+  fig = plt.figure(figsize=(10,10))
+
+  # copies: mplstereonet modifies the dips in place
+  strikes = np.array(strikes, dtype=float).ravel()
+  dips = np.array(dips, dtype=float).ravel()
+
+  ax = fig.add_subplot(111, projection='stereonet')
+  ax.pole(strikes, dips, '.', color="black", markersize=10)
+  _planes(ax, strikes, dips, max_planes, '-', color="blue", linewidth=1)
+  lon, lat, density = density_grid(strikes, dips, sigma=sigma, gridsize=gridsize,
+                                   resolution=resolution)
+  ax.contourf(lon, lat, density, cmap='Reds')
+  ax.grid()
+
+@instrument
+def density_grid(strikes, dips, sigma=3, gridsize=100, resolution=400):
+  """
+  Exponential Kamb density of the poles of fracture planes
+
+  Input:
+
+  strikes and dips are the strikes and dips of the fracture planes
+  sigma and gridsize are the same as in mplstereonet density_grid
+  resolution is the number of cells across the equal-area grid. Default is
+    400 (cells of about 0.4 degrees)
+
+  The poles are counted (one bincount pass) on cells of equal area of the
+  lower hemisphere (a square grid of the Lambert equal-area projection),
+  then the kernel is evaluated from the occupied cells to the nearby grid
+  nodes only. The cost is O(n + grid), instead of O(n x grid) of
+  mplstereonet, and the result differs from it by the cell size. For few
+  poles the kernel is evaluated from the poles (exact).
+
+  Output:
+
+  lon, lat, density are 2D arrays of the same form as mplstereonet
+    density_grid, ready for ax.contourf(lon, lat, density)
+  """
+  import numpy as np
+  from mplstereonet import stereonet_math
+
+  # copies: mplstereonet modifies the dips in place
+  strikes = np.array(strikes, dtype=float).ravel()
+  dips = np.array(dips, dtype=float).ravel()
+  lon, lat = stereonet_math.pole(strikes, dips)
+  xyz = np.column_stack(stereonet_math.sph2cart(np.ravel(lon), np.ravel(lat)))
+  xyz = xyz[np.isfinite(xyz).all(axis=1)]
+  n = len(xyz)
+
+  # counts of the poles in the equal-area cells (only used if there are
+  # fewer occupied cells than poles, otherwise the poles are exact)
+  centers = _cell_centers(resolution)
+  counts = np.bincount(_cell_index(xyz, resolution), minlength=len(centers))
+  occupied = np.flatnonzero(counts)
+  if len(occupied) < n:
+    points, weight = centers[occupied], counts[occupied]
+  else:
+    points, weight = xyz, np.ones(n)
+
+  node_lon, node_lat, nodes, node_tree = _grid_nodes(gridsize)
+
+  # exponential Kamb kernel (Vollmer, 1995), as in mplstereonet
+  f = 2 * (1.0 + n / sigma**2)
+  units = np.sqrt(n * (f / 2.0 - 1) / f**2)
+
+  if f <= 30 or len(points) * len(nodes) <= 20000000:
+    # wide kernel or few points: all the nodes from all the points
+    cos_dist = np.abs(nodes @ points.T)
+    totals = np.exp(f * (cos_dist - 1)) @ weight
+  else:
+    from scipy.spatial import cKDTree
+    # only the nodes closer than the chord where the kernel is exp(-30). The
+    # poles are axial, so a point also counts from its antipode
+    radius = np.sqrt(2 * 30 / f)
+    points, weight = np.vstack([points, -points]), np.r_[weight, weight]
+    pairs = node_tree.sparse_distance_matrix(cKDTree(points), radius,
+                                             output_type='ndarray')
+    cos_dist = np.abs(np.einsum('ij,ij->i', nodes[pairs['i']], points[pairs['j']]))
+    kernel = weight[pairs['j']] * np.exp(f * (cos_dist - 1))
+    totals = np.bincount(pairs['i'], weights=kernel, minlength=len(nodes))
+  totals = (totals - 0.5) / units
+  totals[totals < 0] = 0
+  totals[totals == 0] = np.finfo(totals.dtype).tiny
+
+  return node_lon, node_lat, totals.reshape(node_lon.shape)
+
+
+# equal-area cell centers and grid nodes, per resolution and gridsize
+_CELLS = {}
+_NODES = {}
+
+
+def _lambert(xyz):
+  """
+  Lambert equal-area projection of the (axial) unit vectors, centred on the
+  lower hemisphere (x axis of mplstereonet)
+  """
+  import numpy as np
+
+  xyz = np.where(xyz[:,:1] < 0, -xyz, xyz)
+  k = np.sqrt(2 / (1 + xyz[:,0]))
+
+  return k * xyz[:,1], k * xyz[:,2]
+
+
+def _cell_index(xyz, resolution):
+  """
+  Equal-area cell of every unit vector
+  """
+  import numpy as np
+
+  u, w = _lambert(xyz)
+  size = 2 * np.sqrt(2) / resolution
+  iu = np.clip(((u + np.sqrt(2)) / size).astype(np.int64), 0, resolution - 1)
+  iw = np.clip(((w + np.sqrt(2)) / size).astype(np.int64), 0, resolution - 1)
+
+  return iw * resolution + iu
+
+
+def _cell_centers(resolution):
+  """
+  Unit vectors of the centers of the equal-area cells (cached)
+  """
+  if resolution not in _CELLS:
+    import numpy as np
+
+    size = 2 * np.sqrt(2) / resolution
+    c = -np.sqrt(2) + size * (np.arange(resolution) + 0.5)
+    w, u = [a.ravel() for a in np.meshgrid(c, c, indexing='ij')]
+    # cells on the rim: center moved inside the projection of the hemisphere
+    rho = np.maximum(np.hypot(u, w) / np.sqrt(2), 1)
+    u, w = u / rho, w / rho
+    r2 = u**2 + w**2
+    s = np.sqrt(np.maximum(1 - r2 / 4, 0))
+    centers = np.column_stack([1 - r2 / 2, u * s, w * s])
+    centers.flags.writeable = False
+    _CELLS[resolution] = centers
+
+  return _CELLS[resolution]
+
+
+def _grid_nodes(gridsize):
+  """
+  Grid nodes of mplstereonet density_grid and their KD-tree (cached)
+  """
+  if gridsize not in _NODES:
+    import numpy as np
+    from scipy.spatial import cKDTree
+    from mplstereonet import stereonet_math
+
+    bound = np.pi / 2.0
+    lon, lat = np.mgrid[-bound : bound : gridsize * 1j, -bound : bound : gridsize * 1j]
+    nodes = np.column_stack(stereonet_math.sph2cart(lon.ravel(), lat.ravel()))
+    node_lon, node_lat = stereonet_math.cart2sph(*nodes.T)
+    _NODES[gridsize] = (node_lon.reshape(lon.shape), node_lat.reshape(lat.shape),
+                        nodes, cKDTree(nodes))
+
+  return _NODES[gridsize]
+
+
+def _planes(ax, strikes, dips, max_planes, *args, **kwargs):
+  """
+  Draw the great circles of (at most max_planes) planes as one line
+  """
+  import numpy as np
+  from mplstereonet import stereonet_math
+
+  strikes = np.array(strikes, dtype=float).ravel()
+  dips = np.array(dips, dtype=float).ravel()
+  if max_planes is not None and len(strikes) > max_planes:
+    keep = np.linspace(0, len(strikes) - 1, max_planes).round().astype(int)
+    strikes, dips = strikes[keep], dips[keep]
+
+  lon, lat = stereonet_math.plane(strikes, dips)
+  # one NaN-separated line instead of one line per plane
+  gap = np.full((1, lon.shape[1]), np.nan)
+  lon = np.vstack([lon, gap]).ravel(order='F')
+  lat = np.vstack([lat, gap]).ravel(order='F')
+
+  return ax.plot(lon, lat, *args, **kwargs)
+
+@instrument
+def rose_histogram(strikes, groups=None, bin_width=10):
+  """
+  Mirrored strike histograms of the rose diagram, for many groups at once
+
+  Input:
+
+  strikes is the array of strikes
+  groups is the array of the group of every strike, e.g. well names or depth
+    intervals (pd.cut of the depths). Default is None (one group)
+  bin_width is the width of the bins in degrees. Default is 10. It should
+    divide 180
+
+  Output:
+
+  angles is the array of the bin centers (0 to 360, step bin_width)
+  counts is the array of the number of strikes per group (rows) and bin
+    (columns). Strikes 180 degrees apart are counted in the same bin, so
+    the diagram is mirrored
+  names is the list of the groups (None if groups is None)
+  """
+  import numpy as np
+  from .grouping import group_codes
+
+  strikes = np.asarray(strikes, dtype=float)
+  half = 180 // bin_width
+  if groups is None:
+    codes, names = np.zeros(len(strikes), dtype=np.int64), None
+  else:
+    codes, names = group_codes(groups)
+    names = list(names)
+  ngroups = 1 if names is None else len(names)
+
+  ok = np.isfinite(strikes) & (codes >= 0)
+  # bins centered on 0, bin_width, ... (the bin of 0 also takes 355 to 360)
+  bins = (np.mod(strikes[ok] + bin_width / 2, 180) // bin_width).astype(np.int64)
+  counts = np.bincount(codes[ok] * half + bins,
+                       minlength=ngroups * half).reshape(ngroups, half)
+  counts = np.concatenate([counts, counts], axis=1)
+
+  return np.arange(0, 360, bin_width), counts, names
+
+@instrument(plotting=True)
+def rose(strikes, groups=None, ncols=4):
+  """
+  Function to Plot Rose Diagram of Fracture Data
+
+  NOTE: Source code originally by Bruno Ruas de Pinho
+        Website: http://geologyandpython.com/structural_geology.html
+        Function is made by author to interface user to that source code
+
+  Input:
+
+  strikes is the array of strikes
+  groups is the array of the group of every strike (e.g. well names or depth
+    intervals). Default is None (one diagram). Otherwise one diagram per
+    group is drawn, and the histograms of all groups are counted in one pass
+  ncols is the number of diagrams per row when groups is given. Default is 4
+  """
+  import numpy as np
+  import matplotlib.pyplot as plt
+  import mplstereonet
+
+  # calculate the number of strikes every 10 degree, mirrored (0-180° and
+  # 180-360°) to achieve the behavior of Rose Diagrams
+  angles, counts, names = rose_histogram(strikes, groups, bin_width=10)
+
+  if names is None:
+    fig = plt.figure(figsize=(10,10))
+    axes = [fig.add_subplot(projection='polar')]
+  else:
+    nrows = int(np.ceil(len(names) / ncols))
+    fig = plt.figure(figsize=(5 * min(ncols, len(names)), 5 * nrows))
+    axes = [fig.add_subplot(nrows, ncols, i + 1, projection='polar')
+            for i in range(len(names))]
+
+  for i, ax in enumerate(axes):
+    two_halves = counts[i]
+    ax.bar(np.deg2rad(angles), two_halves,
+          width=np.deg2rad(10), bottom=0.0, color='green', edgecolor='k')
+    ax.set_theta_zero_location('N')
+    ax.set_theta_direction(-1)
+    ax.set_thetagrids(angles, labels=angles)
+    # at most about 10 radial grid labels, even for large pick sets
+    step = max(2, int(np.ceil(two_halves.max() / 10)))
+    ax.set_rgrids(np.arange(1, two_halves.max() + 1, step), angle=0, weight= 'black')
+    if names is None:
+      ax.set_title('Rose Diagram', y=1.10, fontsize=15)
+    else:
+      ax.set_title(str(names[i]), y=1.10, fontsize=15)
+
+  fig.show()
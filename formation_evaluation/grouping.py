@@ -0,0 +1,23 @@
+def group_codes(values):
+  """
+  Integer codes of labels (well names, formation names, ...)
+
+  Input:
+
+  values is the array (or column) of labels. Categorical labels are free
+    (their codes and categories are used as they are)
+
+  Output:
+
+  codes is the integer array of the label of every sample (-1 for missing
+    labels)
+  names is the array of label names, names[codes] gives the labels back
+  """
+  import numpy as np
+  import pandas as pd
+
+  if isinstance(values, pd.Series):
+    values = values.array
+  if isinstance(values, pd.Categorical):
+    return values.codes, values.categories
+  return pd.factorize(np.asarray(values))
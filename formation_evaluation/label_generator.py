@@ -0,0 +1,89 @@
+from .profiling import instrument
+
+
+@instrument
+def label_generator(df_well, df_tops, column_depth, label_name, column_well=None,
+                    cache=None):
+  """
+  Generate Formation (or other) Labels to Well Dataframe
+  (useful for machine learning and EDA purpose)
+
+  Input:
+
+  df_well is your well dataframe (that originally doesn't have the intended label)
+    It can also be a LogStore (or a view of it)
+  df_tops is your label dataframe (this dataframe should ONLY have 2 columns)
+    1st column is the label name (e.g. formation top names)
+    2nd column is the depth of each label name
+
+  column_depth is the name of depth column on your df_well dataframe
+  label_name is the name of label that you want to produce (e.g. FM. LABEL)
+
+  column_well is the name of well column on your df_well dataframe. Default is
+    None (df_well is a single well). If specified, df_well can contain many
+    wells and df_tops is a long-format table that should have 3 columns
+    1st column is the well name
+    2nd column is the label name
+    3rd column is the depth of each label name
+
+  cache is a CurveCache (see curve_cache). Default is None (no cache). If
+    specified, a call with the same depths (and wells) and the same tops as
+    a previous call is a lookup
+
+  Output:
+
+  df_well is your dataframe that now has the labels (e.g. FM. LABEL) as a
+    pandas Categorical. Each sample takes the name of the deepest top above
+    (or at) its depth, samples above the first top are NaN. The label
+    column is added in place, other columns are left untouched
+  """
+  import numpy as np
+  import pandas as pd
+
+  if cache is not None:
+    from .curve_cache import cache_key
+    key = cache_key('label_generator', df_well[column_depth], df_tops,
+                    None if column_well is None else df_well[column_well])
+    labels = cache.get(key)
+    if labels is not None:
+      df_well[label_name] = labels.copy()
+      return df_well
+
+  if column_well is None:
+    fm_tops = df_tops.iloc[:,0].values
+    fm_depths = np.asarray(df_tops.iloc[:,1].values, dtype=float)
+    tops_wells = np.zeros(len(fm_depths), dtype=np.int64)
+    well_codes = np.zeros(len(df_well), dtype=np.int64)
+  else:
+    fm_tops = df_tops.iloc[:,1].values
+    fm_depths = np.asarray(df_tops.iloc[:,2].values, dtype=float)
+    tops_wells, wells = pd.factorize(df_tops.iloc[:,0])
+    # wells without tops get code -1
+    well_codes = pd.Index(wells).get_indexer(np.asarray(df_well[column_well]))
+
+  depth = np.asarray(df_well[column_depth], dtype=float)
+
+  # sort tops by (well, depth) and turn them into one monotonic search key
+  order = np.lexsort((fm_depths, tops_wells))
+  fm_tops, fm_depths, tops_wells = fm_tops[order], fm_depths[order], tops_wells[order]
+  label_codes, label_names = pd.factorize(fm_tops)
+
+  dmin = np.nanmin(np.r_[fm_depths, depth, 0.])
+  span = np.nanmax(np.r_[fm_depths, depth, 0.]) - dmin + 1.
+  tops_key = tops_wells * span + (fm_depths - dmin)
+  well_key = well_codes * span + (depth - dmin)
+
+  # index of the deepest top above (or at) each sample, in one search
+  index = np.searchsorted(tops_key, well_key, side='right') - 1
+  first_top = np.searchsorted(tops_wells, well_codes, side='left')
+  inside = (index >= first_top) & (well_codes >= 0) & ~np.isnan(depth)
+
+  codes = np.full(len(df_well), -1, dtype=label_codes.dtype)
+  codes[inside] = label_codes[index[inside]]
+
+  labels = pd.Categorical.from_codes(codes, categories=label_names)
+  if cache is not None:
+    cache.put(key, labels)
+  df_well[label_name] = labels
+
+  return df_well
@@ -0,0 +1,196 @@
+from .profiling import instrument
+
+
+@instrument
+def read_las(filename, use_cache=True, cache_dir=None, return_header=False):
+  """
+  Read LAS 2.0 file into dataframe (with on-disk columnar cache)
+
+  Input:
+
+  filename is the path of your LAS file
+  use_cache is True by default. On the first read the data is written to a
+    binary columnar cache (.npy with a .json header) keyed by the file path,
+    modification time and size. The next reads of the same (unchanged) file
+    are memory-mapped from the cache instead of parsing the text again
+    (copy-on-write: the dataframe can be edited in place like a parsed one,
+    the edits never reach the cache)
+  cache_dir is the directory of the cache. Default is None, so the cache is
+    written in ~/.cache/formation-evaluation/las
+  return_header is False by default. If True, the header is also returned
+
+  Output:
+
+  df is the dataframe of the ~A section, one column per curve (the depth is
+    a column, not the index), so that it can be directly passed to
+    well_log_display, triple_combo, label_generator, etc. NULL values are NaN
+  header (only if return_header=True) is a dict of the header sections
+    'version', 'well', 'curve' and 'parameter', each a dict of
+    {mnemonic: {'unit', 'value', 'descr'}}, and 'other' (text)
+  """
+  import os
+
+  if not use_cache:
+    df, header = _parse_las(filename)
+  else:
+    npy, meta = _cache_paths(filename, cache_dir)
+    if os.path.exists(npy) and os.path.exists(meta):
+      df, header = _load_cache(npy, meta)
+    else:
+      df, header = _parse_las(filename)
+      _write_cache(df, header, npy, meta)
+
+  if return_header:
+    return df, header
+  return df
+
+
+def _parse_las(filename):
+  """
+  Parse header and ~A section of LAS file
+  """
+  import io
+  import numpy as np
+  import pandas as pd
+
+  sections = {'v': 'version', 'w': 'well', 'c': 'curve', 'p': 'parameter'}
+  header = {'version': {}, 'well': {}, 'curve': {}, 'parameter': {}, 'other': ''}
+
+  with open(filename, 'r', errors='replace') as f:
+    section = None
+    for line in f:
+      stripped = line.strip()
+      if stripped.startswith('~'):
+        section = stripped[1:2].lower()
+        if section == 'a':
+          break
+        continue
+      if not stripped or stripped.startswith('#'):
+        continue
+      if section == 'o':
+        header['other'] += line
+      elif section in sections:
+        mnemonic, item = _parse_header_line(stripped)
+        header[sections[section]][mnemonic] = item
+    data = f.read()
+
+  curves = _unique_names(list(header['curve'].keys()))
+  null = header['well'].get('NULL', {}).get('value', '')
+  wrap = header['version'].get('WRAP', {}).get('value', 'NO').upper()
+
+  if wrap == 'YES':
+    # wrapped lines: the data is just the values in curve order
+    values = np.array(data.split(), dtype=float).reshape(-1, len(curves))
+    df = pd.DataFrame(values, columns=curves)
+  else:
+    df = pd.read_csv(io.StringIO(data), sep=r'\s+', header=None, names=curves,
+                     comment='#')
+
+  # NULL values to NaN, in one pass over the numerical curves
+  numerical = [c for c in curves if pd.api.types.is_numeric_dtype(df[c])]
+  values = df[numerical].to_numpy(dtype=float)
+  try:
+    values[values == float(null)] = np.nan
+  except ValueError:
+    pass
+  df[numerical] = values
+
+  return df, header
+
+
+def _parse_header_line(line):
+  """
+  Split 'MNEM.UNIT  VALUE : DESCRIPTION' header line
+  """
+  mnemonic, _, rest = line.partition('.')
+  if rest[:1].isspace() or not rest:
+    unit = ''
+  else:
+    unit, _, rest = rest.partition(' ')
+  value, _, descr = rest.rpartition(':')
+  if not _:
+    value, descr = rest, ''
+
+  return mnemonic.strip(), {'unit': unit.strip(), 'value': value.strip(),
+                            'descr': descr.strip()}
+
+
+def _unique_names(names):
+  """
+  Make repeated curve mnemonics unique (GR, GR:1, GR:2, ...)
+  """
+  seen = {}
+  unique = []
+  for name in names:
+    if name in seen:
+      seen[name] += 1
+      unique.append('{}:{}'.format(name, seen[name]))
+    else:
+      seen[name] = 0
+      unique.append(name)
+
+  return unique
+
+
+def _cache_paths(filename, cache_dir=None):
+  """
+  Cache file names keyed by absolute path, mtime and size of LAS file
+  """
+  import hashlib
+  import os
+
+  if cache_dir is None:
+    cache_dir = os.path.join(os.path.expanduser('~'), '.cache',
+                             'formation-evaluation', 'las')
+  stat = os.stat(filename)
+  key = '{}|{}|{}'.format(os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
+  key = hashlib.sha1(key.encode()).hexdigest()
+  base = os.path.join(cache_dir, key)
+
+  return base + '.npy', base + '.json'
+
+
+def _write_cache(df, header, npy, meta):
+  """
+  Write numerical curves to .npy and header (plus text curves) to .json
+  """
+  import json
+  import os
+  import numpy as np
+  import pandas as pd
+
+  os.makedirs(os.path.dirname(npy), exist_ok=True)
+  numerical = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+  text = {c: df[c].astype(object).where(df[c].notna(), None).tolist()
+          for c in df.columns if c not in numerical}
+
+  # write to temporary files first, so an interrupted write is never read
+  with open(npy + '.tmp', 'wb') as f:
+    np.save(f, df[numerical].to_numpy(dtype=float))
+  with open(meta + '.tmp', 'w') as f:
+    json.dump({'columns': list(df.columns), 'numerical': numerical,
+               'text': text, 'header': header}, f)
+  os.replace(npy + '.tmp', npy)
+  os.replace(meta + '.tmp', meta)
+
+
+def _load_cache(npy, meta):
+  """
+  Memory-map cached curves back to dataframe
+  """
+  import json
+  import numpy as np
+  import pandas as pd
+
+  with open(meta, 'r') as f:
+    meta = json.load(f)
+  # copy-on-write: the frame is writable, edits never reach the cache
+  values = np.load(npy, mmap_mode='c')
+
+  df = pd.DataFrame(values, columns=meta['numerical'], copy=False)
+  if meta['text']:
+    for c, v in meta['text'].items():
+      df[c] = v
+    df = df[meta['columns']]
+
+  return df, meta['header']
@@ -0,0 +1,361 @@
+from .profiling import instrument
+
+# bits of the QC flags (a sample can have several)
+SPIKE = 1
+FLATLINE = 2
+OUT_OF_RANGE = 4
+WASHOUT = 8
+MISSING = 16
+
+# physical ranges of common curves, used when ranges is not given
+RANGES = {'GR': (0, 400), 'RHOB': (1.0, 3.2), 'NPHI': (-0.15, 1.0),
+          'RT': (0.01, 100000), 'RDEP': (0.01, 100000), 'RMED': (0.01, 100000),
+          'ILD': (0.01, 100000), 'CALI': (2, 40), 'DT': (30, 250),
+          'PEF': (0, 20), 'SP': (-500, 500)}
+
+
+@instrument
+def log_qc(df, column_list, column_well=None, ranges=None, window=11,
+           threshold=5, flat_length=20, flat_tolerance=0., column_caliper=None,
+           bit_size=None, washout=1.0, washout_list=('RHOB', 'NPHI'),
+           despike=None):
+  """
+  Quality control flags of log curves (many wells at once)
+
+  Input:
+
+  df is your (multi-well) dataframe (or LogStore), the samples of every
+    well in depth order
+  column_list is the LIST of column names of the curves to be checked
+  column_well is the column name of your well names. Default is None (one
+    well). The windows and runs never cross two wells
+  ranges is a dict of {column: (min, max)} of the valid values. Default is
+    None (RANGES, for the curves named there)
+  window is the number of samples of the rolling median. Default is 11
+  threshold is the spike threshold, in robust standard deviations (1.4826
+    MAD) of the rolling window. Default is 5
+  flat_length is the smallest number of samples of a flatline (constant
+    value within flat_tolerance). Default is 20
+  flat_tolerance is the largest change between samples of a flatline.
+    Default is 0
+  column_caliper is the column name of your caliper. Default is None (no
+    washout flags)
+  bit_size is the bit size (number, or column name e.g. 'BS'). Default is
+    None (the median caliper of every well)
+  washout is the caliper enlargement over bit size flagged as washout, in
+    the caliper unit. Default is 1.0 (inch)
+  washout_list is the LIST of curves affected by washouts. Default is RHOB
+    and NPHI
+  despike is None by default (flags only). If 'nan' or 'median', the spikes
+    of the curves of df are replaced by NaN or by the rolling median (in
+    place)
+
+  Every curve is checked in one vectorized pass: the rolling median and MAD
+  of all the samples are computed at once (the windows are sorted), the
+  flatlines are found from the run lengths of the sample differences.
+
+  Output:
+
+  df_flags is a dataframe with one uint8 column per curve (same names and
+    index as df). Every value is the sum of the flags of the sample:
+    SPIKE (1), FLATLINE (2), OUT_OF_RANGE (4), WASHOUT (8), MISSING (16).
+    Pass it as qc_flags to well_log_display or triple_combo, e.g.
+    df_flags & SPIKE > 0 is the boolean array of the spikes
+  """
+  import numpy as np
+  import pandas as pd
+  from .grouping import group_codes
+
+  ranges = RANGES if ranges is None else ranges
+  n = len(df)
+  if column_well is None:
+    codes = np.zeros(n, dtype=np.int64)
+  else:
+    codes = group_codes(df[column_well])[0]
+  # samples grouped by well (stable: the depth order is kept)
+  order = np.argsort(codes, kind='stable')
+  grouped = np.all(order[1:] > order[:-1])
+  codes_s = codes if grouped else codes[order]
+
+  flags = {}
+  for c in column_list:
+    x = np.asarray(df[c], dtype=float)
+    x_s = x if grouped else x[order]
+    f = np.zeros(n, dtype=np.uint8)
+    missing = np.isnan(x_s)
+    f[missing] = MISSING
+
+    median, mad = _rolling_median_mad(x_s, codes_s, window)
+    # floor of the scale: 1% of the spread of the curve in the well (flat windows)
+    spread = _group_median(np.abs(x_s - _group_median(x_s, codes_s)), codes_s)
+    with np.errstate(invalid='ignore'):
+      scale = np.maximum(1.4826 * mad, 0.01 * 1.4826 * spread)
+    with np.errstate(invalid='ignore'):
+      spike = np.abs(x_s - median) > threshold * scale
+    spike &= scale > 0
+    f[spike] |= SPIKE
+
+    f[_flatlines(x_s, codes_s, flat_length, flat_tolerance)] |= FLATLINE
+
+    if c in ranges:
+      low, high = ranges[c]
+      with np.errstate(invalid='ignore'):
+        f[(x_s < low) | (x_s > high)] |= OUT_OF_RANGE
+
+    if despike is not None and spike.any():
+      clean = x_s.copy()
+      clean[spike] = np.nan if despike == 'nan' else median[spike]
+      if not grouped:
+        clean = clean[np.argsort(order)]
+      df[c] = clean
+
+    flags[c] = f if grouped else f[np.argsort(order)]
+
+  if column_caliper is not None:
+    washed = _washouts(df, codes, column_caliper, bit_size, washout)
+    for c in washout_list:
+      if c in flags:
+        flags[c][washed] |= WASHOUT
+
+  index = df.index if isinstance(df, pd.DataFrame) else None
+  return pd.DataFrame(flags, index=index)
+
+
+@instrument
+def nan_coverage(df, column_list, column_well=None, column_label=None):
+  """
+  Fraction of non-NaN samples of the curves per well and formation
+
+  Input:
+
+  df is your (multi-well) dataframe (or LogStore)
+  column_list is the LIST of column names of the curves
+  column_well is the column name of your well names. Default is None (one
+    well)
+  column_label is the column name of your formation labels (e.g. from
+    label_generator). Default is None (whole wells)
+
+  Output:
+
+  df_coverage is a dataframe indexed by WELL (and FORMATION), with SAMPLES
+    (number of samples) and the coverage (0 to 1) of every curve
+  """
+  import numpy as np
+  import pandas as pd
+  from .grouping import group_codes
+
+  keys, index = [], []
+  for column, name in [(column_well, 'WELL'), (column_label, 'FORMATION')]:
+    if column is not None:
+      codes, names = group_codes(df[column])
+      keys.append((codes, list(names)))
+      index.append(name)
+  if not keys:
+    keys, index = [(np.zeros(len(df), dtype=np.int64), [None])], ['WELL']
+
+  # one combined key of (well, formation); samples without a name are left out
+  key = np.zeros(len(df), dtype=np.int64)
+  ok = np.ones(len(df), dtype=bool)
+  for codes, names in keys:
+    key = key * len(names) + codes
+    ok &= codes >= 0
+  size = int(np.prod([len(names) for codes, names in keys]))
+
+  out = {'SAMPLES': np.bincount(key[ok], minlength=size)}
+  for c in column_list:
+    valid = ~np.isnan(np.asarray(df[c], dtype=float))
+    out[c] = np.bincount(key[ok], weights=valid[ok], minlength=size)
+  present = out['SAMPLES'] > 0
+
+  labels = pd.MultiIndex.from_product([names for codes, names in keys], names=index)
+  df_coverage = pd.DataFrame(out, index=labels)[present]
+  for c in column_list:
+    df_coverage[c] = df_coverage[c] / df_coverage['SAMPLES']
+  if len(index) == 1:
+    df_coverage.index = df_coverage.index.get_level_values(0)
+
+  return df_coverage
+
+
+@instrument(plotting=True)
+def qc_overlay(ax, df, column_depth, column, flags, min_depth=None,
+               max_depth=None):
+  """
+  Mark the flagged samples of a curve on its track
+
+  Input:
+
+  ax is the track (axes) of the curve
+  df is your dataframe, column_depth and column are the column names of
+    the depth and of the curve
+  flags is the QC flags of the curve (a column of log_qc). A Series with
+    the index of df is used as it is; otherwise it is matched to the
+    samples of df by index, so the flags of the whole field can be used for
+    a well of it. If the index of the field has duplicates (e.g. wells
+    concatenated without ignore_index), select the flags with the same mask
+    as the well. An array must have one value per sample
+  min_depth and max_depth are the depth limits. Default is None (all)
+
+  Spikes, flatlines and out-of-range samples are marked on the curve,
+  washouts and missing samples as bars at the right and left edge of the
+  track.
+
+  Output:
+
+  artists is the list of the drawn artists
+  """
+  import numpy as np
+  import pandas as pd
+  from matplotlib.transforms import blended_transform_factory
+
+  if isinstance(flags, pd.Series) and isinstance(df, pd.DataFrame):
+    if flags.index.equals(df.index):
+      flags = flags.to_numpy()
+    elif flags.index.is_unique:
+      flags = flags.reindex(df.index, fill_value=0)
+    else:
+      raise ValueError("The QC flags of '{}' cannot be matched to df by index: "
+                       "their index has duplicates. Select the flags with the "
+                       "same mask as df, e.g. df_flags[df_field[column_well] == "
+                       "well]".format(column))
+  flags = np.asarray(flags)
+  if len(flags) != len(df):
+    raise ValueError("The QC flags of '{}' have {} samples, df has {}. Pass the "
+                     "flags as a Series (matched by index) or one per sample of df"
+                     .format(column, len(flags), len(df)))
+  depth = np.asarray(df[column_depth], dtype=float)
+  inside = flags > 0
+  if min_depth is not None:
+    inside &= depth >= min_depth
+  if max_depth is not None:
+    inside &= depth <= max_depth
+  index = np.flatnonzero(inside)
+  if len(index) == 0:
+    return []
+  x = np.asarray(df[column], dtype=float)[index]
+  depth, flags = depth[index], flags[index]
+
+  artists = []
+  # worst flag of every sample on the curve: out of range, spike, flatline
+  for bit, style in [(FLATLINE, dict(color='orange', marker='|')),
+                     (SPIKE, dict(color='red', marker='x')),
+                     (OUT_OF_RANGE, dict(color='magenta', marker='o', mfc='none'))]:
+    mark = flags & bit > 0
+    if mark.any():
+      artists += ax.plot(x[mark], depth[mark], linestyle='none', markersize=4,
+                         **style)
+  edge = blended_transform_factory(ax.transAxes, ax.transData)
+  for bit, position, color in [(MISSING, 0.02, 'gray'), (WASHOUT, 0.98, 'brown')]:
+    mark = flags & bit > 0
+    if mark.any():
+      artists += ax.plot(np.full(mark.sum(), position), depth[mark], linestyle='none',
+                         marker='_', markersize=8, color=color, transform=edge)
+
+  return artists
+
+
+def _rolling_median_mad(x, codes, window, chunk_size=200000):
+  """
+  Centred rolling median and MAD of x (windows within each well, NaNs
+  ignored), computed on sorted windows, chunk by chunk
+  """
+  import numpy as np
+
+  n = len(x)
+  half = window // 2
+  offsets = np.arange(-half, half + 1)
+  median = np.full(n, np.nan)
+  mad = np.full(n, np.nan)
+  for start in range(0, n, chunk_size):
+    i = np.arange(start, min(start + chunk_size, n))
+    index = np.clip(i[:,None] + offsets, 0, n - 1)
+    w = x[index]
+    # samples of another well are out of the window
+    w[codes[index] != codes[i][:,None]] = np.nan
+    median[i] = _row_median(w)
+    mad[i] = _row_median(np.abs(w - median[i][:,None]))
+
+  return median, mad
+
+
+def _row_median(w):
+  """
+  Median of every row of w, NaNs ignored (NaN for empty rows)
+  """
+  import numpy as np
+
+  w = np.sort(w, axis=1)
+  count = np.sum(~np.isnan(w), axis=1)
+  lo = np.maximum(count - 1, 0) // 2
+  hi = count // 2
+  rows = np.arange(len(w))
+  hi = np.minimum(hi, w.shape[1] - 1)
+  median = 0.5 * (w[rows, lo] + w[rows, hi])
+  median[count == 0] = np.nan
+
+  return median
+
+
+def _flatlines(x, codes, flat_length, tolerance):
+  """
+  Samples of runs of at least flat_length constant samples (within a well)
+  """
+  import numpy as np
+
+  n = len(x)
+  if n < 2:
+    return np.zeros(n, dtype=bool)
+  with np.errstate(invalid='ignore'):
+    same = (np.abs(np.diff(x)) <= tolerance) & (codes[1:] == codes[:-1])
+  # runs of True in same: sample k joins sample k+1
+  edges = np.diff(np.r_[0, same.astype(np.int8), 0])
+  starts, stops = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+  # a run of m True differences spans m + 1 samples
+  long = (stops - starts + 1) >= flat_length
+  flat = np.zeros(n + 1, dtype=np.int64)
+  np.add.at(flat, starts[long], 1)
+  np.add.at(flat, stops[long] + 1, -1)
+
+  return np.cumsum(flat[:n]) > 0
+
+
+def _washouts(df, codes, column_caliper, bit_size, washout):
+  """
+  Samples where the caliper exceeds the bit size by more than washout
+  """
+  import numpy as np
+
+  caliper = np.asarray(df[column_caliper], dtype=float)
+  if isinstance(bit_size, str):
+    bit = np.asarray(df[bit_size], dtype=float)
+  elif bit_size is not None:
+    bit = np.full(len(caliper), float(bit_size))
+  else:
+    # gauge hole of every well: median caliper of the well
+    bit = _group_median(caliper, codes)
+
+  with np.errstate(invalid='ignore'):
+    return caliper - bit > washout
+
+
+def _group_median(values, codes):
+  """
+  Median of values (NaNs ignored) of the well (code) of every sample
+  """
+  import numpy as np
+
+  order = np.argsort(codes, kind='stable')
+  grouped = np.all(order[1:] > order[:-1])
+  v, c = (values, codes) if grouped else (values[order], codes[order])
+  # one median per contiguous run of a well
+  starts = np.flatnonzero(np.r_[True, c[1:] != c[:-1]])
+  stops = np.r_[starts[1:], len(c)]
+  median = np.full(len(starts), np.nan)
+  for i, (a, b) in enumerate(zip(starts, stops)):
+    x = v[a:b]
+    x = x[~np.isnan(x)]
+    if len(x):
+      median[i] = np.median(x)
+  median = np.repeat(median, stops - starts)
+
+  return median if grouped else median[np.argsort(order)]
@@ -0,0 +1,270 @@
+from .profiling import instrument
+
+
+@instrument
+def log_statistics(df, column_well, column_label, column_list,
+                   percentiles=(5, 95), accuracy=0.01):
+  """
+  Statistics of every (well, formation, curve) in one grouped pass
+
+  Input:
+
+  df is your (multi-well) dataframe, labelled with label_generator
+  column_well is the column name of your well names
+  column_label is the column name of your formation labels
+  column_list is the LIST of curve names (e.g. ['GR', 'SP'])
+  percentiles is the LIST of percentiles. Default is (5, 95), the usual
+    clean and clay endpoints
+  accuracy is the relative accuracy of the percentiles. Default is 0.01
+
+  Output:
+
+  df_stats is a dataframe indexed by (WELL, FORMATION, CURVE) with COUNT
+    (non-NaN samples), NAN_FRACTION (NaN coverage), MIN, MAX, MEAN and the
+    percentiles P5, P95, etc. Use LogStatistics to keep the statistics and
+    update them when wells are added or replaced
+  """
+  stats = LogStatistics(column_well, column_label, column_list,
+                        percentiles=percentiles, accuracy=accuracy)
+  stats.update(df)
+
+  return stats.summary()
+
+
+class LogStatistics:
+  """
+  Per well, formation and curve statistics with incremental updates
+
+  Input:
+
+  column_well, column_label, column_list, percentiles and accuracy are the
+    same as in log_statistics
+
+  stats.update(df) adds the wells of df (or replaces them, if they are
+  already in the statistics); the other wells are not rescanned.
+  stats.remove(wells) removes wells.
+  stats.summary(by) gives the statistics grouped by any of 'WELL',
+  'FORMATION' and 'CURVE' (e.g. by=['FORMATION', 'CURVE'] for field-wide
+  endpoints per formation).
+  stats.save(path) and LogStatistics.load(path) persist the statistics.
+
+  The exact count, NaN count, sum, min and max are kept per group. The
+  percentiles come from a mergeable log-bucketed sketch (counts of samples in
+  buckets of relative width accuracy), so groups merge by adding counts and
+  percentiles are within about accuracy (relative) of the exact ones.
+  """
+
+  COLUMNS = ['WELL', 'FORMATION', 'CURVE', 'COUNT', 'NAN', 'SUM', 'MIN', 'MAX']
+  SKETCH_COLUMNS = ['WELL', 'FORMATION', 'CURVE', 'BUCKET', 'COUNT']
+
+  def __init__(self, column_well, column_label, column_list,
+               percentiles=(5, 95), accuracy=0.01):
+    import pandas as pd
+
+    self.column_well = column_well
+    self.column_label = column_label
+    self.column_list = list(column_list)
+    self.percentiles = list(percentiles)
+    self.accuracy = accuracy
+    self.table = pd.DataFrame(columns=self.COLUMNS)
+    self.sketch = pd.DataFrame(columns=self.SKETCH_COLUMNS)
+
+  @instrument
+  def update(self, df):
+    """
+    Add (or replace) the wells of df
+    """
+    import numpy as np
+    import pandas as pd
+    from .grouping import group_codes
+
+    well_codes, well_names = group_codes(df[self.column_well])
+    fm_codes, fm_names = group_codes(df[self.column_label])
+    nfm = len(fm_names)
+    # wells of df (not the unused categories of a categorical well column)
+    wells = list(np.asarray(well_names)[np.unique(well_codes[well_codes >= 0])])
+
+    # sort once by (well, formation), samples without label are left out
+    key = np.where((well_codes >= 0) & (fm_codes >= 0),
+                   well_codes.astype(np.int64) * nfm + fm_codes, -1)
+    order = np.argsort(key, kind='stable')
+    order = order[key[order] >= 0]
+    key = key[order]
+    if len(key) == 0:
+      self.remove(wells)
+      return self
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(key)]))
+    group_well = np.asarray(well_names)[key[starts] // nfm]
+    group_fm = np.asarray(fm_names)[key[starts] % nfm]
+
+    tables, sketches = [], []
+    for curve in self.column_list:
+      values = np.asarray(df[curve], dtype=float)[order]
+      isnan = np.isnan(values)
+      with np.errstate(invalid='ignore'):
+        tables.append(pd.DataFrame({
+            'WELL': group_well, 'FORMATION': group_fm, 'CURVE': curve,
+            'COUNT': np.add.reduceat(~isnan, starts, dtype=np.int64),
+            'NAN': np.add.reduceat(isnan, starts, dtype=np.int64),
+            'SUM': np.add.reduceat(np.where(isnan, 0., values), starts),
+            'MIN': np.fmin.reduceat(values, starts),
+            'MAX': np.fmax.reduceat(values, starts)}))
+
+      # sketch: number of samples per (group, bucket)
+      bucket = _bucket(values[~isnan], self.accuracy)
+      pair, count = np.unique(group[~isnan] * (4 * _OFFSET) + bucket + 2 * _OFFSET,
+                              return_counts=True)
+      pair_group = pair // (4 * _OFFSET)
+      sketches.append(pd.DataFrame({
+          'WELL': group_well[pair_group], 'FORMATION': group_fm[pair_group],
+          'CURVE': curve, 'BUCKET': pair % (4 * _OFFSET) - 2 * _OFFSET,
+          'COUNT': count}))
+
+    self.remove(wells)
+    self.table = _concat([self.table] + tables, self.COLUMNS)
+    self.sketch = _concat([self.sketch] + sketches, self.SKETCH_COLUMNS)
+
+    return self
+
+  def remove(self, wells):
+    """
+    Remove wells from the statistics
+    """
+    self.table = self.table[~self.table['WELL'].isin(wells)].reset_index(drop=True)
+    self.sketch = self.sketch[~self.sketch['WELL'].isin(wells)].reset_index(drop=True)
+
+    return self
+
+  @instrument
+  def summary(self, by=('WELL', 'FORMATION', 'CURVE')):
+    """
+    Statistics grouped by any of 'WELL', 'FORMATION' and 'CURVE'
+    """
+    import numpy as np
+
+    by = list(by)
+    grouped = self.table.groupby(by, sort=True, observed=True)
+    df_stats = grouped.agg(COUNT=('COUNT', 'sum'), NAN=('NAN', 'sum'),
+                           SUM=('SUM', 'sum'), MIN=('MIN', 'min'),
+                           MAX=('MAX', 'max'))
+    with np.errstate(invalid='ignore', divide='ignore'):
+      df_stats['NAN_FRACTION'] = df_stats['NAN'] / (df_stats['COUNT'] + df_stats['NAN'])
+      df_stats['MEAN'] = df_stats['SUM'] / df_stats['COUNT']
+    df_stats = df_stats[['COUNT', 'NAN_FRACTION', 'MIN', 'MAX', 'MEAN']].astype(
+        {'COUNT': np.int64})
+
+    # merge the sketches of the groups (add counts of the same bucket)
+    sketch = self.sketch.groupby(by + ['BUCKET'], sort=True, observed=True)['COUNT'].sum()
+    sketch = sketch.reset_index()
+    for q in self.percentiles:
+      name = 'P{:g}'.format(q)
+      df_stats[name] = _sketch_quantile(sketch, by, q / 100, self.accuracy).reindex(df_stats.index)
+      # the sketch value is within accuracy; keep it inside the exact range
+      df_stats[name] = df_stats[name].clip(df_stats['MIN'], df_stats['MAX'])
+
+    return df_stats
+
+  def save(self, path):
+    """
+    Save the statistics to directory path
+    """
+    import json
+    import os
+
+    os.makedirs(path, exist_ok=True)
+    self.table.to_csv(os.path.join(path, 'table.csv'), index=False)
+    self.sketch.to_csv(os.path.join(path, 'sketch.csv'), index=False)
+    with open(os.path.join(path, 'settings.json'), 'w') as f:
+      json.dump({'column_well': self.column_well,
+                 'column_label': self.column_label,
+                 'column_list': self.column_list,
+                 'percentiles': self.percentiles,
+                 'accuracy': self.accuracy}, f)
+
+  @classmethod
+  def load(cls, path):
+    """
+    Load the statistics saved with save
+    """
+    import json
+    import os
+    import pandas as pd
+
+    with open(os.path.join(path, 'settings.json'), 'r') as f:
+      stats = cls(**json.load(f))
+    stats.table = pd.read_csv(os.path.join(path, 'table.csv'),
+                              float_precision='round_trip')
+    stats.sketch = pd.read_csv(os.path.join(path, 'sketch.csv'),
+                               float_precision='round_trip')
+
+    return stats
+
+
+# bucket offset, so that the buckets of positive values are > 0
+_OFFSET = 1 << 20
+
+
+def _bucket(values, accuracy):
+  """
+  Signed log bucket of every value (0 for values close to zero)
+  """
+  import numpy as np
+
+  gamma = (1 + accuracy) / (1 - accuracy)
+  magnitude = np.abs(values)
+  tiny = magnitude < 1e-12
+  with np.errstate(divide='ignore'):
+    k = np.ceil(np.log(np.where(tiny, 1., magnitude)) / np.log(gamma)).astype(np.int64)
+  bucket = np.sign(values).astype(np.int64) * (k + _OFFSET)
+  bucket[tiny] = 0
+
+  return bucket
+
+
+def _bucket_value(bucket, accuracy):
+  """
+  Representative value of bucket (relative error at most accuracy)
+  """
+  import numpy as np
+
+  gamma = (1 + accuracy) / (1 - accuracy)
+  k = np.abs(bucket) - _OFFSET
+  value = np.sign(bucket) * 2 * gamma ** k.astype(float) / (gamma + 1)
+
+  return np.where(bucket == 0, 0., value)
+
+
+def _sketch_quantile(sketch, by, q, accuracy):
+  """
+  Quantile q of every group of the merged sketch, in one vectorized pass
+  """
+  import numpy as np
+  import pandas as pd
+
+  value = _bucket_value(sketch['BUCKET'].to_numpy(), accuracy)
+  group = sketch.groupby(by, sort=True, observed=True).ngroup().to_numpy()
+  order = np.lexsort((value, group))
+  group, value = group[order], value[order]
+  count = sketch['COUNT'].to_numpy()[order]
+
+  cumulative = np.cumsum(count)
+  n = np.bincount(group, weights=count)
+  before = np.r_[0, np.cumsum(n)[:-1]]
+  rank = before + np.floor(q * (n - 1))
+  index = np.searchsorted(cumulative, rank, side='right')
+
+  keys = sketch.groupby(by, sort=True, observed=True).size().index
+  return pd.Series(value[np.minimum(index, len(value) - 1)], index=keys)
+
+
+def _concat(frames, columns):
+  """
+  Concatenate non-empty frames (keeping the columns of empty results)
+  """
+  import pandas as pd
+
+  frames = [f for f in frames if len(f)]
+  if not frames:
+    return pd.DataFrame(columns=columns)
+  return pd.concat(frames, ignore_index=True)
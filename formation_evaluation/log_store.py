@@ -0,0 +1,434 @@
+from .profiling import instrument
+
+
+class LogStore:
+  """
+  Depth-indexed multi-well log store
+
+  Input:
+
+  df is your (multi-well) dataframe
+  column_depth is the column name of your depth
+  column_well is the column name of your well names. Default is None (single
+    well, its name is None)
+  column_label is the column name of your formation labels (e.g. the output
+    of label_generator). Default is None. It can also be added later by
+    assigning the column, e.g. with label_generator(store, ...)
+  compact is False by default. If True, the store keeps float curves as
+    float32, text columns (well names, labels) as categoricals, and the
+    depth of every regularly sampled well as its start and step only (see
+    DepthAxis). store.memory_usage() reports the footprint
+
+  The samples are sorted ONCE by (well, depth) and kept as one contiguous
+  array per column. The start and stop of every well and of every formation
+  interval are precomputed, so that
+
+  store.well(w)                  all samples of well w
+  store.window(w, top, base)     samples of well w with top <= depth <= base
+  store.formation(w, fm)         samples of well w labelled fm
+
+  are found in O(1) (well, formation) or O(log n) (window) and return a
+  LogView, i.e. zero-copy array views of every column.
+
+  The store itself and its views can be indexed by column name like a
+  dataframe (store['GR'] is the array of GR), so they can be passed as df to
+  triple_combo, well_log_display, regrid and label_generator
+  """
+
+  @instrument
+  def __init__(self, df, column_depth, column_well=None, column_label=None,
+               compact=False):
+    import numpy as np
+    import pandas as pd
+
+    self.column_depth = column_depth
+    self.column_well = column_well
+    self.column_label = column_label
+    self.compact = compact
+
+    depth = np.asarray(df[column_depth], dtype=float)
+    if column_well is None:
+      well_codes = np.zeros(len(depth), dtype=np.int64)
+      self.wells = [None]
+    else:
+      well_codes, wells = pd.factorize(df[column_well], sort=True)
+      self.wells = list(wells)
+
+    # sort once by (well, depth); skip the reordering if already sorted
+    order = np.lexsort((depth, well_codes))
+    if np.all(order[1:] > order[:-1]):
+      order = None
+
+    self._columns = {}
+    for c in df.columns:
+      values = df[c].array if isinstance(df[c].dtype, pd.CategoricalDtype) else df[c].to_numpy()
+      if compact and c != column_depth:
+        values = _compact_values(values)
+      self._columns[c] = values if order is None else values.take(order)
+
+    well_codes = well_codes if order is None else well_codes[order]
+    starts = np.searchsorted(well_codes, np.arange(len(self.wells)), side='left')
+    stops = np.searchsorted(well_codes, np.arange(len(self.wells)), side='right')
+    self._offsets = {w: (int(a), int(b)) for w, a, b in zip(self.wells, starts, stops)}
+    self._intervals = None
+
+    if compact:
+      self._columns[column_depth] = DepthAxis(self._columns[column_depth],
+                                              np.r_[starts, len(depth)])
+
+  @property
+  def float_dtype(self):
+    """
+    dtype of the new float columns written by the functions (float32 if
+    compact, otherwise None, i.e. float64)
+    """
+    import numpy as np
+    return np.float32 if self.compact else None
+
+  def memory_usage(self):
+    """
+    Bytes of every column of the store (as DataFrame.memory_usage)
+    """
+    import pandas as pd
+
+    return pd.Series({c: _nbytes(v) for c, v in self._columns.items()})
+
+  def __len__(self):
+    return len(self._columns[self.column_depth])
+
+  def __contains__(self, column):
+    return column in self._columns
+
+  def __getitem__(self, column):
+    return self._columns[column]
+
+  def __setitem__(self, column, values):
+    import numpy as np
+    import pandas as pd
+
+    if not isinstance(values, pd.Categorical):
+      values = np.asarray(values)
+    if self.compact:
+      values = _compact_values(values)
+    if len(values) != len(self):
+      raise ValueError("Column '{}' has {} samples, the store has {}".format(
+          column, len(values), len(self)))
+    self._columns[column] = values
+    if column == self.column_label:
+      self._intervals = None
+
+  def keys(self):
+    return self._columns.keys()
+
+  @property
+  def columns(self):
+    return list(self._columns.keys())
+
+  @instrument
+  def well(self, well):
+    """
+    All samples of well (view)
+    """
+    start, stop = self._offsets[well]
+    return LogView(self, start, stop)
+
+  @instrument
+  def window(self, well, top, base):
+    """
+    Samples of well with top <= depth <= base (view), found by binary search
+    """
+    import numpy as np
+
+    start, stop = self._offsets[well]
+    depth = self._columns[self.column_depth]
+    if isinstance(depth, DepthAxis):
+      a = start + depth.searchsorted(top, start, stop, side='left')
+      b = start + depth.searchsorted(base, start, stop, side='right')
+    else:
+      a = start + np.searchsorted(depth[start:stop], top, side='left')
+      b = start + np.searchsorted(depth[start:stop], base, side='right')
+    return LogView(self, int(a), int(b))
+
+  @instrument
+  def formation(self, well, fm):
+    """
+    Samples of well labelled fm. A view if fm is one contiguous interval
+    (always the case for label_generator output), otherwise the intervals
+    are concatenated (copy)
+    """
+    intervals = self.intervals(well).get(fm, [])
+    if len(intervals) == 0:
+      start, _ = self._offsets[well]
+      return LogView(self, start, start)
+    if len(intervals) == 1:
+      return LogView(self, *intervals[0])
+    return LogView(self, intervals=intervals)
+
+  def intervals(self, well):
+    """
+    Dict of {formation: [(start, stop), ...]} sample intervals of well
+    """
+    if self.column_label is None or self.column_label not in self._columns:
+      raise ValueError("The store has no formation label column")
+    if self._intervals is None:
+      self._intervals = self._formation_intervals()
+    return self._intervals.get(well, {})
+
+  def _formation_intervals(self):
+    """
+    Run-length boundaries of the label column inside every well
+    """
+    import numpy as np
+    import pandas as pd
+
+    labels = self._columns[self.column_label]
+    if isinstance(labels, pd.Categorical):
+      codes, names = labels.codes, labels.categories
+    else:
+      codes, names = pd.factorize(labels)
+
+    intervals = {}
+    for w, (start, stop) in self._offsets.items():
+      c = codes[start:stop]
+      change = np.flatnonzero(c[1:] != c[:-1]) + 1
+      run_starts = np.r_[0, change]
+      run_stops = np.r_[change, len(c)]
+      fms = intervals.setdefault(w, {})
+      for a, b in zip(run_starts, run_stops):
+        if b > a and c[a] >= 0:
+          fms.setdefault(names[c[a]], []).append((start + int(a), start + int(b)))
+
+    return intervals
+
+  @instrument
+  def to_frame(self):
+    """
+    Dataframe of the whole store (copy)
+    """
+    import numpy as np
+    import pandas as pd
+
+    return pd.DataFrame({c: np.asarray(v) if isinstance(v, DepthAxis) else v
+                         for c, v in self._columns.items()})
+
+
+class LogView:
+  """
+  Samples of LogStore between two positions, as views of the store arrays.
+  Indexed by column name like a dataframe; to_frame() gives a dataframe
+  """
+
+  def __init__(self, store, start=0, stop=0, intervals=None):
+    self.store = store
+    self.start, self.stop = start, stop
+    self.intervals = intervals
+    self._added = {}
+
+  def __len__(self):
+    if self.intervals is not None:
+      return sum(b - a for a, b in self.intervals)
+    return self.stop - self.start
+
+  def __contains__(self, column):
+    return column in self._added or column in self.store
+
+  def __getitem__(self, column):
+    if column in self._added:
+      return self._added[column]
+    values = self.store[column]
+    if self.intervals is not None:
+      import numpy as np
+      index = np.concatenate([np.arange(a, b) for a, b in self.intervals])
+      return values.take(index)
+    return values[self.start:self.stop]
+
+  def __setitem__(self, column, values):
+    # new columns stay on the view, the store is left untouched
+    self._added[column] = values
+
+  def keys(self):
+    return list(self.store.keys()) + [c for c in self._added if c not in self.store]
+
+  @property
+  def float_dtype(self):
+    return self.store.float_dtype
+
+  @property
+  def columns(self):
+    return self.keys()
+
+  @instrument
+  def to_frame(self):
+    """
+    Dataframe of the view (copy)
+    """
+    import numpy as np
+    import pandas as pd
+
+    return pd.DataFrame({c: np.asarray(self[c]) if isinstance(self[c], DepthAxis)
+                         else self[c] for c in self.keys()})
+
+
+class DepthAxis:
+  """
+  Depth column of a compact LogStore: start and step of every regularly
+  sampled well, the samples only for the irregular ones
+
+  Input:
+
+  depth is the array of depth, sorted by (well, depth)
+  offsets is the array of the first sample of every well (and the number of
+    samples at the end)
+  tolerance is the largest depth error allowed for a well to be regular, as
+    a fraction of its step. Default is 0.01
+
+  Slicing (store['DEPTH'][a:b]), take and np.asarray give float64 depths,
+  computed on demand for the requested samples only.
+  """
+
+  def __init__(self, depth, offsets, tolerance=0.01):
+    import numpy as np
+
+    depth = np.asarray(depth, dtype=float)
+    self.offsets = np.asarray(offsets, dtype=np.int64)
+    n = np.diff(self.offsets)
+    self.start = np.full(len(n), np.nan)
+    self.step = np.zeros(len(n))
+    self.irregular = np.zeros(len(n), dtype=bool)
+    samples = []
+    for w, (a, b) in enumerate(zip(self.offsets[:-1], self.offsets[1:])):
+      if b == a:
+        continue
+      d = depth[a:b]
+      self.start[w] = d[0]
+      self.step[w] = (d[-1] - d[0]) / max(b - a - 1, 1)
+      error = np.abs(d - (d[0] + self.step[w] * np.arange(b - a)))
+      if not np.all(error <= tolerance * abs(self.step[w])):
+        self.irregular[w] = True
+        samples.append(d)
+    # depths of the irregular wells, one after the other
+    self.samples = np.concatenate(samples) if samples else np.zeros(0)
+    self.sample_offsets = np.r_[0, np.cumsum(np.where(self.irregular, n, 0))[:-1]]
+
+  def __len__(self):
+    return int(self.offsets[-1])
+
+  def __getitem__(self, index):
+    import numpy as np
+
+    if isinstance(index, slice):
+      index = np.arange(*index.indices(len(self)))
+    return self.take(index)
+
+  def take(self, index):
+    """
+    Depths of the sample positions index
+    """
+    import numpy as np
+
+    index = np.asarray(index, dtype=np.int64)
+    w = np.searchsorted(self.offsets, index, side='right') - 1
+    position = index - self.offsets[w]
+    depth = self.start[w] + self.step[w] * position
+    irregular = self.irregular[w]
+    if irregular.any():
+      depth[irregular] = self.samples[self.sample_offsets[w[irregular]] +
+                                      position[irregular]]
+    return depth
+
+  def searchsorted(self, value, start, stop, side='left'):
+    """
+    np.searchsorted(self[start:stop], value, side) of the samples of one
+    well, without computing its depths (start and stop are its offsets)
+    """
+    import math
+    import numpy as np
+
+    w = int(np.searchsorted(self.offsets, start, side='right')) - 1
+    n = stop - start
+    if n == 0:
+      return 0
+    if self.irregular[w]:
+      a = self.sample_offsets[w]
+      return int(np.searchsorted(self.samples[a:a + n], value, side=side))
+    if self.step[w] <= 0 or math.isnan(value):
+      return int(np.searchsorted(self[start:stop], value, side=side))
+
+    def before(k):
+      # sample k is left of the insertion point
+      d = self.start[w] + self.step[w] * k
+      return d < value if side == 'left' else d <= value
+
+    k = int(np.clip(np.floor((value - self.start[w]) / self.step[w]), 0, n))
+    # the formula can be one sample off by rounding: same test as take()
+    while k > 0 and not before(k - 1):
+      k -= 1
+    while k < n and before(k):
+      k += 1
+    return k
+
+  def __array__(self, dtype=None, copy=None):
+    import numpy as np
+
+    depth = self.take(np.arange(len(self)))
+    return depth if dtype is None else depth.astype(dtype)
+
+  @property
+  def nbytes(self):
+    return (self.offsets.nbytes + self.start.nbytes + self.step.nbytes +
+            self.irregular.nbytes + self.samples.nbytes +
+            self.sample_offsets.nbytes)
+
+
+def compact_frame(df, column_list=None):
+  """
+  Compact copy of dataframe: float curves as float32 and text columns (well
+  names, formation labels) as categoricals
+
+  Input:
+
+  df is your dataframe
+  column_list is the LIST of columns to be compacted. Default is None (all
+    columns; keep the depth out of it if it needs float64 precision)
+
+  Output:
+
+  df_compact is the compact dataframe. Compare df.memory_usage(deep=True)
+    of both for the footprint
+  """
+  import pandas as pd
+
+  columns = df.columns if column_list is None else column_list
+  df_compact = df.copy(deep=False)
+  for c in columns:
+    df_compact[c] = _compact_values(df[c].array if isinstance(
+        df[c].dtype, pd.CategoricalDtype) else df[c].to_numpy())
+
+  return df_compact
+
+
+def _compact_values(values):
+  """
+  float32 copy of float arrays, categorical of text arrays, others as they are
+  """
+  import numpy as np
+  import pandas as pd
+
+  if isinstance(values, pd.Categorical):
+    return values
+  if values.dtype.kind == 'f' and values.dtype.itemsize > 4:
+    return values.astype(np.float32)
+  if values.dtype.kind in 'OUS' or isinstance(values.dtype, pd.StringDtype):
+    return pd.Categorical(values)
+  return values
+
+
+def _nbytes(values):
+  """
+  Bytes of a column (deep, for text)
+  """
+  import pandas as pd
+
+  if isinstance(values, DepthAxis):
+    return values.nbytes
+  return int(pd.Series(values, copy=False).memory_usage(deep=True, index=False))
@@ -0,0 +1,266 @@
+from .profiling import instrument
+
+
+@instrument
+def merge_data_interpolation(df_data, df_new, xdata, ydata, xnew, kind="cubic",
+                             out_of_range=("extrapolate", "nan"),
+                             column_well=None, dtype=None, interpolator=None,
+                             cache=None):
+  """
+  Merging two data by interpolation
+
+  INPUT:
+
+  df_data: Data source for interpolation
+  df_new: Data where its values are to be interpolated
+  xdata: The x column name in df_data. This value MUST exist in BOTH dataframes
+    above. Usually it is the DEPTH.
+  ydata: The y column name in df_data. This value will be the TARGET for interp.
+    Must be in LIST, for example: ["TVD"] or ["TVD", "GR", "RHOB"]
+  xnew: The x column name in df_new
+  kind: "linear" or "cubic" (default). Curves (or wells) with fewer than 4
+    points are interpolated linearly, with a warning
+  out_of_range: What to do with xnew outside the range of xdata. Either
+    "extrapolate", "nan" or "clip" (hold the end value), or a tuple of two
+    of them (above the first xdata, below the last xdata), or a dict with
+    one of those per ydata column. Default extrapolates above the first
+    xdata and gives NaN below the last xdata
+  column_well: The well column name in BOTH dataframes. Default is None (one
+    well). If specified, every well is interpolated on its own data
+  dtype: Output dtype of the interpolated columns, e.g. np.float32 to halve
+    memory. Default is None (float64, or float32 if df_new is a compact
+    LogStore)
+  interpolator: Interpolator already fitted with fit_interpolator (or a dict
+    of them per well if column_well is specified). Default is None, the
+    interpolator is fitted on df_data. Reuse it for repeated queries on the
+    same data, e.g. MD to TVD lookups from one survey
+  cache: CurveCache (see curve_cache). Default is None (no cache). If
+    specified, a call with the same xdata, ydata, xnew (and well) columns
+    and the same kind, out_of_range and dtype is a lookup
+
+  THEORY:
+
+  f(x1, x2, x3, ..., xi) = y1, y2, y3, ..., yi
+  f is the interpolation function. f is applied to a new x value to produce new y
+  f(xn) = yn
+
+  OUTPUT:
+
+  df: It is the df_new, but now contains the newly interpolated y values. If
+    df_new is a LogStore (or a view of it), the columns are added to it
+    without copying it
+  """
+  import numpy as np
+
+  if dtype is None:
+    dtype = getattr(df_new, 'float_dtype', None)
+  key = None
+  if cache is not None and interpolator is None:
+    from .curve_cache import cache_key
+    wells = [] if column_well is None else [column_well]
+    key = cache_key('merge_data_interpolation', df_data[[xdata] + list(ydata) + wells],
+                    [df_new[c] for c in [xnew] + wells], kind, out_of_range, dtype)
+    yn = cache.get(key)
+    if yn is not None:
+      return _with_columns(df_new, ydata, yn.copy())
+
+  if interpolator is None:
+    interpolator = fit_interpolator(df_data, xdata, ydata, kind=kind,
+                                    out_of_range=out_of_range,
+                                    column_well=column_well, dtype=dtype)
+
+  xn = np.asarray(df_new[xnew], dtype=float)
+  if column_well is None:
+    yn = interpolator(xn)
+  else:
+    from .grouping import group_codes
+
+    yn = np.full((len(xn), len(ydata)), np.nan, dtype=dtype or float)
+    # rows of every well from one stable sort of the well codes
+    codes, wells = group_codes(df_new[column_well])
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(wells) + 1))
+    for i, well in enumerate(wells):
+      f = interpolator.get(well)
+      rows = order[bounds[i]:bounds[i+1]]
+      if f is not None and len(rows):
+        yn[rows] = f(xn[rows])
+
+  if key is not None:
+    cache.put(key, yn)
+
+  return _with_columns(df_new, ydata, yn)
+
+
+def _with_columns(df_new, ydata, yn):
+  """
+  Copy of df_new with the interpolated columns (df_new itself for a LogStore
+  or LogView)
+  """
+  # one copy of df_new for all the interpolated columns
+  dfnew = df_new.copy() if hasattr(df_new, 'copy') else df_new
+  for i in range(len(ydata)):
+    dfnew[ydata[i]] = yn[:,i]
+
+  return dfnew
+
+
+@instrument
+def fit_interpolator(df_data, xdata, ydata, kind="cubic",
+                     out_of_range=("extrapolate", "nan"), column_well=None,
+                     dtype=None):
+  """
+  Fit the interpolator used by merge_data_interpolation once, to be reused
+  for many queries
+
+  INPUT:
+
+  df_data, xdata, ydata, kind, out_of_range, column_well and dtype are the
+    same as in merge_data_interpolation
+
+  OUTPUT:
+
+  f: CurveInterpolator. f(xn) returns an array of the interpolated ydata
+    columns at xn, shape (len(xn), len(ydata)). If column_well is specified,
+    f is a dict of CurveInterpolator per well
+  """
+  if column_well is None:
+    return CurveInterpolator(df_data[xdata].values, df_data[ydata].values,
+                             kind=kind, out_of_range=_column_modes(out_of_range, ydata),
+                             dtype=dtype)
+
+  f = {}
+  for well, df_ in df_data.groupby(column_well, sort=False):
+    f[well] = CurveInterpolator(df_[xdata].values, df_[ydata].values, kind=kind,
+                                out_of_range=_column_modes(out_of_range, ydata),
+                                dtype=dtype)
+  return f
+
+
+class CurveInterpolator:
+  """
+  Interpolate a matrix of curves sharing the same x (e.g. depth)
+
+  INPUT:
+
+  x: x values, 1D array of length n (need not be sorted)
+  y: curves, array of shape (n,) or (n, k)
+  kind: "linear" or "cubic". Linear curves share one set of interval
+    indexes and weights, cubic curves share one spline fit. Cubic curves
+    with fewer than 4 points are linear (with a warning)
+  out_of_range: "extrapolate", "nan", "clip" or a tuple of two of them
+    (below the first x, above the last x); or a list with one per column
+  dtype: Output dtype. Default is None (float64)
+
+  Curves with NaNs are fitted on their own non-NaN samples, all the other
+  curves are interpolated in one vectorized call.
+
+  OUTPUT:
+
+  f(xn) returns the interpolated curves at xn, shape (len(xn), k). xn can
+  also be a list of arrays (several new depth axes), then a list is returned
+  """
+
+  def __init__(self, x, y, kind="linear", out_of_range="extrapolate", dtype=None):
+    import numpy as np
+
+    if kind not in ("linear", "cubic"):
+      raise ValueError("kind must be 'linear' or 'cubic', got '{}'".format(kind))
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y)
+    self.ndim = y.ndim
+    y = y.reshape(len(x), -1)
+
+    self.kind = kind
+    self.dtype = np.dtype(dtype or float)
+    self.ncol = y.shape[1]
+
+    if isinstance(out_of_range, (str, tuple)):
+      out_of_range = [out_of_range] * self.ncol
+    self.out_of_range = [m if isinstance(m, tuple) else (m, m)
+                         for m in out_of_range]
+
+    # fit the NaN-free curves together, the others on their own samples
+    hasnan = np.isnan(y).any(axis=0)
+    self.fits = []
+    shared = np.flatnonzero(~hasnan)
+    if len(shared):
+      self.fits.append((shared, self._fit(x, y[:,shared])))
+    for col in np.flatnonzero(hasnan):
+      ok = ~np.isnan(y[:,col]) & ~np.isnan(x)
+      self.fits.append((np.array([col]), self._fit(x[ok], y[ok][:,[col]])))
+
+  def _fit(self, x, y):
+    import numpy as np
+
+    ok = ~np.isnan(x)
+    x, y = x[ok], y[ok]
+    order = np.argsort(x, kind="stable")
+    x, y = x[order], y[order]
+    # interpolation needs strictly increasing x; keep the first duplicate
+    keep = np.r_[True, np.diff(x) > 0]
+    x, y = x[keep], np.asarray(y[keep], dtype=self.dtype)
+
+    spline = None
+    if self.kind == "cubic" and len(x) > 3:
+      from scipy.interpolate import CubicSpline
+      spline = CubicSpline(x, y, axis=0, extrapolate=True)
+    elif self.kind == "cubic" and len(x) > 1:
+      import warnings
+      warnings.warn("Cubic interpolation needs at least 4 points, {} given: "
+                    "linear interpolation is used".format(len(x)), stacklevel=4)
+    return x, y, spline
+
+  def _evaluate(self, fit, xn):
+    import numpy as np
+
+    x, y, spline = fit
+    if len(x) == 0:
+      return np.full((len(xn), y.shape[1]), np.nan, dtype=self.dtype)
+    if len(x) == 1:
+      return np.repeat(y, len(xn), axis=0)
+
+    if spline is not None:
+      return spline(xn).astype(self.dtype, copy=False)
+
+    # one search and one set of weights for all the curves
+    i = np.clip(np.searchsorted(x, xn) - 1, 0, len(x) - 2)
+    t = ((xn - x[i]) / (x[i+1] - x[i]))[:,None]
+    return (y[i] * (1 - t) + y[i+1] * t).astype(self.dtype, copy=False)
+
+  @instrument
+  def __call__(self, xn):
+    import numpy as np
+
+    if isinstance(xn, (list, tuple)):
+      return [self(x_) for x_ in xn]
+
+    xn = np.asarray(xn, dtype=float)
+    yn = np.empty((len(xn), self.ncol), dtype=self.dtype)
+    for cols, fit in self.fits:
+      yn[:,cols] = self._evaluate(fit, xn)
+      x, y, _ = fit
+      if len(x) == 0:
+        continue
+      below, above = xn < x[0], xn > x[-1]
+      for j, col in enumerate(cols):
+        for side, end in ((below, 0), (above, -1)):
+          mode = self.out_of_range[col][end]
+          if mode == "nan":
+            yn[side, col] = np.nan
+          elif mode == "clip":
+            yn[side, col] = y[end, j]
+
+    if self.ndim == 1:
+      return yn[:,0]
+    return yn
+
+
+def _column_modes(out_of_range, ydata):
+  """
+  Out-of-range mode of every ydata column
+  """
+  if isinstance(out_of_range, dict):
+    return [out_of_range.get(col, ("extrapolate", "nan")) for col in ydata]
+  return [out_of_range] * len(ydata)
@@ -0,0 +1,153 @@
+from .profiling import instrument
+
+
+PARAMETERS = ['rho_ma', 'rho_fl', 'GR_min', 'GR_max', 'A', 'B', 'a', 'm', 'n',
+              'Rw', 'k0', 'k_phif', 'k_vsh']
+
+
+@instrument
+def petrophysics(df, df_params, column_label, column_GR='GR', column_RHOB='RHOB',
+                 column_NPHI='NPHI', column_RT='RT', column_well=None,
+                 clip_sw=True, chunk_size=1000000, dtype=float):
+  """
+  Calculate VSH, PHID, PHIF, SW and KLOGH with parameters per formation
+
+  Input:
+
+  df is your dataframe (or LogStore), labelled with label_generator
+  df_params is your parameter dataframe, one row per formation. It should
+    have a column named column_label with the formation names (and,
+    optionally, a column named column_well with the well names; rows with
+    a well name override the parameters they give for that well, the
+    others are taken from the row without well) and the parameter columns
+    (missing ones are NaN)
+
+    rho_ma, rho_fl   matrix and fluid density, for PHID
+    GR_min, GR_max   clean and clay GR, for VSH
+    A, B             regression coefficients, PHIF = PHID + A (NPHI - PHID) + B
+    a, m, n, Rw      Archie parameters and water resistivity, for SW
+    k0, k_phif, k_vsh  permeability, KLOGH = 10**(k0 + k_phif PHIF + k_vsh VSH)
+
+  column_label is the column name of your formation labels
+  column_GR, column_RHOB, column_NPHI, column_RT are the column names of
+    your GR, RHOB, NPHI and resistivity
+  column_well is the column name of your well names. Default is None (the
+    parameters only depend on the formation)
+  clip_sw is True by default, SW larger than 1 (water zone) is set to 1
+  chunk_size is the number of samples evaluated at once. Default is 1000000
+  dtype is the dtype of the outputs, e.g. np.float32 to halve memory
+
+  The parameters are broadcast to the samples through the (categorical)
+  formation codes, and all outputs are evaluated chunk by chunk in one pass,
+  without copying the dataframe, so memory stays bounded for field-scale
+  data. Samples of formations without parameters are NaN.
+
+  Output:
+
+  df is your dataframe with the new columns VSH, PHID, PHIF, SW and KLOGH
+  """
+  import numpy as np
+
+  row = _parameter_rows(df, df_params, column_label, column_well)
+  table = np.column_stack([
+      np.asarray(df_params[p], dtype=float) if p in df_params else np.full(len(df_params), np.nan)
+      for p in PARAMETERS])
+  if column_well is not None and column_well in df_params:
+    table = _fill_generic(table, df_params, column_label, column_well)
+  # one extra row of NaNs for the samples without parameters
+  table = np.vstack([table, np.full(len(PARAMETERS), np.nan)])
+  row = np.where(row < 0, len(table) - 1, row)
+
+  gr = np.asarray(df[column_GR])
+  rhob = np.asarray(df[column_RHOB])
+  nphi = np.asarray(df[column_NPHI])
+  rt = np.asarray(df[column_RT])
+
+  size = len(row)
+  out = {name: np.empty(size, dtype=dtype)
+         for name in ['VSH', 'PHID', 'PHIF', 'SW', 'KLOGH']}
+
+  with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+    for start in range(0, size, chunk_size):
+      chunk = slice(start, min(start + chunk_size, size))
+      p = dict(zip(PARAMETERS, table[row[chunk]].T))
+
+      vsh = (gr[chunk] - p['GR_min']) / (p['GR_max'] - p['GR_min'])
+      phid = (p['rho_ma'] - rhob[chunk]) / (p['rho_ma'] - p['rho_fl'])
+      phif = phid + p['A'] * (nphi[chunk] - phid) + p['B']
+      sw = ((p['a'] * p['Rw']) / ((phif ** p['m']) * rt[chunk])) ** (1 / p['n'])
+      if clip_sw:
+        sw = np.minimum(sw, 1)
+      klogh = 10 ** (p['k0'] + p['k_phif'] * phif + p['k_vsh'] * vsh)
+
+      out['VSH'][chunk] = vsh
+      out['PHID'][chunk] = phid
+      out['PHIF'][chunk] = phif
+      out['SW'][chunk] = sw
+      out['KLOGH'][chunk] = klogh
+
+  for name, values in out.items():
+    df[name] = values
+
+  return df
+
+
+def _fill_generic(table, df_params, column_label, column_well):
+  """
+  Parameters missing from the rows of a well, taken from the row without
+  well of the same formation
+  """
+  import numpy as np
+  import pandas as pd
+
+  labels = df_params[column_label].tolist()
+  generic = pd.isna(df_params[column_well]).to_numpy()
+  # first row without well of every formation (the one used by _parameter_rows)
+  first = {}
+  for i in np.flatnonzero(generic):
+    first.setdefault(labels[i], i)
+
+  table = table.copy()
+  for i in np.flatnonzero(~generic):
+    g = first.get(labels[i])
+    if g is not None:
+      table[i] = np.where(np.isnan(table[i]), table[g], table[i])
+
+  return table
+
+
+def _parameter_rows(df, df_params, column_label, column_well=None):
+  """
+  Row of df_params of every sample of df (-1 if none)
+  """
+  import numpy as np
+  import pandas as pd
+
+  from .grouping import group_codes
+
+  fm_codes, fm_names = group_codes(df[column_label])
+  params_fm = pd.Index(fm_names).get_indexer(df_params[column_label])
+
+  if column_well is None or column_well not in df_params:
+    # lookup table: formation code -> parameter row
+    lookup = np.full(len(fm_names) + 1, -1, dtype=np.int64)
+    ok = params_fm >= 0
+    lookup[params_fm[ok]] = np.flatnonzero(ok)
+    return lookup[fm_codes]
+
+  well_codes, well_names = group_codes(df[column_well])
+  params_well = pd.Index(well_names).get_indexer(df_params[column_well])
+  # lookup table: (well code, formation code) -> parameter row
+  lookup = np.full((len(well_names) + 1, len(fm_names) + 1), -1, dtype=np.int64)
+  for i in range(len(df_params)):
+    if params_fm[i] < 0:
+      continue
+    if pd.isna(df_params[column_well].iloc[i]):
+      # rows without well apply to all wells, unless overridden
+      column = lookup[:, params_fm[i]]
+      column[column < 0] = i
+    elif params_well[i] >= 0:
+      lookup[params_well[i], params_fm[i]] = i
+
+  return lookup[well_codes, fm_codes]
+
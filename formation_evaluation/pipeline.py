@@ -0,0 +1,470 @@
+from .profiling import instrument
+
+
+def pipeline(source, stages):
+  """
+  Streaming (out-of-core) pipeline over wells
+
+  Input:
+
+  source is an iterable of (well name, dataframe) pairs, one per well, e.g.
+    read_csv_wells or read_las_wells
+  stages is the LIST of stages applied in order to every well. A stage is a
+    function stage(well, df) that returns the new df, e.g. label_stage,
+    interpolation_stage, regrid_stage and petrophysics_stage
+
+  Only one well is held in memory at a time, so the peak memory is bounded
+  by the largest single well, not the whole dataset.
+
+  Output:
+
+  generator of the processed (well name, dataframe) pairs. Use run_pipeline
+  to consume it and write the results incrementally
+  """
+  for well, df in source:
+    for stage in stages:
+      df = stage(well, df)
+    yield well, df
+
+
+@instrument
+def run_pipeline(source, stages, writer):
+  """
+  Run pipeline and write every well as soon as it is processed
+
+  Input:
+
+  source and stages are the same as in pipeline
+  writer is a function writer(well, df), e.g. csv_writer(filename)
+
+  Output:
+
+  summary is a dataframe with one row per well: WELL and ROWS (written rows)
+  """
+  import pandas as pd
+
+  rows = []
+  for well, df in pipeline(source, stages):
+    writer(well, df)
+    rows.append((well, len(df)))
+
+  return pd.DataFrame(rows, columns=['WELL', 'ROWS'])
+
+
+@instrument
+def run_parallel(wells, stages, column_well=None, n_jobs=None, progress=None):
+  """
+  Run the stages on every well in a pool of worker processes
+
+  Input:
+
+  wells is a LogStore, or a dataframe of many wells with column_well
+  stages is the LIST of stages of pipeline, e.g. label_stage,
+    interpolation_stage, regrid_stage, petrophysics_stage and render_stage
+  column_well is the column name of your well names (if wells is a
+    dataframe). Default is None (one well)
+  n_jobs is the number of worker processes. Default is None (all cores).
+    If 1, the wells are processed in this process
+  progress is a function progress(done, total, well, error) called in this
+    process whenever a well is finished (error is None if ok), or True to
+    print the progress. Default is None
+
+  The curves are copied once into a shared memory block; the workers get
+  the position of a well in it, not the pickled dataframe, and build the
+  dataframe of the well from views of the block. Text columns (e.g. well
+  names and labels) are shared as categorical codes. A failing well does
+  not stop the others.
+
+  Output:
+
+  results is the list of (well name, processed dataframe) pairs, in the
+    order of the wells (dataframe is None if the well failed)
+  report is a dataframe with one row per well (same order): WELL, ROWS,
+    SECONDS and ERROR (None if ok)
+  """
+  import multiprocessing
+  import os
+  import pandas as pd
+  from .batch_render import run_isolated
+
+  names, offsets, columns = _well_columns(wells, column_well)
+  if progress is True:
+    progress = _print_progress
+  n_jobs = n_jobs or os.cpu_count()
+
+  shm, layout = _share(columns)
+  try:
+    if n_jobs == 1 or len(names) == 1:
+      _init_worker(shm, layout, names, offsets, stages)
+      finished = []
+      for i in range(len(names)):
+        finished.append(_run_well(i, copy=True))
+        if progress is not None:
+          progress(i + 1, len(names), names[i], finished[-1][3])
+    else:
+      # fork: the stages (closures) and the shared block are inherited
+      context = None
+      if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+      finished = [None] * len(names)
+
+      def done(i, result, error):
+        finished[i] = result if error is None else (names[i], None, None, error)
+        if progress is not None:
+          progress(sum(r is not None for r in finished), len(names), names[i],
+                   finished[i][3])
+
+      run_isolated(_run_well, [(i,) for i in range(len(names))], done,
+                   n_jobs=min(n_jobs, len(names)), mp_context=context,
+                   initializer=_init_worker,
+                   initargs=(shm, layout, names, offsets, stages))
+  finally:
+    _WORKER.clear()
+    shm.close()
+    shm.unlink()
+
+  results = [(well, df) for well, df, seconds, error in finished]
+  report = pd.DataFrame([(well, None if df is None else len(df), seconds, error)
+                         for well, df, seconds, error in finished],
+                        columns=['WELL', 'ROWS', 'SECONDS', 'ERROR'])
+
+  return results, report
+
+
+def _well_columns(wells, column_well):
+  """
+  Well names (in order), sample offsets of every well and the columns
+  (numpy arrays or categoricals) grouped by well
+  """
+  import numpy as np
+  import pandas as pd
+  from .log_store import LogStore
+
+  if isinstance(wells, LogStore):
+    names = list(wells.wells)
+    offsets = [wells._offsets[w] for w in names]
+    columns = {c: wells[c] for c in wells.keys()}
+  else:
+    if column_well is None:
+      codes, names = np.zeros(len(wells), dtype=np.int64), [None]
+    else:
+      codes, names = pd.factorize(wells[column_well])
+      names = list(names)
+    # group the samples by well (stable: the depth order is kept)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+    offsets = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+    columns = {}
+    for c in wells.columns:
+      values = wells[c].array if isinstance(wells[c].dtype, pd.CategoricalDtype) \
+          else wells[c].to_numpy()
+      columns[c] = values.take(order)
+
+  return names, offsets, columns
+
+
+def _share(columns):
+  """
+  Copy the columns into one shared memory block
+
+  Output:
+
+  shm is the SharedMemory block
+  layout is the list of (column, dtype, offset, categories) of the columns
+    in the block (categories is None for numeric columns)
+  """
+  import numpy as np
+  import pandas as pd
+  from multiprocessing import shared_memory
+
+  arrays = []
+  for c, values in columns.items():
+    if isinstance(values, pd.Categorical):
+      arrays.append((c, values.codes, values.categories))
+    else:
+      values = np.asarray(values)
+      if values.dtype.kind in 'biufcmM':
+        arrays.append((c, values, None))
+      else:
+        codes, categories = pd.factorize(values)
+        arrays.append((c, codes, categories))
+
+  layout, size = [], 0
+  for c, values, categories in arrays:
+    # 64 byte aligned columns
+    size = -(-size // 64) * 64
+    layout.append((c, values.dtype.str, size, categories))
+    size += values.nbytes
+
+  shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+  for (c, dtype, offset, categories), (_, values, _) in zip(layout, arrays):
+    view = np.ndarray(values.shape, dtype=dtype, buffer=shm.buf, offset=offset)
+    view[:] = values
+    del view
+
+  return shm, layout
+
+
+# shared block and stages of this worker process
+_WORKER = {}
+
+
+def _init_worker(shm, layout, names, offsets, stages):
+  _WORKER.update(shm=shm, layout=layout, names=names, offsets=offsets,
+                 stages=stages)
+
+
+def _run_well(i, copy=False):
+  """
+  Run the stages on well i of the shared block (in a worker). If copy is
+  True, the dataframe is built from copies (the block is released after
+  the run in this process)
+
+  Output:
+
+  well, df (None if failed), seconds and error (traceback, None if ok)
+  """
+  import time
+  import traceback
+  import numpy as np
+  import pandas as pd
+
+  start = time.perf_counter()
+  well = _WORKER['names'][i]
+  a, b = _WORKER['offsets'][i]
+  try:
+    data = {}
+    for c, dtype, offset, categories in _WORKER['layout']:
+      # view of the well in the shared block (only this task touches it)
+      values = np.ndarray(b, dtype=dtype, buffer=_WORKER['shm'].buf,
+                          offset=offset)[a:]
+      if copy:
+        values = values.copy()
+      if categories is not None:
+        values = pd.Categorical.from_codes(values, categories)
+      data[c] = values
+    df = pd.DataFrame(data, copy=False)
+    for stage in _WORKER['stages']:
+      df = stage(well, df)
+    error = None
+  except Exception:
+    df, error = None, traceback.format_exc()
+
+  return well, df, time.perf_counter() - start, error
+
+
+def _print_progress(done, total, well, error):
+  print('{}/{} {} {}'.format(done, total, well, 'FAILED' if error else 'ok'),
+        flush=True)
+
+
+def read_csv_wells(filename, column_well, chunksize=100000, **kwargs):
+  """
+  Read CSV file (e.g. FORCE2020 train.csv) well by well
+
+  Input:
+
+  filename is the path of your CSV file. Its rows should be grouped by well
+    (all the samples of a well next to each other)
+  column_well is the column name of your well names
+  chunksize is the number of rows read at once. Default is 100000
+  other keyword arguments are passed to pandas.read_csv (e.g. sep=';')
+
+  Output:
+
+  generator of (well name, dataframe) pairs
+  """
+  import numpy as np
+  import pandas as pd
+
+  done = set()
+  pending = []
+  for chunk in pd.read_csv(filename, chunksize=chunksize, **kwargs):
+    wells = chunk[column_well].to_numpy()
+    # positions where the well changes inside the chunk
+    change = np.r_[0, np.flatnonzero(wells[1:] != wells[:-1]) + 1, len(wells)]
+    for a, b in zip(change[:-1], change[1:]):
+      well = wells[a]
+      if pending and pending[0][column_well].iloc[0] != well:
+        yield _complete_well(pending, column_well, done)
+        pending = []
+      pending.append(chunk.iloc[a:b])
+  if pending:
+    yield _complete_well(pending, column_well, done)
+
+
+def _complete_well(pending, column_well, done):
+  """
+  Concatenate the pieces of one well (and check the file is grouped)
+  """
+  import pandas as pd
+
+  if len(pending) > 1:
+    df = pd.concat(pending, ignore_index=True)
+  else:
+    df = pending[0].reset_index(drop=True)
+  well = df[column_well].iloc[0]
+  if well in done:
+    raise ValueError("Well '{}' appears twice; the rows of the file should "
+                     "be grouped by well".format(well))
+  done.add(well)
+
+  return well, df
+
+
+def read_las_wells(filenames, column_well=None, use_cache=True, cache_dir=None):
+  """
+  Read LAS files one by one (with the cache of read_las)
+
+  Input:
+
+  filenames is the LIST of paths of your LAS files
+  column_well is the column name of the well name to be added to every
+    dataframe. Default is None (no column added)
+  use_cache and cache_dir are the same as in read_las
+
+  Output:
+
+  generator of (well name, dataframe) pairs. The well name is WELL of the
+  LAS header (or the file name if it has none)
+  """
+  import os
+  from .las_reader import read_las
+
+  for filename in filenames:
+    df, header = read_las(filename, use_cache=use_cache, cache_dir=cache_dir,
+                          return_header=True)
+    well = header['well'].get('WELL', {}).get('value') or \
+        os.path.splitext(os.path.basename(filename))[0]
+    if column_well is not None:
+      df[column_well] = well
+    yield well, df
+
+
+def label_stage(df_tops, column_depth, label_name):
+  """
+  Stage of label_generator
+
+  df_tops is the long-format tops table of label_generator with column_well
+    (1st column well name, 2nd column label name, 3rd column depth)
+  column_depth and label_name are the same as in label_generator
+  """
+  from .label_generator import label_generator
+
+  tops = {well: df_.iloc[:,1:]
+          for well, df_ in df_tops.groupby(df_tops.columns[0], sort=False)}
+  empty = df_tops.iloc[:0,1:]
+
+  @instrument
+  def stage(well, df):
+    return label_generator(df, tops.get(well, empty), column_depth, label_name)
+
+  return stage
+
+
+def interpolation_stage(df_data, xdata, ydata, xnew, kind="cubic",
+                        column_well=None, **kwargs):
+  """
+  Stage of merge_data_interpolation (e.g. TVD from the surveys of all wells)
+
+  df_data, xdata, ydata, xnew and kind are the same as in
+    merge_data_interpolation. The interpolators are fitted once per well
+  column_well is the well column name in df_data. Default is None (the same
+    df_data is used for every well)
+  other keyword arguments are passed to fit_interpolator
+  """
+  import numpy as np
+  from .merge_data_interpolation import fit_interpolator, merge_data_interpolation
+
+  f = fit_interpolator(df_data, xdata, ydata, kind=kind, column_well=column_well,
+                       **kwargs)
+
+  @instrument
+  def stage(well, df):
+    interpolator = f if column_well is None else f.get(well)
+    if interpolator is None:
+      df = df.copy()
+      for col in ydata:
+        df[col] = np.nan
+      return df
+    return merge_data_interpolation(None, df, xdata, ydata, xnew,
+                                    interpolator=interpolator)
+
+  return stage
+
+
+def regrid_stage(column_depth, column_feature, depth_regrid, stats='mean',
+                 column_well=None):
+  """
+  Stage of regrid
+
+  column_depth, column_feature, depth_regrid and stats are the same as in
+    regrid
+  column_well is the column name of the well name added to the regridded
+    dataframe. Default is None (not added)
+  """
+  from .regrid import regrid
+
+  @instrument
+  def stage(well, df):
+    df_regrid = regrid(df, column_depth, column_feature, depth_regrid, stats=stats)
+    if column_well is not None:
+      df_regrid.insert(0, column_well, well)
+    return df_regrid
+
+  return stage
+
+
+def petrophysics_stage(df_params, column_label, **kwargs):
+  """
+  Stage of petrophysics
+
+  df_params, column_label and other keyword arguments are the same as in
+    petrophysics
+  """
+  from .petrophysics import petrophysics
+
+  @instrument
+  def stage(well, df):
+    return petrophysics(df, df_params, column_label, **kwargs)
+
+  return stage
+
+
+def render_stage(layout, output_dir, formats=('png',), dpi=100):
+  """
+  Stage rendering the log sheet of every well (the dataframe is passed on)
+
+  layout, output_dir, formats and dpi are the same as in batch_render
+  """
+  import os
+  from .batch_render import _render_well
+
+  os.makedirs(output_dir, exist_ok=True)
+
+  @instrument
+  def stage(well, df):
+    name, seconds, files, error = _render_well(well, df, layout, output_dir,
+                                               formats, dpi)
+    if error is not None:
+      raise RuntimeError("Rendering of well '{}' failed:\n{}".format(well, error))
+    return df
+
+  return stage
+
+
+def csv_writer(filename, **kwargs):
+  """
+  Writer appending every well to one CSV file (header written once)
+
+  other keyword arguments are passed to DataFrame.to_csv (e.g. index=False)
+  """
+  state = {'header': True}
+
+  @instrument
+  def writer(well, df):
+    df.to_csv(filename, mode='w' if state['header'] else 'a',
+              header=state['header'], **kwargs)
+    state['header'] = False
+
+  return writer
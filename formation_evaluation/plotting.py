@@ -0,0 +1,33 @@
+"""
+Plotting functions, imported from their modules on first access
+"""
+
+# name: module of the plotting functions
+_FUNCTIONS = {
+    'triple_combo': 'triple_combo', 'triple_combo_axes': 'triple_combo',
+    'triple_combo_curves': 'triple_combo',
+    'well_log_display': 'well_log_display', 'well_log_axes': 'well_log_display',
+    'well_log_curves': 'well_log_display',
+    'ND_plot': 'ND_plot',
+    'stereonet': 'fracture', 'rose': 'fracture',
+    'batch_render': 'batch_render',
+    'LivePanel': 'realtime',
+    'qc_overlay': 'log_qc',
+    'theme': 'theme', 'themed': 'theme', 'use_theme': 'theme'}
+
+__all__ = sorted(_FUNCTIONS)
+
+
+def __getattr__(name):
+  if name in _FUNCTIONS:
+    import importlib
+
+    module = importlib.import_module('.' + _FUNCTIONS[name], __package__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+  raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
+
+
+def __dir__():
+  return sorted(list(globals()) + __all__)
@@ -0,0 +1,335 @@
+"""
+Opt-in instrumentation of the formation-evaluation functions
+
+Usage:
+
+  from formation_evaluation import profiling
+  with profiling.profile(memory=True):
+    ...                                  # any workflow, e.g. run_pipeline
+  profiling.report()                     # per function summary
+  profiling.to_chrome_trace('trace.json')  # open in chrome://tracing
+
+The public functions of the package are decorated with instrument. While
+profiling is disabled (default) the decorator only checks one flag, so the
+overhead is negligible. While enabled, every call records its wall time,
+number of samples (length of its dataframe or array argument), peak traced
+memory (if memory=True) and, for plotting functions, the number of
+matplotlib artists it created.
+
+The calls made in worker processes are recorded there and added to the
+parent records: run the function with run_recorded(worker_settings(), ...)
+in the worker and pass the returned calls to merge() in the parent.
+"""
+
+import functools
+import threading
+
+# profiling state and the registry of the recorded calls (one per process)
+_STATE = {'enabled': False, 'memory': False, 'origin': 0}
+_RECORDS = []
+_LOCAL = threading.local()
+
+
+def instrument(function=None, plotting=False):
+  """
+  Decorator recording the calls of function while profiling is enabled
+
+  Input:
+
+  function is the function to be instrumented
+  plotting is False by default. If True, the artists created by the call
+    are counted (for plotting functions)
+
+  Use as @instrument or @instrument(plotting=True)
+  """
+  if function is None:
+    return functools.partial(instrument, plotting=plotting)
+
+  # named by module and function within the package, e.g. regrid.regrid
+  module = function.__module__
+  if module.startswith(__package__ + '.'):
+    module = module[len(__package__) + 1:]
+  name = '{}.{}'.format(module, function.__qualname__)
+
+  @functools.wraps(function)
+  def wrapper(*args, **kwargs):
+    if not _STATE['enabled']:
+      return function(*args, **kwargs)
+    with _Call(name, _samples(args, kwargs), args if plotting else None):
+      return function(*args, **kwargs)
+
+  return wrapper
+
+
+def enable(memory=False):
+  """
+  Start recording the calls of the instrumented functions
+
+  memory is False by default. If True, the peak memory of every call is
+  traced with tracemalloc (slower, use it to find memory hogs)
+  """
+  import time
+  import tracemalloc
+
+  if not _STATE['enabled']:
+    _STATE['origin'] = _STATE['origin'] or time.perf_counter()
+  _STATE['memory'] = memory
+  if memory and not tracemalloc.is_tracing():
+    tracemalloc.start()
+    _STATE['tracemalloc'] = True
+  _STATE['enabled'] = True
+
+
+def disable():
+  """
+  Stop recording (the recorded calls are kept until reset)
+  """
+  import tracemalloc
+
+  _STATE['enabled'] = False
+  if _STATE.pop('tracemalloc', False):
+    tracemalloc.stop()
+
+
+def reset():
+  """
+  Remove all recorded calls
+  """
+  del _RECORDS[:]
+  _STATE['origin'] = 0
+
+
+class profile:
+  """
+  Context manager enabling profiling inside the with block
+
+  with profiling.profile(memory=False):
+    ...
+  """
+
+  def __init__(self, memory=False):
+    self.memory = memory
+
+  def __enter__(self):
+    self.was_enabled = _STATE['enabled']
+    enable(self.memory)
+    return self
+
+  def __exit__(self, *exc):
+    if not self.was_enabled:
+      disable()
+    return False
+
+
+def records():
+  """
+  Dataframe of every recorded call: NAME, START, SECONDS, SAMPLES,
+  PEAK_MB, ARTISTS, DEPTH (nesting level), PID and THREAD
+  """
+  import pandas as pd
+
+  return pd.DataFrame(_RECORDS, columns=['NAME', 'START', 'SECONDS', 'SAMPLES',
+                                         'PEAK_MB', 'ARTISTS', 'DEPTH', 'PID',
+                                         'THREAD'])
+
+
+def report():
+  """
+  Summary of the recorded calls per function, slowest first
+
+  Output:
+
+  df_report is a dataframe indexed by NAME with CALLS, SECONDS (total),
+    MEAN_SECONDS, MAX_SECONDS, SAMPLES (total), SAMPLES_PER_SECOND,
+    PEAK_MB (largest) and ARTISTS (total)
+  """
+  df = records()
+  grouped = df.groupby('NAME')
+  df_report = grouped.agg(CALLS=('SECONDS', 'size'), SECONDS=('SECONDS', 'sum'),
+                          MEAN_SECONDS=('SECONDS', 'mean'),
+                          MAX_SECONDS=('SECONDS', 'max'),
+                          SAMPLES=('SAMPLES', 'sum'), PEAK_MB=('PEAK_MB', 'max'),
+                          ARTISTS=('ARTISTS', 'sum'))
+  df_report.insert(5, 'SAMPLES_PER_SECOND', df_report['SAMPLES'] / df_report['SECONDS'])
+
+  return df_report.sort_values('SECONDS', ascending=False)
+
+
+def to_json(filename):
+  """
+  Save the recorded calls as JSON (one object per call)
+  """
+  import json
+
+  with open(filename, 'w') as f:
+    json.dump(records().to_dict(orient='records'), f, indent=1, default=_json_value)
+
+
+def to_chrome_trace(filename):
+  """
+  Save the recorded calls in the Chrome trace event format (open it in
+  chrome://tracing or https://ui.perfetto.dev). Nested calls are shown
+  inside their caller, one row per process and thread
+  """
+  import json
+
+  events = [{'name': r[0], 'cat': 'formation-evaluation', 'ph': 'X',
+             'ts': r[1] * 1e6, 'dur': r[2] * 1e6, 'pid': r[7], 'tid': r[8],
+             'args': {'samples': r[3], 'peak_mb': r[4], 'artists': r[5]}}
+            for r in _RECORDS]
+  with open(filename, 'w') as f:
+    json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f,
+              default=_json_value)
+
+
+def _json_value(value):
+  """
+  JSON value of numpy scalars (and None for NaN)
+  """
+  import math
+
+  value = value.item() if hasattr(value, 'item') else value
+  if isinstance(value, float) and math.isnan(value):
+    return None
+  return value
+
+
+class _Call:
+  """
+  Record of one call of an instrumented function
+  """
+
+  def __init__(self, name, samples, plot_args):
+    self.name = name
+    self.samples = samples
+    self.plot_args = plot_args
+
+  def __enter__(self):
+    import time
+    import tracemalloc
+
+    stack = getattr(_LOCAL, 'stack', None)
+    if stack is None:
+      stack = _LOCAL.stack = []
+    self.depth = len(stack)
+    self.tracing = _STATE['memory'] and tracemalloc.is_tracing()
+    if self.tracing:
+      current, peak = tracemalloc.get_traced_memory()
+      # keep the peak of the caller before resetting it for this call
+      if stack:
+        stack[-1].max_peak = max(stack[-1].max_peak, peak)
+      tracemalloc.reset_peak()
+      self.start_memory, self.max_peak = current, current
+    if self.plot_args is not None:
+      self.start_artists = _artist_count(self.plot_args)
+    stack.append(self)
+    self.start = time.perf_counter()
+    return self
+
+  def __exit__(self, *exc):
+    import os
+    import time
+    import tracemalloc
+
+    end = time.perf_counter()
+    stack = _LOCAL.stack
+    stack.pop()
+    peak = artists = None
+    if self.tracing:
+      self.max_peak = max(self.max_peak, tracemalloc.get_traced_memory()[1])
+      if stack:
+        stack[-1].max_peak = max(stack[-1].max_peak, self.max_peak)
+      peak = (self.max_peak - self.start_memory) / 2**20
+    if self.plot_args is not None:
+      artists = _artist_count(self.plot_args) - self.start_artists
+
+    _RECORDS.append((self.name, self.start - _STATE['origin'], end - self.start,
+                     self.samples, peak, artists, self.depth, os.getpid(),
+                     threading.get_ident()))
+    return False
+
+
+def _samples(args, kwargs):
+  """
+  Number of samples of a call: length of its first dataframe-like argument
+  """
+  for value in list(args) + list(kwargs.values()):
+    if isinstance(value, (str, bytes, dict)) or not hasattr(value, '__len__'):
+      continue
+    try:
+      return len(value)
+    except TypeError:
+      continue
+
+  return None
+
+
+def _artist_count(args):
+  """
+  Number of artists of the open pyplot figures and the figures of args
+  (children of the figures and of their axes, not counting ticks)
+  """
+  import sys
+
+  if 'matplotlib' not in sys.modules:
+    return 0
+  import numpy as np
+  from matplotlib._pylab_helpers import Gcf
+  from matplotlib.artist import Artist
+
+  # from the figure managers: plt.figure(n) would change the current figure
+  figures = {id(m.canvas.figure): m.canvas.figure
+             for m in Gcf.get_all_fig_managers()}
+  values = list(args)
+  while values:
+    value = values.pop()
+    if isinstance(value, dict):
+      values.extend(value.values())
+    elif isinstance(value, (list, tuple, np.ndarray)) and len(value) < 1000:
+      values.extend(np.ravel(np.asarray(value, dtype=object)))
+    elif isinstance(value, Artist) and value.figure is not None:
+      figures[id(value.figure)] = value.figure
+
+  return sum(len(fig.get_children()) + sum(len(ax.get_children()) for ax in fig.axes)
+             for fig in figures.values())
+
+
+def run_recorded(settings, function, *args, **kwargs):
+  """
+  Run function (in a worker process) with the profiling settings of the
+  parent (see worker_settings), and return its result with the calls
+  recorded in the worker (to be added in the parent with merge)
+  """
+  was_enabled = _STATE['enabled']
+  start = len(_RECORDS)
+  # a forked worker inherits the call stack of the parent thread
+  _LOCAL.stack = []
+  if settings is not None:
+    enable(settings['memory'])
+    # same time origin as the parent (perf_counter is system-wide)
+    _STATE['origin'] = settings['origin']
+  try:
+    result = function(*args, **kwargs)
+  finally:
+    if settings is not None and not was_enabled:
+      disable()
+  recorded = _RECORDS[start:]
+  del _RECORDS[start:]
+
+  return result, recorded
+
+
+def worker_settings():
+  """
+  Profiling settings passed to worker processes (None if disabled)
+  """
+  if not _STATE['enabled']:
+    return None
+  return {'memory': _STATE['memory'], 'origin': _STATE['origin']}
+
+
+def merge(recorded):
+  """
+  Add the calls recorded in a worker process (see run_recorded)
+  """
+  _RECORDS.extend(recorded)
@@ -0,0 +1,408 @@
+from .profiling import instrument
+
+
+class LiveWell:
+  """
+  Incremental (real-time, LWD) well: samples are appended while drilling,
+  and the labels and the regridded curves are updated from the new samples
+  only
+
+  Input:
+
+  column_depth is the column name of your depth
+  column_list is the LIST of column names of the logs
+  depth_regrid is the array of interval boundaries (bin edges) of the
+    regridded curves, ascending (as in regrid). Default is None (no regrid)
+  df_tops is your label dataframe (as in label_generator: 1st column label
+    name, 2nd column depth). Default is None (no labels)
+  label_name is the name of the label column. Default is 'FM'
+
+  The samples are kept in arrays that grow by doubling, so appending costs
+  in proportion to the new samples, not to the length of the well. For
+  every regrid interval the running sum and count of every log are kept,
+  so only the intervals of the new samples are updated; the formation
+  intervals of the labels are extended in the same way.
+
+  live['GR'] is the array of GR (view), live.to_frame() gives a dataframe,
+  live.regrid() gives the regridded dataframe (the same as regrid with the
+  mean statistic)
+  """
+
+  def __init__(self, column_depth, column_list, depth_regrid=None,
+               df_tops=None, label_name='FM'):
+    import numpy as np
+
+    self.column_depth = column_depth
+    self.column_list = list(column_list)
+    self.label_name = label_name
+    self._size = 0
+    self._arrays = {c: np.empty(1024) for c in [column_depth] + self.column_list}
+    self._codes = np.empty(1024, dtype=np.int64)
+
+    self.edges = None
+    if depth_regrid is not None:
+      self.edges = np.asarray(depth_regrid, dtype=float)
+      nbin = len(self.edges) - 1
+      self._sums = np.zeros((nbin, len(self.column_list)))
+      self._counts = np.zeros((nbin, len(self.column_list)), dtype=np.int64)
+
+    self.set_tops(df_tops)
+
+  def __len__(self):
+    return self._size
+
+  def __contains__(self, column):
+    return column in self._arrays or (column == self.label_name and
+                                      self.tops is not None)
+
+  def __getitem__(self, column):
+    if column == self.label_name and column not in self._arrays:
+      return self.labels()
+    return self._arrays[column][:self._size]
+
+  def keys(self):
+    keys = list(self._arrays)
+    return keys + [self.label_name] if self.tops is not None else keys
+
+  @property
+  def columns(self):
+    return self.keys()
+
+  @instrument
+  def append(self, df_new):
+    """
+    Append new samples (deeper than the last sample) to the well
+
+    Input:
+
+    df_new is the dataframe (or dict of arrays) of the new samples, with
+      column_depth and column_list
+
+    Output:
+
+    bins is the array of the regrid intervals updated by the new samples
+      (empty if there is no regrid)
+    """
+    import numpy as np
+
+    depth = np.asarray(df_new[self.column_depth], dtype=float)
+    n = len(depth)
+    if n == 0:
+      return np.empty(0, dtype=np.int64)
+    last = self._arrays[self.column_depth][self._size - 1] if self._size else -np.inf
+    if np.any(np.diff(depth) <= 0) or depth[0] <= last:
+      raise ValueError("The new samples should be deeper than the last sample "
+                       "({}), in ascending depth".format(last))
+
+    self._reserve(self._size + n)
+    a, b = self._size, self._size + n
+    self._arrays[self.column_depth][a:b] = depth
+    values = np.column_stack([np.asarray(df_new[c], dtype=float)
+                              for c in self.column_list])
+    for i, c in enumerate(self.column_list):
+      self._arrays[c][a:b] = values[:,i]
+    self._size = b
+
+    if self.tops is not None:
+      codes = self._label_codes(depth)
+      self._codes[a:b] = codes
+      self._extend_intervals(codes, a)
+
+    if self.edges is None:
+      return np.empty(0, dtype=np.int64)
+
+    from .regrid import _depth_bins
+
+    bins = _depth_bins(depth, self.edges)
+    ok = bins >= 0
+    if not np.any(ok):
+      return np.empty(0, dtype=np.int64)
+    bins, values = bins[ok], values[ok]
+    # running sums and counts of the intervals of the new samples only
+    first = bins.min()
+    local = bins - first
+    size = bins.max() - first + 1
+    for i in range(len(self.column_list)):
+      isnum = ~np.isnan(values[:,i])
+      self._sums[first:first+size, i] += np.bincount(
+          local[isnum], weights=values[isnum, i], minlength=size)
+      self._counts[first:first+size, i] += np.bincount(local[isnum], minlength=size)
+
+    return np.unique(bins)
+
+  def set_tops(self, df_tops):
+    """
+    Set (or change) the formation tops and relabel the whole well
+    """
+    import numpy as np
+    import pandas as pd
+
+    self.tops = None
+    self.intervals = {}
+    if df_tops is None:
+      return
+    fm_depths = np.asarray(df_tops.iloc[:,1].values, dtype=float)
+    order = np.argsort(fm_depths, kind='stable')
+    codes, names = pd.factorize(df_tops.iloc[:,0].values[order])
+    self.tops = (fm_depths[order], codes, names)
+
+    codes = self._label_codes(self[self.column_depth])
+    self._codes[:self._size] = codes
+    self._extend_intervals(codes, 0)
+
+  def labels(self):
+    """
+    Labels of the samples (pandas Categorical, as label_generator)
+    """
+    import pandas as pd
+
+    return pd.Categorical.from_codes(self._codes[:self._size],
+                                     categories=self.tops[2])
+
+  def regrid(self, bins=None):
+    """
+    Regridded curves (interval mean of every log, as regrid with stats
+    'mean')
+
+    Input:
+
+    bins is the array of intervals (e.g. returned by append). Default is
+      None (all intervals)
+
+    Output:
+
+    df_regrid is the dataframe with column_depth+"_regrid" (interval
+      midpoints) and column+"_regrid" for every log
+    """
+    import numpy as np
+    import pandas as pd
+
+    if self.edges is None:
+      raise ValueError("The well has no depth_regrid")
+    bins = np.arange(len(self._sums)) if bins is None else np.asarray(bins)
+    out = {self.column_depth+"_regrid": 0.5 * (self.edges[bins] + self.edges[bins+1])}
+    with np.errstate(invalid='ignore', divide='ignore'):
+      mean = self._sums[bins] / self._counts[bins]
+    for i, c in enumerate(self.column_list):
+      out[c+"_regrid"] = mean[:,i]
+
+    return pd.DataFrame(out)
+
+  @instrument
+  def to_frame(self):
+    """
+    Dataframe of the well (copy)
+    """
+    import pandas as pd
+
+    return pd.DataFrame({c: self[c].copy() if c != self.label_name else self[c]
+                         for c in self.keys()})
+
+  def _reserve(self, size):
+    """
+    Grow the arrays (by doubling) to hold size samples
+    """
+    import numpy as np
+
+    capacity = len(self._codes)
+    if size <= capacity:
+      return
+    while capacity < size:
+      capacity *= 2
+    for c, values in self._arrays.items():
+      grown = np.empty(capacity)
+      grown[:self._size] = values[:self._size]
+      self._arrays[c] = grown
+    codes = np.empty(capacity, dtype=np.int64)
+    codes[:self._size] = self._codes[:self._size]
+    self._codes = codes
+
+  def _label_codes(self, depth):
+    """
+    Label code of every depth: deepest top above (or at) it, -1 above the
+    first top
+    """
+    import numpy as np
+
+    fm_depths, codes, names = self.tops
+    if len(fm_depths) == 0:
+      return np.full(len(depth), -1, dtype=np.int64)
+    index = np.searchsorted(fm_depths, depth, side='right') - 1
+    return np.where((index >= 0) & ~np.isnan(depth), codes[np.maximum(index, 0)], -1)
+
+  def _extend_intervals(self, codes, start):
+    """
+    Extend the formation intervals {name: [[start, stop], ...]} with the
+    labels of the samples from start on
+    """
+    import numpy as np
+
+    names = self.tops[2]
+    if len(codes) == 0:
+      return
+    change = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+    for a, b in zip(np.r_[0, change], np.r_[change, len(codes)]):
+      if codes[a] < 0:
+        continue
+      runs = self.intervals.setdefault(names[codes[a]], [])
+      if runs and runs[-1][1] == start + a:
+        # the trailing interval continues
+        runs[-1][1] = start + int(b)
+      else:
+        runs.append([start + int(a), start + int(b)])
+
+
+class LivePanel:
+  """
+  Side-by-side log display of a LiveWell, updated with blitting
+
+  Input:
+
+  live is your LiveWell
+  column_list is the LIST of logs to display. Default is None (all logs of
+    live)
+  window is the depth span shown. Default is 500. When the bit passes the
+    bottom of the window, the tracks scroll by half a window
+  fig is the matplotlib figure. Default is None (a new figure)
+  colors is the list of colors of the logs. Default is None (blue)
+  fills is a dict of {column: (baseline, color)} of the logs to be filled
+    between the baseline and the curve, e.g. {'GR': (75, 'gold')}.
+    Default is None
+  other keyword arguments are passed to well_log_axes (column_semilog,
+    column_min, column_max, title_size). Specify column_min and column_max:
+    the x limits are not rescaled by the updates
+
+  Call panel.update() after live.append(...). Only the new part of the
+  curves is drawn on the saved background and blitted (the new fill
+  polygons are also added to their collection), so the cost of an update
+  is proportional to the new samples. The lines get the whole curves (and
+  the fills one polygon of the whole curve) only at a full redraw, which
+  happens when the tracks scroll.
+  """
+
+  @instrument(plotting=True)
+  def __init__(self, live, column_list=None, window=500, fig=None, colors=None,
+               fills=None, **kwargs):
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import PathCollection, PolyCollection
+    from .well_log_display import well_log_axes
+
+    self.live = live
+    self.column_list = live.column_list if column_list is None else list(column_list)
+    self.window = window
+    self.fills = fills or {}
+    self.fig = plt.figure(figsize=(20,10)) if fig is None else fig
+    self.ax = well_log_axes(self.fig, self.column_list, **kwargs)
+
+    depth = live[live.column_depth]
+    top = depth[0] if len(depth) else 0.
+    self._scroll(top, top + window)
+
+    self.lines, self.tails, self.polys, self.tail_polys = [], [], {}, {}
+    for i, c in enumerate(self.column_list):
+      color = 'C0' if colors is None else colors[i]
+      self.lines += self.ax[i].plot(live[c], depth, color=color)
+      # the new part of the curve, drawn on the background at every update
+      self.tails += self.ax[i].plot([], [], color=color, animated=True)
+      if c in self.fills:
+        baseline, fill_color = self.fills[c]
+        self.polys[c] = self.ax[i].add_collection(PathCollection(
+            _paths(_fill_polygons(depth, live[c], baseline)),
+            facecolor=fill_color, linewidth=0))
+        self.tail_polys[c] = self.ax[i].add_collection(PolyCollection(
+            [], facecolor=fill_color, linewidth=0, animated=True))
+
+    # samples on the saved background, in the lines and in the fills
+    self._drawn = self._in_lines = self._in_fills = len(live)
+    self._background = None
+    self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+    self.fig.canvas.draw()
+
+  @instrument(plotting=True)
+  def update(self):
+    """
+    Draw the samples appended to the LiveWell since the last update
+    """
+    live = self.live
+    n = len(live)
+    if n == self._drawn:
+      return
+    depth = live[live.column_depth]
+    ymin, ymax = sorted(self.ax[0].get_ylim())
+    redraw = self._background is None or depth[-1] > ymax
+
+    # new fill polygons, one sample of overlap so they join the old ones; at
+    # a full redraw they are merged into one polygon of the whole curve
+    e = 0 if redraw else max(self._in_fills - 1, 0)
+    for c in self.polys:
+      paths = _paths(_fill_polygons(depth[e:n], live[c][e:n], self.fills[c][0]))
+      if not redraw:
+        paths = self.polys[c].get_paths() + paths
+      self.polys[c].set_paths(paths)
+    self._in_fills = n
+
+    if redraw:
+      # scroll by half a window: full redraw with the whole curves (set_data
+      # copies them), which recaptures the background
+      if depth[-1] > ymax:
+        base = depth[-1] + 0.5 * self.window
+        self._scroll(base - self.window, base)
+      for line, c in zip(self.lines, self.column_list):
+        line.set_data(live[c], depth)
+      self._in_lines = n
+      self.fig.canvas.draw()
+      return
+
+    # the samples not on the background yet (and one to join them)
+    a = max(self._drawn - 1, 0)
+    canvas = self.fig.canvas
+    canvas.restore_region(self._background)
+    for i, (tail, c) in enumerate(zip(self.tails, self.column_list)):
+      # fill under the curve, as in a full draw
+      if c in self.tail_polys:
+        self.tail_polys[c].set_verts(_fill_polygons(depth[a:n], live[c][a:n],
+                                                    self.fills[c][0]))
+        self.ax[i].draw_artist(self.tail_polys[c])
+      tail.set_data(live[c][a:n], depth[a:n])
+      self.ax[i].draw_artist(tail)
+    canvas.blit(self.fig.bbox)
+    self._background = canvas.copy_from_bbox(self.fig.bbox)
+    self._drawn = n
+
+  def _scroll(self, top, base):
+    for ax in self.ax:
+      # depth increases downwards
+      ax.set_ylim(base, top)
+
+  def _on_draw(self, event):
+    """
+    After a full draw: save the background, which has the samples of the
+    lines (the next update draws the rest)
+    """
+    self._background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+    self._drawn = self._in_lines
+
+
+def _fill_polygons(depth, values, baseline):
+  """
+  Polygon between baseline and the curve (NaNs at the baseline)
+  """
+  import numpy as np
+
+  if len(depth) < 2:
+    return []
+  x = np.where(np.isnan(values), baseline, values)
+  verts = np.concatenate([np.column_stack([x, depth]),
+                          [[baseline, depth[-1]], [baseline, depth[0]]]])
+
+  return [verts]
+
+
+def _paths(polygons):
+  """
+  Matplotlib paths of the (closed) polygons, as PolyCollection makes them
+  """
+  import numpy as np
+  from matplotlib.path import Path
+
+  return [Path(np.concatenate([p, p[:1]]), closed=True) for p in polygons]
@@ -0,0 +1,218 @@
+from .profiling import instrument
+
+
+@instrument
+def regrid(df, column_depth, column_feature, depth_regrid, stats='mean',
+           group=None, cache=None):
+  """
+  Regrid log data to coarsen or to produce blocky log by averaging
+
+  Input:
+
+  df is your dataframe (or LogStore, or a view of it)
+  column_depth is the column name of your depth
+  column_feature is the column name (or LIST of column names) to be regridded.
+    Numerical columns are reduced with the statistics in stats, categorical
+    (non-numerical) columns such as formation labels are reduced with the
+    mode (most frequent value in the interval)
+  depth_regrid is the array of interval boundaries (bin edges), ascending
+
+  stats is the statistic (or LIST of statistics) computed for every
+    numerical column. Default is 'mean'. Available:
+    * 'mean', 'median', 'min', 'max', 'count'
+    * 'wmean' thickness-weighted mean (each sample weighted by half the
+      distance to its neighbours, so irregular sampling is honoured)
+    * 'mode' most frequent value
+  group is the column name of the well name (or other grouping). Default is
+    None (single well). If specified, every well is regridded in one call
+  cache is a CurveCache (see curve_cache). Default is None (no cache). If
+    specified, a call with the same depth, features, depth_regrid, stats
+    and group as a previous call is a lookup
+
+  Each interval includes its shallower boundary and excludes its deeper
+  boundary, except the last interval that includes both. NaNs are ignored;
+  intervals without samples are NaN (count is 0, as an integer column).
+
+  Output:
+
+  df_regrid is the regridded dataframe with the interval midpoints in
+    column_depth+"_regrid". If a single statistic is given (default), the
+    regridded columns are named column_feature+"_regrid", otherwise
+    column_feature+"_"+stat+"_regrid" for every statistic. Categorical
+    columns are named column_feature+"_regrid"
+  """
+  import numpy as np
+  import pandas as pd
+
+  features = [column_feature] if isinstance(column_feature, str) else list(column_feature)
+  single_stat = isinstance(stats, str)
+  stat_list = [stats] if single_stat else list(stats)
+
+  edges = np.asarray(depth_regrid, dtype=float)
+
+  if cache is not None:
+    from .curve_cache import cache_key
+    columns = [column_depth] + features + ([] if group is None else [group])
+    key = cache_key('regrid', [df[c] for c in columns], features, edges,
+                    stats, group)
+    df_regrid = cache.get(key)
+    if df_regrid is not None:
+      return df_regrid.copy()
+  midpoint = 0.5 * (edges[:-1] + edges[1:])
+  nbin = len(edges) - 1
+
+  depth = np.asarray(df[column_depth], dtype=float)
+  if group is None:
+    group_codes = np.zeros(len(depth), dtype=np.int64)
+    group_names = None
+  else:
+    group_codes, group_names = pd.factorize(df[group], sort=True)
+  ngroup = 1 if group_names is None else len(group_names)
+
+  # sort once by (group, depth), then assign bins with a single searchsorted
+  order = np.lexsort((depth, group_codes))
+  depth_s = depth[order]
+  group_s = group_codes[order]
+  bins = _depth_bins(depth_s, edges)
+  valid = (bins >= 0) & (group_s >= 0)
+  keys = group_s[valid] * nbin + bins[valid]
+  rows = order[valid]
+
+  # segment boundaries of the sorted keys (one segment per non-empty bin)
+  starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+  if len(keys) == 0:
+    starts = starts[:0]
+  seg_keys = keys[starts]
+
+  weights = None
+  if 'wmean' in stat_list:
+    weights = _sample_thickness(depth_s, group_s)[valid]
+
+  out = {}
+  if group_names is not None:
+    out[group] = np.repeat(np.asarray(group_names), nbin)
+  out[column_depth+"_regrid"] = np.tile(midpoint, ngroup)
+
+  for col in features:
+    values = df[col]
+    if not pd.api.types.is_numeric_dtype(values):
+      # categorical curve: most frequent label in each interval
+      out[col+"_regrid"] = _block_mode(np.asarray(values)[rows], starts,
+                                      seg_keys, ngroup * nbin)
+      continue
+
+    values = np.asarray(values, dtype=float)[rows]
+    for stat in stat_list:
+      name = col+"_regrid" if single_stat else col+"_"+stat+"_regrid"
+      out[name] = _block_stat(values, stat, starts, seg_keys, ngroup * nbin,
+                              weights)
+
+  df_regrid = pd.DataFrame(out)
+  if cache is not None:
+    cache.put(key, df_regrid.copy())
+
+  return df_regrid
+
+
+def _depth_bins(depth, edges):
+  """
+  Bin index of every depth sample (-1 if outside the edges)
+  """
+  import numpy as np
+
+  bins = np.searchsorted(edges, depth, side='right') - 1
+  # samples on the last edge belong to the last interval
+  bins[depth == edges[-1]] = len(edges) - 2
+  bins[(depth < edges[0]) | (depth > edges[-1]) | np.isnan(depth)] = -1
+
+  return bins
+
+
+def _sample_thickness(depth, group):
+  """
+  Thickness represented by each sample of a (group, depth) sorted array
+  """
+  import numpy as np
+
+  gap = np.diff(depth)
+  gap[group[1:] != group[:-1]] = np.nan
+  above = np.r_[np.nan, gap]
+  below = np.r_[gap, np.nan]
+  above = np.where(np.isnan(above), below, above)
+  below = np.where(np.isnan(below), above, below)
+  thickness = 0.5 * (above + below)
+
+  return np.nan_to_num(thickness, nan=1.)
+
+
+def _block_stat(values, stat, starts, seg_keys, size, weights=None):
+  """
+  Reduce the key-sorted values of each segment to one statistic
+  """
+  import numpy as np
+
+  # counts are integers, empty intervals have a count of 0
+  out = np.zeros(size, dtype=np.int64) if stat == 'count' else np.full(size, np.nan)
+  if len(values) == 0:
+    return out
+
+  isnum = ~np.isnan(values)
+  filled = np.where(isnum, values, 0.)
+  count = np.add.reduceat(isnum.astype(np.int64), starts)
+
+  with np.errstate(invalid='ignore', divide='ignore'):
+    if stat == 'mean':
+      res = np.add.reduceat(filled, starts) / count
+    elif stat == 'count':
+      res = count
+    elif stat == 'min':
+      res = np.fmin.reduceat(values, starts)
+    elif stat == 'max':
+      res = np.fmax.reduceat(values, starts)
+    elif stat == 'wmean':
+      w = np.where(isnum, weights, 0.)
+      res = np.add.reduceat(filled * w, starts) / np.add.reduceat(w, starts)
+    elif stat == 'median':
+      # sort values inside each segment (NaNs last), pick the middle samples
+      seg = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(values)]))
+      v = values[np.lexsort((values, seg))]
+      lo = starts + np.maximum(count - 1, 0) // 2
+      hi = starts + count // 2
+      hi = np.minimum(hi, len(v) - 1)
+      res = np.where(count > 0, 0.5 * (v[lo] + v[hi]), np.nan)
+    elif stat == 'mode':
+      res = _block_mode(np.where(isnum, values, np.nan), starts, seg_keys, size)
+      return res
+    else:
+      raise ValueError("Unknown statistic '{}'".format(stat))
+
+  out[seg_keys] = res
+
+  return out
+
+
+def _block_mode(values, starts, seg_keys, size):
+  """
+  Most frequent value of each segment of key-sorted values
+  """
+  import numpy as np
+  import pandas as pd
+
+  codes, uniques = pd.factorize(values)
+  out = np.full(size, np.nan, dtype=object if uniques.dtype == object else float)
+  if len(codes) == 0:
+    return out
+
+  seg = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(codes)]))
+  ok = codes >= 0
+  pair = seg[ok] * len(uniques) + codes[ok]
+  pair, count = np.unique(pair, return_counts=True)
+  pair_seg, pair_code = np.divmod(pair, max(len(uniques), 1))
+
+  # largest count first within each segment, first seen label on ties
+  best = np.lexsort((pair_code, -count, pair_seg))
+  first = np.r_[True, pair_seg[best][1:] != pair_seg[best][:-1]]
+  best = best[first]
+  out[seg_keys[pair_seg[best]]] = np.asarray(uniques)[pair_code[best]]
+
+  return out
@@ -0,0 +1,106 @@
+"""
+Plot theme of the package (ggplot with the seaborn defaults)
+
+Usage:
+
+  from formation_evaluation.plotting import theme
+  with theme():
+    ...                                  # any plotting function
+
+The theme is only applied inside the with block (matplotlib rc_context, and
+the short color codes 'b', 'g', 'r', ... of the seaborn palette, as with
+sns.set_theme(color_codes=True)), so importing or calling the package never
+changes the global matplotlib style.
+The rc parameters are computed once per process. Use use_theme() to apply
+it globally instead (e.g. once at the top of a notebook).
+"""
+
+_RC = {}
+
+
+def theme_rc():
+  """
+  Dict of the matplotlib rc parameters of the theme (computed once)
+  """
+  if 'rc' not in _RC:
+    import matplotlib.style
+    import seaborn as sns
+    from cycler import cycler
+
+    rc = dict(matplotlib.style.library['ggplot'])
+    # the parameters of sns.set_theme(), without changing the global state
+    rc.update(sns.plotting_context('notebook'))
+    rc.update(sns.axes_style('darkgrid'))
+    rc['axes.prop_cycle'] = cycler('color', sns.color_palette('deep'))
+    _RC['rc'] = rc
+
+  return _RC['rc']
+
+
+def theme(rc=None):
+  """
+  Context manager of the theme
+
+  rc is a dict of rc parameters overriding the theme. Default is None
+  """
+  import contextlib
+  import matplotlib
+
+  params = dict(theme_rc())
+  params.update(rc or {})
+
+  @contextlib.contextmanager
+  def context():
+    colors = matplotlib.colors.get_named_colors_mapping()
+    saved = {code: colors[code] for code in color_codes()}
+    try:
+      for code, rgb in color_codes().items():
+        colors[code] = rgb
+      with matplotlib.rc_context(params):
+        yield
+    finally:
+      for code, rgb in saved.items():
+        colors[code] = rgb
+
+  return context()
+
+
+def color_codes():
+  """
+  Dict of the short color codes of the theme (computed once), as
+  sns.set_color_codes('deep')
+  """
+  if 'codes' not in _RC:
+    import seaborn as sns
+    from matplotlib.colors import to_rgb
+
+    palette = sns.color_palette('deep6') + [(.1, .1, .1)]
+    _RC['codes'] = {code: to_rgb(c) for code, c in zip('bgrmyck', palette)}
+
+  return _RC['codes']
+
+
+def themed(function):
+  """
+  Decorator drawing function with the theme
+  """
+  import functools
+
+  @functools.wraps(function)
+  def wrapper(*args, **kwargs):
+    with theme():
+      return function(*args, **kwargs)
+
+  return wrapper
+
+
+def use_theme():
+  """
+  Apply the theme globally (matplotlib rcParams)
+  """
+  import matplotlib
+
+  matplotlib.rcParams.update(theme_rc())
+  colors = matplotlib.colors.get_named_colors_mapping()
+  for code, rgb in color_codes().items():
+    colors[code] = rgb
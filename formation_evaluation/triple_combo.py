@@ -0,0 +1,212 @@
+from .profiling import instrument
+
+
+@instrument(plotting=True)
+def triple_combo(df, column_depth, column_GR, column_resistivity,
+                 column_NPHI, column_RHOB, min_depth, max_depth,
+                 min_GR=0, max_GR=150, sand_GR_line=60,
+                 min_resistivity=0.01, max_resistivity=1000,
+                 color_GR='black', color_resistivity='green',
+                 color_RHOB='red', color_NPHI='blue',
+                 figsize=(6,10), tight_layout=1,
+                 title_size=15, title_height=1.05, decimate=False,
+                 qc_flags=None):
+  """
+  Producing Triple Combo log
+
+  Input:
+
+  df is your dataframe (or LogStore view, e.g. store.window(well, top, base))
+  column_depth, column_GR, column_resistivity, column_NPHI, column_RHOB
+  are column names that appear in your dataframe (originally from the LAS file)
+
+  specify your depth limits; min_depth and max_depth
+
+  input variables other than above are default. You can specify
+  the values yourselves.
+
+  decimate is False by default. If True, the logs are sliced to min_depth
+  and max_depth and reduced to their min/max envelope per pixel row before
+  plotting (much faster for long or finely sampled logs, spikes are kept).
+  It can also be a DecimationPyramid of df, for repeated zoom and pan
+
+  qc_flags is the dataframe (or dict) of the QC flags of the logs, from
+  log_qc. Default is None. If specified, the flagged samples are marked on
+  the tracks (see qc_overlay). The flags are matched to df by index, so the
+  flags of the whole field can be used for a well of it
+
+  Output:
+
+  Fill colors; gold (sand), lime green (non-sand), blue (water-zone), orange (HC-zone)
+  """
+
+  import matplotlib.pyplot as plt
+
+  fig = plt.figure(figsize=(8,10))
+  tracks = triple_combo_axes(fig, min_depth, max_depth, min_GR=min_GR,
+                             max_GR=max_GR, min_resistivity=min_resistivity,
+                             max_resistivity=max_resistivity,
+                             color_GR=color_GR,
+                             color_resistivity=color_resistivity,
+                             title_size=title_size, title_height=title_height)
+  triple_combo_curves(tracks, df, column_depth, column_GR, column_resistivity,
+                      column_NPHI, column_RHOB, min_depth, max_depth,
+                      sand_GR_line=sand_GR_line, color_GR=color_GR,
+                      color_resistivity=color_resistivity,
+                      color_RHOB=color_RHOB, color_NPHI=color_NPHI,
+                      decimate=decimate, qc_flags=qc_flags)
+
+  plt.tight_layout()
+  plt.show()
+
+
+@instrument(plotting=True)
+def triple_combo_axes(fig, min_depth, max_depth, min_GR=0, max_GR=150,
+                      min_resistivity=0.01, max_resistivity=1000,
+                      color_GR='black', color_resistivity='green',
+                      title_size=15, title_height=1.05):
+  """
+  Create the (empty) tracks of Triple Combo log on fig
+
+  The tracks do not depend on the data, so they can be created once and
+  reused for many wells with triple_combo_curves (see batch_render)
+
+  Output:
+
+  tracks is a dict of the axes; 'ax' (the 3 base axes), 'gr', 'res', 'nphi'
+    and 'rhob' (the twinned curve axes)
+  """
+  ax = fig.subplots(1,3)
+  fig.suptitle('Triple Combo Log', size=title_size, y=title_height)
+
+  ax[0].minorticks_on()
+  ax[0].grid(which='major', linestyle='-', linewidth='0.5', color='lime')
+  ax[0].grid(which='minor', linestyle=':', linewidth='1', color='black')
+
+  ax[1].minorticks_on()
+  ax[1].grid(which='major', linestyle='-', linewidth='0.5', color='lime')
+  ax[1].grid(which='minor', linestyle=':', linewidth='1', color='black')
+
+  ax[2].minorticks_on()
+  ax[2].grid(which='major', linestyle='-', linewidth='0.5', color='lime')
+  ax[2].grid(which='minor', linestyle=':', linewidth='1', color='black')
+
+  # First track: GR
+  ax[0].get_xaxis().set_visible(False)
+  ax[0].invert_yaxis()
+
+  gr=ax[0].twiny()
+  gr.set_xlim(min_GR,max_GR)
+  gr.set_xlabel('GR',color=color_GR)
+  gr.set_ylim(max_depth, min_depth)
+  gr.spines['top'].set_position(('outward',10))
+  gr.tick_params(axis='x',colors=color_GR)
+
+  gr.minorticks_on()
+  gr.xaxis.grid(which='major', linestyle='-', linewidth='0.5', color='lime')
+  gr.xaxis.grid(which='minor', linestyle=':', linewidth='1', color='black')
+
+  # Second track: Resistivity
+  ax[1].get_xaxis().set_visible(False)
+  ax[1].invert_yaxis()
+
+  res=ax[1].twiny()
+  res.set_xscale('log')
+  res.set_xlim(min_resistivity,max_resistivity)
+  res.set_xlabel('Resistivity',color=color_resistivity)
+  res.set_ylim(max_depth, min_depth)
+  res.spines['top'].set_position(('outward',10))
+  res.tick_params(axis='x',colors=color_resistivity)
+
+  res.minorticks_on()
+  res.xaxis.grid(which='major', linestyle='-', linewidth='0.5', color='lime')
+  res.xaxis.grid(which='minor', linestyle=':', linewidth='1', color='black')
+
+  # Third track: NPHI and RHOB
+  ax[2].get_xaxis().set_visible(False)
+  ax[2].invert_yaxis()
+
+  ## NPHI curve
+  nphi=ax[2].twiny()
+  nphi.set_xlim(-0.15,0.45)
+  nphi.invert_xaxis()
+  nphi.set_xlabel('NPHI',color='blue')
+  nphi.set_ylim(max_depth, min_depth)
+  nphi.spines['top'].set_position(('outward',10))
+  nphi.tick_params(axis='x',colors='blue')
+
+  nphi.minorticks_on()
+  nphi.xaxis.grid(which='major', linestyle='-', linewidth='0.5', color='lime')
+  nphi.xaxis.grid(which='minor', linestyle=':', linewidth='1', color='black')
+
+  ## RHOB curve
+  rhob=ax[2].twiny()
+  rhob.set_xlim(1.95,2.95)
+  rhob.set_xlabel('RHOB',color='red')
+  rhob.set_ylim(max_depth, min_depth)
+  rhob.spines['top'].set_position(('outward',50))
+  rhob.tick_params(axis='x',colors='red')
+
+  res.minorticks_on()
+  res.grid(which='major', linestyle='-', linewidth='0.5', color='lime')
+  res.grid(which='minor', linestyle=':', linewidth='1', color='black')
+
+  return {'ax': ax, 'gr': gr, 'res': res, 'nphi': nphi, 'rhob': rhob}
+
+
+@instrument(plotting=True)
+def triple_combo_curves(tracks, df, column_depth, column_GR, column_resistivity,
+                        column_NPHI, column_RHOB, min_depth, max_depth,
+                        sand_GR_line=60, color_GR='black',
+                        color_resistivity='green', color_RHOB='red',
+                        color_NPHI='blue', decimate=False, qc_flags=None):
+  """
+  Draw the curves and fills of Triple Combo log on the tracks made by
+  triple_combo_axes
+
+  Output:
+
+  artists is the list of the drawn artists (remove them to draw another well
+    on the same tracks)
+  """
+  import numpy as np
+  from . import decimation
+
+  gr, res, nphi, rhob = tracks['gr'], tracks['res'], tracks['nphi'], tracks['rhob']
+  df_full = df
+
+  if decimate is not False:
+    pyramid = None if decimate is True else decimate
+    df = decimation.decimate(df, column_depth,
+                             [column_GR, column_resistivity, column_NPHI, column_RHOB],
+                             min_depth, max_depth,
+                             decimation.pixel_height(tracks['ax'][0]),
+                             pyramid=pyramid)
+
+  artists = []
+  artists += gr.plot(df[column_GR], df[column_depth], color=color_GR)
+  artists.append(gr.fill_betweenx(df[column_depth], sand_GR_line, df[column_GR], where=(sand_GR_line>=df[column_GR]), color = 'gold', linewidth=0)) # sand
+  artists.append(gr.fill_betweenx(df[column_depth], sand_GR_line, df[column_GR], where=(sand_GR_line<df[column_GR]), color = 'lime', linewidth=0)) # shale
+
+  artists += res.plot(df[column_resistivity], df[column_depth], color=color_resistivity)
+
+  artists += nphi.plot(df[column_NPHI], df[column_depth], color=color_NPHI)
+  artists += rhob.plot(df[column_RHOB], df[column_depth], color=color_RHOB)
+
+  # solution to produce fill between can be found here:
+  # https://stackoverflow.com/questions/57766457/how-to-plot-fill-betweenx-to-fill-the-area-between-y1-and-y2-with-different-scal
+  x2p, _ = (rhob.transData + nphi.transData.inverted()).transform(np.c_[df[column_RHOB], df[column_depth]]).T
+  nphi.autoscale(False)
+  artists.append(nphi.fill_betweenx(df[column_depth], df[column_NPHI], x2p, color="orange", alpha=0.4, where=(x2p > df[column_NPHI]))) # hydrocarbon
+  artists.append(nphi.fill_betweenx(df[column_depth], df[column_NPHI], x2p, color="blue", alpha=0.4, where=(x2p < df[column_NPHI]))) # water
+
+  if qc_flags is not None:
+    # flags of the samples of df (not of the decimated curves)
+    from .log_qc import qc_overlay
+    for ax, column in [(gr, column_GR), (res, column_resistivity),
+                       (nphi, column_NPHI), (rhob, column_RHOB)]:
+      if column in qc_flags:
+        artists += qc_overlay(ax, df_full, column_depth, column, qc_flags[column],
+                              min_depth, max_depth)
+
+  return artists
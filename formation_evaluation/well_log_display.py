@@ -0,0 +1,159 @@
+from .profiling import instrument
+
+
+@instrument(plotting=True)
+def well_log_display(df, column_depth, column_list, 
+                     column_semilog=None, min_depth=None, max_depth=None, 
+                     column_min=None, column_max=None, colors=None, 
+                     fm_tops=None, fm_depths=None, 
+                     tight_layout=1, title_size=10, decimate=False,
+                     qc_flags=None):
+  """
+  Display log side‑by‑side style
+  Input:
+  df is your dataframe (or LogStore view, e.g. store.window(well, top, base))
+  specify min_depth and max_depth as the upper and lower depth limit
+  column_depth is the column name of your depth
+  column_list is the LIST of column names that you will display
+
+  column_semilog is specific for resistivity column; if your resistivities are 
+    in column 3, specify as: column_semilog=2. Default is None, so if you don't 
+    specify, the resistivity will be plotted in normal axis instead
+    
+  column_min is list of minimum values for the x‑axes.
+  column_max is list of maximum values for the x‑axes.
+  
+  colors is the list of colors specified for each log names. Default is None,
+    so if don't specify, the colors will be Matplotlib default (blue)
+  fm_tops and fm_depths are the list of formation top names and depths.
+    Default is None, so no tops are shown. Specify both lists, if you want
+    to show the tops
+  decimate is False by default. If True, the logs are sliced to min_depth
+    and max_depth and reduced to their min/max envelope per pixel row before
+    plotting (much faster for long or finely sampled logs, spikes are kept).
+    It can also be a DecimationPyramid of df, for repeated zoom and pan
+  qc_flags is the dataframe (or dict) of the QC flags of the logs, from
+    log_qc. Default is None. If specified, the flagged samples are marked
+    on the tracks (see qc_overlay). The flags are matched to df by index,
+    so the flags of the whole field can be used for a well of it
+  """
+  import matplotlib.pyplot as plt
+
+  fig = plt.figure(figsize=(20,10))
+  ax = well_log_axes(fig, column_list, column_semilog=column_semilog,
+                     min_depth=min_depth, max_depth=max_depth,
+                     column_min=column_min, column_max=column_max,
+                     title_size=title_size)
+  well_log_curves(ax, df, column_depth, column_list, min_depth=min_depth,
+                  max_depth=max_depth, colors=colors, fm_tops=fm_tops,
+                  fm_depths=fm_depths, decimate=decimate, qc_flags=qc_flags)
+
+  if tight_layout:
+    plt.tight_layout()
+  plt.show()
+
+
+@instrument(plotting=True)
+def well_log_axes(fig, column_list, column_semilog=None, min_depth=None,
+                  max_depth=None, column_min=None, column_max=None,
+                  title_size=10):
+  """
+  Create the (empty) tracks of side-by-side log display on fig
+
+  The tracks do not depend on the data, so they can be created once and
+  reused for many wells with well_log_curves (see batch_render)
+
+  Output:
+
+  ax is the array of axes, one per log
+  """
+  logs = column_list
+
+  # create the subplots; ncols equals the number of logs
+  ax = fig.subplots(nrows=1, ncols=len(logs), squeeze=False)[0]
+
+  for i in range(len(logs)):
+    if i == column_semilog:
+      # for resistivity, semilog plot
+      ax[i].set_xscale('log')
+
+    ax[i].set_title(logs[i], size=title_size)
+    ax[i].minorticks_on()
+    ax[i].grid(which='major', linestyle='-', linewidth='0.5', color='lime')
+    ax[i].grid(which='minor', linestyle=':', linewidth='0.5', color='black')
+    if column_min!=None and column_max!=None:
+      # x-axis limits defined
+      ax[i].set_xlim(column_min[i], column_max[i])
+    if min_depth!=None and max_depth!=None:
+      # y-axis limit defined
+      ax[i].set_ylim(min_depth, max_depth)
+    ax[i].invert_yaxis()
+
+  return ax
+
+
+@instrument(plotting=True)
+def well_log_curves(ax, df, column_depth, column_list, min_depth=None,
+                    max_depth=None, colors=None, fm_tops=None, fm_depths=None,
+                    decimate=False, qc_flags=None):
+  """
+  Draw the logs (and formation tops) on the tracks made by well_log_axes
+
+  Output:
+
+  artists is the list of the drawn artists (remove them to draw another well
+    on the same tracks)
+  """
+  import random
+  from . import decimation
+
+  logs = column_list
+  df_full = df
+
+  if decimate is not False:
+    pyramid = None if decimate is True else decimate
+    df = decimation.decimate(df, column_depth, logs, min_depth, max_depth,
+                             decimation.pixel_height(ax[0]), pyramid=pyramid)
+
+  # looping each log to display in the subplots
+  artists = []
+  for i in range(len(logs)):
+    if colors==None:
+      # color is None (default)
+      artists += ax[i].plot(df[logs[i]], df[column_depth])
+    else:
+      # colors are defined (as list)
+      artists += ax[i].plot(df[logs[i]], df[column_depth], color=colors[i])
+
+  # ---------------------------------------------------------------------------
+  #  NEW: draw formation tops AND put the text label on each line
+  # ---------------------------------------------------------------------------
+  if fm_tops!=None and fm_depths!=None:
+    # produce a stable colour per top
+    rgb = [(random.random(), random.random(), random.random())
+           for _ in fm_tops]
+
+    for i in range(len(logs)):
+      for j, top in enumerate(fm_tops):
+        depth = fm_depths[j]
+        artists.append(ax[i].axhline(y=depth, linestyle=":", c=rgb[j]))
+
+        # place the formation‐name text slightly inside the left axis
+        xmin, xmax = ax[i].get_xlim()
+        xpos = xmin + 0.02 * (xmax - xmin)   # 2 % from left edge
+        artists.append(ax[i].text(
+          xpos, depth, top,
+          color=rgb[j], va='center', ha='left',
+          fontsize=7,
+          bbox=dict(boxstyle="round,pad=0.2", fc="white", alpha=0.6)
+        ))
+
+  if qc_flags is not None:
+    # flags of the samples of df (not of the decimated curves)
+    from .log_qc import qc_overlay
+    for i in range(len(logs)):
+      if logs[i] in qc_flags:
+        artists += qc_overlay(ax[i], df_full, column_depth, logs[i],
+                              qc_flags[logs[i]], min_depth, max_depth)
+
+  return artists
@@ -0,0 +1,36 @@
+"""
+Field-scale workflows: LAS reading, pipelines, statistics, correlation,
+caching and real-time wells, imported from their modules on first access
+"""
+
+# name: module
+_NAMES = {
+    'read_las': 'las_reader',
+    'pipeline': 'pipeline', 'run_pipeline': 'pipeline',
+    'run_parallel': 'pipeline', 'read_csv_wells': 'pipeline',
+    'read_las_wells': 'pipeline', 'label_stage': 'pipeline',
+    'interpolation_stage': 'pipeline', 'regrid_stage': 'pipeline',
+    'petrophysics_stage': 'pipeline', 'render_stage': 'pipeline',
+    'csv_writer': 'pipeline',
+    'log_statistics': 'log_statistics', 'LogStatistics': 'log_statistics',
+    'CorrelationIndex': 'correlation', 'correlate_top': 'correlation',
+    'CurveCache': 'curve_cache', 'shared_cache': 'curve_cache',
+    'LiveWell': 'realtime',
+    'decimate': 'decimation', 'DecimationPyramid': 'decimation',
+    'density_grid': 'fracture', 'rose_histogram': 'fracture'}
+
+__all__ = sorted(_NAMES)
+
+
+def __getattr__(name):
+  if name in _NAMES:
+    import importlib
+
+    value = getattr(importlib.import_module('.' + _NAMES[name], __package__), name)
+    globals()[name] = value
+    return value
+  raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
+
+
+def __dir__():
+  return sorted(list(globals()) + __all__)
@@ -0,0 +1,5 @@
+# checkout shim of formation_evaluation.log_qc (not installed)
+import importlib
+import sys
+
+sys.modules[__name__] = importlib.import_module('formation_evaluation.' + __name__)
@@ -0,0 +1,68 @@
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from formation_evaluation import batch_render
+from formation_evaluation import profiling
+
+LAYOUT = {'kind': 'triple_combo', 'column_depth': 'DEPTH', 'column_GR': 'GR',
+          'column_resistivity': 'RT', 'column_NPHI': 'NPHI',
+          'column_RHOB': 'RHOB', 'min_depth': 1000, 'max_depth': 1100}
+
+
+def _well(seed, n=200):
+  rng = np.random.default_rng(seed)
+  return pd.DataFrame({'DEPTH': np.linspace(1000, 1100, n),
+                       'GR': rng.uniform(20, 120, n),
+                       'RT': rng.uniform(1, 100, n),
+                       'NPHI': rng.uniform(0.05, 0.4, n),
+                       'RHOB': rng.uniform(2.0, 2.7, n)})
+
+
+def _children(layout):
+  fig, _ = batch_render._template(layout)
+  return [len(ax.get_children()) for ax in fig.axes]
+
+
+def test_failing_well_leaves_template_empty(tmp_path):
+  batch_render._TEMPLATES.clear()
+  empty = _children(LAYOUT)
+
+  # the middle well fails after its GR, RT and NPHI curves are drawn
+  wells = {'A': _well(0), 'B': _well(1).drop(columns='RHOB'), 'C': _well(2)}
+  report = batch_render.batch_render(wells, LAYOUT, str(tmp_path), n_jobs=1)
+
+  assert report['ERROR'].isna().tolist() == [True, False, True]
+  assert 'RHOB' in report['ERROR'][1]
+  assert len(report['FILES'][2]) == 1
+  assert _children(LAYOUT) == empty
+
+
+def _render_or_crash(name, *args):
+  import os
+  if name == 'B':
+    os._exit(1)
+  return _RENDER_WELL(name, *args)
+
+
+_RENDER_WELL = batch_render._render_well
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(),
+                    reason='the patched function reaches the workers by fork')
+def test_crashed_worker_fails_only_its_well(tmp_path, monkeypatch):
+  monkeypatch.setattr(batch_render, '_render_well', _render_or_crash)
+  wells = {name: _well(i) for i, name in enumerate('ABCD')}
+
+  profiling.reset()
+  with profiling.profile():
+    report = batch_render.batch_render(wells, LAYOUT, str(tmp_path), n_jobs=2)
+
+  assert report['WELL'].tolist() == list('ABCD')
+  assert report['ERROR'].isna().tolist() == [True, False, True, True]
+  assert 'died' in report['ERROR'][1]
+  assert [len(files) for files in report['FILES']] == [1, 0, 1, 1]
+  # the calls recorded in the workers are merged
+  assert (profiling.records()['NAME'] == 'triple_combo.triple_combo_curves').sum() == 3
@@ -0,0 +1,18 @@
+import benchmark
+
+
+def test_core_import_loads_no_third_party_module():
+  seconds, modules = benchmark.startup_time(repeat=1)
+  assert modules == []
+
+
+def test_main_fails_when_core_import_loads_plotting(tmp_path, monkeypatch):
+  monkeypatch.setitem(benchmark.SCALES, 'quick', [])
+  output = str(tmp_path / 'results.json')
+
+  monkeypatch.setattr(benchmark, 'startup_time', lambda repeat: (0.01, []))
+  assert benchmark.main(['--output', output]) == 0
+
+  monkeypatch.setattr(benchmark, 'startup_time',
+                      lambda repeat: (0.01, ['matplotlib']))
+  assert benchmark.main(['--output', output]) == 1
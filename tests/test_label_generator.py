@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from formation_evaluation.label_generator import label_generator
+
+
+def test_multi_well_tops():
+  df = pd.DataFrame({
+      'WELL': ['A'] * 5 + ['B'] * 5 + ['C'] * 2,
+      'DEPTH': [990., 1000., 1005., 1100., 1200.,
+                1000., 1049.9, 1050., 1150., 1300.,
+                1000., 1100.]})
+  # tops of B in reverse depth order, C has no tops
+  tops = pd.DataFrame({'WELL': ['A', 'A', 'B', 'B'],
+                       'FM': ['Top1', 'Top2', 'Top2', 'Top1'],
+                       'DEPTH': [1000., 1100., 1150., 1050.]})
+  # interleave the wells
+  df = df.iloc[[0, 5, 10, 1, 6, 11, 2, 7, 3, 8, 4, 9]].reset_index(drop=True)
+
+  label_generator(df, tops, 'DEPTH', 'FM', column_well='WELL')
+
+  expected = {('A', 990.): None, ('A', 1000.): 'Top1', ('A', 1005.): 'Top1',
+              ('A', 1100.): 'Top2', ('A', 1200.): 'Top2',
+              ('B', 1000.): None, ('B', 1049.9): None, ('B', 1050.): 'Top1',
+              ('B', 1150.): 'Top2', ('B', 1300.): 'Top2',
+              ('C', 1000.): None, ('C', 1100.): None}
+  for well, depth, label in zip(df['WELL'], df['DEPTH'], df['FM']):
+    assert (None if pd.isna(label) else label) == expected[(well, depth)], (well, depth)
+  assert isinstance(df['FM'].dtype, pd.CategoricalDtype)
+
+
+def test_single_well():
+  df = pd.DataFrame({'DEPTH': np.arange(995., 1010., 1.)})
+  tops = pd.DataFrame({'FM': ['Top2', 'Top1'], 'DEPTH': [1005., 1000.]})
+
+  label_generator(df, tops, 'DEPTH', 'FM')
+
+  expected = [None] * 5 + ['Top1'] * 5 + ['Top2'] * 5
+  assert [None if pd.isna(x) else x for x in df['FM']] == expected
@@ -0,0 +1,43 @@
+import numpy as np
+
+from formation_evaluation.las_reader import read_las
+
+LAS = """~VERSION INFORMATION
+VERS.   2.0 : CWLS LOG ASCII STANDARD - VERSION 2.0
+WRAP.   NO  : ONE LINE PER DEPTH STEP
+~WELL INFORMATION
+WELL.   TEST-1 : WELL
+NULL.   -999.25 : NULL VALUE
+~CURVE INFORMATION
+DEPT.M   : DEPTH
+GR  .API : GAMMA RAY
+RHOB.G/C3 : BULK DENSITY
+~A
+1000.0  45.0  2.35
+1000.5  -999.25  2.40
+1001.0  60.0  2.45
+"""
+
+
+def _write(tmp_path):
+  filename = tmp_path / 'test.las'
+  filename.write_text(LAS)
+  return str(filename)
+
+
+def test_cached_frame_is_writable(tmp_path):
+  filename, cache_dir = _write(tmp_path), str(tmp_path / 'cache')
+  cold = read_las(filename, cache_dir=cache_dir)
+  cached = read_las(filename, cache_dir=cache_dir)
+  np.testing.assert_array_equal(cold.to_numpy(), cached.to_numpy())
+
+  # the same in-place edits work on a cold read and on a cache hit
+  for df in (cold, cached):
+    df['GR'] *= 2
+    df.loc[0, 'RHOB'] = 2.0
+  np.testing.assert_array_equal(cold.to_numpy(), cached.to_numpy())
+
+  # the edits never reach the cache
+  again = read_las(filename, cache_dir=cache_dir)
+  np.testing.assert_array_equal(again['GR'].to_numpy(), [45., np.nan, 60.])
+  assert again.loc[0, 'RHOB'] == 2.35
@@ -0,0 +1,53 @@
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+
+from formation_evaluation.log_qc import SPIKE, log_qc, qc_overlay
+
+
+def _field():
+  # two wells concatenated without ignore_index: the index labels overlap
+  rng = np.random.default_rng(0)
+  wells = []
+  for well, spike in [('A', 40), ('B', 70)]:
+    gr = 60 + rng.normal(0, 2, 100)
+    gr[spike] = 300
+    wells.append(pd.DataFrame({'WELL': well, 'DEPTH': 1000 + np.arange(100.),
+                               'GR': gr}))
+  return pd.concat(wells)
+
+
+def _spikes(artists):
+  return [line.get_ydata() for line in artists if line.get_marker() == 'x']
+
+
+def test_overlay_one_well_of_field_with_duplicate_index():
+  df = _field()
+  df_flags = log_qc(df, ['GR'], column_well='WELL')
+  well = (df['WELL'] == 'B').to_numpy()
+
+  fig, ax = plt.subplots()
+  try:
+    artists = qc_overlay(ax, df[well], 'DEPTH', 'GR', df_flags['GR'][well])
+    assert [list(y) for y in _spikes(artists)] == [[1070.]]
+
+    with pytest.raises(ValueError, match='same mask'):
+      qc_overlay(ax, df[well], 'DEPTH', 'GR', df_flags['GR'])
+  finally:
+    plt.close(fig)
+
+
+def test_overlay_one_well_with_field_flags_by_index():
+  df = _field().reset_index(drop=True)
+  df_flags = log_qc(df, ['GR'], column_well='WELL')
+  assert df_flags['GR'][170] & SPIKE
+
+  fig, ax = plt.subplots()
+  try:
+    artists = qc_overlay(ax, df[df['WELL'] == 'B'], 'DEPTH', 'GR', df_flags['GR'])
+    assert [list(y) for y in _spikes(artists)] == [[1070.]]
+  finally:
+    plt.close(fig)
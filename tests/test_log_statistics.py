@@ -0,0 +1,16 @@
+import numpy as np
+import pandas as pd
+
+from formation_evaluation.log_statistics import LogStatistics
+
+
+def test_update_keeps_wells_missing_from_batch():
+  df = pd.DataFrame({'WELL': pd.Categorical(['A'] * 5 + ['B'] * 5),
+                     'FM': ['X'] * 10, 'GR': np.arange(10.)})
+  stats = LogStatistics('WELL', 'FM', ['GR']).update(df)
+  before = stats.table[stats.table['WELL'] == 'B'].reset_index(drop=True)
+
+  # the batch of well A still has B among the categories of its well column
+  stats.update(df[df['WELL'] == 'A'])
+  after = stats.table[stats.table['WELL'] == 'B'].reset_index(drop=True)
+  pd.testing.assert_frame_equal(before, after)
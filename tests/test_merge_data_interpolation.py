@@ -0,0 +1,72 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import interpolate
+
+from formation_evaluation.merge_data_interpolation import merge_data_interpolation
+
+
+def _surveys():
+  rng = np.random.default_rng(0)
+  frames = []
+  for well, n in [('A', 30), ('B', 12), ('C', 50)]:
+    md = np.sort(rng.uniform(0, 3000, n))
+    frames.append(pd.DataFrame({'WELL': well, 'MD': md,
+                                'TVD': np.cumsum(rng.uniform(0.5, 1, n)) * 100,
+                                'INC': rng.uniform(0, 60, n)}))
+  return pd.concat(frames, ignore_index=True)
+
+
+def _logs(df_data):
+  rng = np.random.default_rng(1)
+  frames = []
+  for well, dfw in df_data.groupby('WELL'):
+    # inside the survey of the well, plus some samples beyond its end
+    md = np.linspace(dfw['MD'].min(), dfw['MD'].max() + 200, 300)
+    frames.append(pd.DataFrame({'WELL': well, 'MD': md}))
+  # wells interleaved, plus a well without survey
+  frames.append(pd.DataFrame({'WELL': 'D', 'MD': np.linspace(0, 100, 10)}))
+  return pd.concat(frames, ignore_index=True).sample(frac=1, random_state=0)
+
+
+@pytest.mark.parametrize('kind', ['linear', 'cubic'])
+def test_grouped_merge_matches_per_well_interpolation(kind):
+  df_data = _surveys()
+  df_new = _logs(df_data)
+
+  result = merge_data_interpolation(df_data, df_new, 'MD', ['TVD', 'INC'], 'MD',
+                                    kind=kind, column_well='WELL')
+
+  assert result.index.equals(df_new.index)
+  for well, rows in result.groupby('WELL'):
+    dfw = df_data[df_data['WELL'] == well]
+    for c in ['TVD', 'INC']:
+      if len(dfw) == 0:
+        assert rows[c].isna().all()
+        continue
+      # the original single-well interpolation: scipy, NaN below the data
+      f = interpolate.interp1d(dfw['MD'], dfw[c], kind=kind,
+                               fill_value='extrapolate')
+      expected = np.where(rows['MD'] > dfw['MD'].max(), np.nan, f(rows['MD']))
+      np.testing.assert_allclose(rows[c], expected, rtol=1e-9, atol=1e-9,
+                                 err_msg='{} {}'.format(well, c))
+
+
+def test_cubic_with_few_points_warns_and_is_linear():
+  df_data = pd.DataFrame({'WELL': ['A'] * 3 + ['B'] * 5,
+                          'MD': [0., 100., 300., 0., 100., 200., 300., 400.],
+                          'TVD': [0., 90., 250., 0., 95., 180., 260., 330.]})
+  df_new = pd.DataFrame({'WELL': ['A', 'A', 'B'], 'MD': [50., 200., 150.]})
+
+  with pytest.warns(UserWarning, match='at least 4 points'):
+    result = merge_data_interpolation(df_data, df_new, 'MD', ['TVD'], 'MD',
+                                      kind='cubic', column_well='WELL')
+  np.testing.assert_allclose(result['TVD'][:2], [45., 170.])
+
+  # wells with enough points do not warn
+  with warnings.catch_warnings():
+    warnings.simplefilter('error')
+    merge_data_interpolation(df_data[df_data['WELL'] == 'B'], df_new, 'MD',
+                             ['TVD'], 'MD', kind='cubic')
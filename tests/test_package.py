@@ -0,0 +1,31 @@
+import importlib
+
+import pandas as pd
+
+import formation_evaluation
+from formation_evaluation import core, plotting, workflow
+
+
+def test_namespaces_load_package_modules():
+  from formation_evaluation import log_qc, pipeline, regrid
+
+  assert core.regrid is regrid.regrid
+  assert plotting.qc_overlay is log_qc.qc_overlay
+  assert workflow.run_parallel is pipeline.run_parallel
+  assert formation_evaluation.core is core
+
+
+def test_checkout_shims_are_the_package_modules():
+  for name in ['regrid', 'batch_render', 'profiling']:
+    assert importlib.import_module(name) is \
+        importlib.import_module('formation_evaluation.' + name)
+
+
+def test_profiled_names_are_relative_to_the_package():
+  from formation_evaluation import profiling
+
+  profiling.reset()
+  with profiling.profile():
+    core.regrid(pd.DataFrame({'DEPTH': [1., 2., 3.], 'GR': [1., 2., 3.]}),
+                'DEPTH', ['GR'], [0., 2., 4.])
+  assert 'regrid.regrid' in set(profiling.records()['NAME'])
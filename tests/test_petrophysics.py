@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from formation_evaluation.petrophysics import petrophysics
+
+
+def _params():
+  generic = {'rho_ma': 2.65, 'rho_fl': 1.0, 'GR_min': 20., 'GR_max': 120.,
+             'A': 0.1, 'B': 0., 'a': 1., 'm': 2., 'n': 2., 'Rw': 0.05,
+             'k0': 1., 'k_phif': 5., 'k_vsh': -2.}
+  return pd.DataFrame([
+      dict(generic, WELL=None, FM='X'),
+      # only GR_max differs in well B
+      {'WELL': 'B', 'FM': 'X', 'GR_max': 150.},
+      dict(generic, WELL=None, FM='Y', rho_ma=2.71)])
+
+
+def test_partial_well_override_keeps_generic_parameters():
+  df = pd.DataFrame({'WELL': ['A', 'B', 'B', 'C'], 'FM': ['X', 'X', 'Y', 'Z'],
+                     'GR': [70., 70., 70., 70.], 'RHOB': [2.3] * 4,
+                     'NPHI': [0.2] * 4, 'RT': [10.] * 4})
+  petrophysics(df, _params(), 'FM', column_well='WELL')
+
+  np.testing.assert_allclose(df['VSH'][:3], [0.5, 50. / 130., 0.5])
+  # every other parameter of well B in X comes from the generic row
+  np.testing.assert_allclose(df['PHID'][:2], (2.65 - 2.3) / 1.65)
+  for c in ['PHIF', 'SW', 'KLOGH']:
+    assert np.isfinite(df[c][:3]).all(), c
+  np.testing.assert_allclose(df['PHID'][2], (2.71 - 2.3) / 1.71)
+  # formation without parameters
+  assert df.iloc[3][['VSH', 'PHID', 'PHIF', 'SW', 'KLOGH']].isna().all()
+
+
+def test_without_well_column_matches_generic_rows():
+  df = pd.DataFrame({'FM': ['X', 'Y'], 'GR': [70., 70.], 'RHOB': [2.3, 2.3],
+                     'NPHI': [0.2, 0.2], 'RT': [10., 10.]})
+  df_params = _params()
+  petrophysics(df, df_params[df_params['WELL'].isna()].drop(columns='WELL'), 'FM')
+
+  np.testing.assert_allclose(df['VSH'], [0.5, 0.5])
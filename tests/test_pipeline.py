@@ -0,0 +1,43 @@
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from formation_evaluation import pipeline
+
+
+def _wells():
+  return pd.DataFrame({'WELL': np.repeat(['A', 'B', 'C', 'D'], 50),
+                       'DEPTH': np.tile(np.linspace(1000, 1049, 50), 4),
+                       'GR': np.arange(200, dtype=float)})
+
+
+def _stage(well, df):
+  if well == 'B':
+    os._exit(1)
+  if well == 'C':
+    raise ValueError('bad well')
+  df = df.copy()
+  df['GR2'] = 2 * df['GR']
+  return df
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(),
+                    reason='the stage kills its worker, not the test process')
+def test_failing_wells_do_not_stop_the_others():
+  calls = []
+  results, report = pipeline.run_parallel(
+      _wells(), [_stage], column_well='WELL', n_jobs=2,
+      progress=lambda *args: calls.append(args))
+
+  assert [well for well, df in results] == ['A', 'B', 'C', 'D']
+  assert results[1][1] is None and results[2][1] is None
+  assert 'died' in report['ERROR'][1]
+  assert 'bad well' in report['ERROR'][2]
+  for i in (0, 3):
+    assert pd.isna(report['ERROR'][i])
+    assert np.array_equal(results[i][1]['GR2'], 2 * results[i][1]['GR'])
+  assert sorted(done for done, total, well, error in calls) == [1, 2, 3, 4]
+  assert sorted(well for done, total, well, error in calls) == ['A', 'B', 'C', 'D']
@@ -0,0 +1,27 @@
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from formation_evaluation import profiling
+
+
+@profiling.instrument(plotting=True)
+def _draw(ax):
+  ax.plot([0, 1], [0, 1])
+
+
+def test_plotting_call_keeps_current_figure():
+  first, ax = plt.subplots()
+  second, _ = plt.subplots()
+  plt.figure(first.number)
+  try:
+    profiling.reset()
+    with profiling.profile():
+      _draw(ax)
+    assert plt.gcf() is first
+    record = profiling.records().iloc[-1]
+    assert record['NAME'].endswith('_draw')
+    assert record['ARTISTS'] == 1
+  finally:
+    plt.close(first)
+    plt.close(second)
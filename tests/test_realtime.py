@@ -0,0 +1,33 @@
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+from formation_evaluation.realtime import LivePanel, LiveWell
+
+
+def _chunk(a, b):
+  depth = np.arange(a, b, 0.5)
+  return {'DEPTH': depth, 'GR': 75 + 40 * np.sin(depth / 7)}
+
+
+def test_fill_paths_stay_bounded():
+  live = LiveWell('DEPTH', ['GR'])
+  live.append(_chunk(1000, 1010))
+  panel = LivePanel(live, window=100, fills={'GR': (75, 'gold')},
+                    column_min=[0], column_max=[150])
+  try:
+    counts = []
+    for a in range(1010, 1600, 5):
+      live.append(_chunk(a, a + 5))
+      panel.update()
+      counts.append(len(panel.polys['GR'].get_paths()))
+
+    # one polygon after every scroll, one more per update until the next
+    assert max(counts) <= 100 / 5 + 1
+    assert counts.count(1) >= 5
+    # the merged fill covers the whole curve
+    vertices = panel.polys['GR'].get_paths()[0].vertices
+    assert vertices[:,1].min() == 1000 and vertices[:,1].max() >= 1500
+  finally:
+    plt.close(panel.fig)
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from formation_evaluation.regrid import regrid
+
+EDGES = np.array([100., 102., 104.5, 107., 110.])
+STATS = ['mean', 'median', 'min', 'max', 'count', 'wmean', 'mode']
+
+
+def _field():
+  rng = np.random.default_rng(0)
+  frames = []
+  for well, n in [('A', 60), ('B', 45)]:
+    depth = np.sort(rng.uniform(99, 111, n))
+    # samples on every edge, including the first and the last
+    depth[[3, 15, 25, 35, n - 4]] = [100., 102., 104.5, 107., 110.]
+    gr = rng.integers(0, 6, n).astype(float)
+    gr[::7] = np.nan
+    frames.append(pd.DataFrame({'WELL': well, 'DEPTH': depth, 'GR': gr,
+                                'FM': rng.choice(['X', 'Y'], n)}))
+  # wells interleaved, not sorted by depth
+  return pd.concat(frames).sample(frac=1, random_state=0)
+
+
+def _thickness(depth):
+  gap = np.diff(depth)
+  above, below = np.r_[gap[:1], gap], np.r_[gap, gap[-1:]]
+  return 0.5 * (above + below)
+
+
+def _mode(values):
+  values = list(values)
+  if not values:
+    return np.nan
+  counts = {v: values.count(v) for v in values}
+  # most frequent, first in depth order on ties
+  return max(counts, key=lambda v: (counts[v], -values.index(v)))
+
+
+def _brute_force(df):
+  rows = []
+  for well, dfw in df.groupby('WELL'):
+    dfw = dfw.sort_values('DEPTH', kind='stable')
+    w = _thickness(dfw['DEPTH'].to_numpy())
+    for i, (top, base) in enumerate(zip(EDGES[:-1], EDGES[1:])):
+      d = dfw['DEPTH']
+      # half-open intervals, the last one includes its base
+      inside = ((d >= top) & (d < base) if i < len(EDGES) - 2 else
+                (d >= top) & (d <= base)).to_numpy()
+      gr = dfw['GR'].to_numpy()[inside]
+      ok = ~np.isnan(gr)
+      v = gr[ok]
+      wv = w[inside][ok]
+      rows.append({
+          'WELL': well, 'DEPTH_regrid': 0.5 * (top + base),
+          'GR_mean_regrid': v.mean() if len(v) else np.nan,
+          'GR_median_regrid': np.median(v) if len(v) else np.nan,
+          'GR_min_regrid': v.min() if len(v) else np.nan,
+          'GR_max_regrid': v.max() if len(v) else np.nan,
+          'GR_count_regrid': len(v),
+          'GR_wmean_regrid': (v * wv).sum() / wv.sum() if len(v) else np.nan,
+          'GR_mode_regrid': _mode(v),
+          'FM_regrid': _mode(dfw['FM'].to_numpy()[inside])})
+  return pd.DataFrame(rows)
+
+
+def test_regrid_matches_brute_force():
+  df = _field()
+  result = regrid(df, 'DEPTH', ['GR', 'FM'], EDGES, stats=STATS, group='WELL')
+  expected = _brute_force(df)
+
+  assert list(result.columns) == list(expected.columns)
+  assert result['GR_count_regrid'].dtype == np.int64
+  for c in expected.columns:
+    if c in ('WELL', 'FM_regrid'):
+      assert result[c].tolist() == expected[c].tolist(), c
+    else:
+      np.testing.assert_allclose(result[c].to_numpy(dtype=float),
+                                 expected[c].to_numpy(dtype=float), err_msg=c)
+
+
+def test_edge_samples_and_empty_intervals():
+  df = pd.DataFrame({'DEPTH': [100., 102., 102., 110.], 'GR': [1., 2., np.nan, 4.]})
+  result = regrid(df, 'DEPTH', 'GR', EDGES, stats=['count', 'mean'])
+
+  # 102 belongs to the deeper interval only, 110 to the last interval
+  assert result['GR_count_regrid'].tolist() == [1, 1, 0, 1]
+  np.testing.assert_array_equal(result['GR_mean_regrid'], [1., 2., np.nan, 4.])